@@ -0,0 +1,257 @@
+"""Generador de carga y benchmark para el simulador.
+
+Lanza miles de peticiones GET/GETNEXT/GETBULK/walk concurrentes contra todas
+las comunidades de un directorio de datos, reutilizando un único SnmpEngine,
+y vuelca throughput y percentiles de latencia en JSON.
+
+Ejemplo:
+    python bench_snmp.py --data-dir data --port 1024 --requests 20000 --concurrency 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from pysnmp.hlapi.asyncio import SnmpEngine, CommunityData, UdpTransportTarget, ContextData, ObjectType, ObjectIdentity
+from pysnmp.hlapi.asyncio import getCmd, nextCmd, bulkCmd
+
+OPERATIONS = ("get", "next", "bulk", "walk")
+
+# Límites superiores (ms) de los cubos del histograma de latencia
+HISTOGRAM_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+# ---------------- DESCUBRIMIENTO DE DATOS ---------------- #
+
+def discover_targets(data_dir, oids_per_community):
+    """Devuelve {comunidad: [oids]} con el mismo nombrado que usa snmpsim."""
+    targets = {}
+    data_dir = os.path.abspath(data_dir)
+    for root, _, files in os.walk(data_dir):
+        for filename in sorted(files):
+            if not filename.endswith(".snmprec"):
+                continue
+            path = os.path.join(root, filename)
+            rel = os.path.relpath(path, data_dir)[:-len(".snmprec")]
+            community = rel.replace(os.path.sep, "/")
+
+            oids = []
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    oid = line.split("|", 1)[0].strip()
+                    if oid and not oid.startswith("#"):
+                        oids.append(oid)
+                        if len(oids) >= oids_per_community:
+                            break
+            if oids:
+                targets[community] = oids
+    return targets
+
+
+# ---------------- ESTADÍSTICAS ---------------- #
+
+class OpStats:
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = {}
+        self.pdus = 0
+
+    def add(self, latency, error=None, pdus=1):
+        self.pdus += pdus
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        else:
+            self.latencies.append(latency)
+
+    def summary(self, elapsed):
+        lat = sorted(self.latencies)
+        ok = len(lat)
+        failed = sum(self.errors.values())
+
+        def pct(p):
+            if not lat:
+                return None
+            return round(lat[min(ok - 1, int(p / 100.0 * ok))] * 1000, 3)
+
+        histogram = {}
+        idx = 0
+        for bound in HISTOGRAM_BUCKETS_MS:
+            count = 0
+            while idx < ok and lat[idx] * 1000 <= bound:
+                count += 1
+                idx += 1
+            histogram[f"le_{bound}ms"] = count
+        histogram["gt_%sms" % HISTOGRAM_BUCKETS_MS[-1]] = ok - idx
+
+        return {
+            "requests": ok + failed,
+            "ok": ok,
+            "errors": failed,
+            "error_kinds": self.errors,
+            "pdus": self.pdus,
+            "throughput_rps": round((ok + failed) / elapsed, 2) if elapsed else 0,
+            "latency_ms": {
+                "mean": round(sum(lat) / ok * 1000, 3) if ok else None,
+                "p50": pct(50),
+                "p95": pct(95),
+                "p99": pct(99),
+                "max": round(lat[-1] * 1000, 3) if lat else None,
+            },
+            "histogram": histogram,
+        }
+
+
+# ---------------- PETICIONES ---------------- #
+
+class Benchmark:
+
+    def __init__(self, args, targets):
+        self.args = args
+        self.targets = targets
+        self.communities = sorted(targets)
+        self.engine = SnmpEngine()
+        self.context = ContextData()
+        self.auth = {c: CommunityData(c) for c in self.communities}
+        self.transport = None
+        self.stats = {op: OpStats() for op in args.ops}
+        self.rng = random.Random(args.seed)
+
+    async def _request(self, op, community, oid):
+        auth = self.auth[community]
+        obj = ObjectType(ObjectIdentity(oid))
+        if op == "get":
+            return await getCmd(self.engine, auth, self.transport, self.context, obj), 1
+        if op == "next":
+            return await nextCmd(self.engine, auth, self.transport, self.context, obj), 1
+        if op == "bulk":
+            return await bulkCmd(self.engine, auth, self.transport, self.context,
+                                 0, self.args.max_repetitions, obj), 1
+        return await self._walk(auth, oid)
+
+    async def _walk(self, auth, oid):
+        """Walk manual con GETNEXT hasta salir del subárbol del OID inicial."""
+        root = tuple(int(x) for x in oid.split(".") if x)[:-1] or (1,)
+        current = ".".join(str(x) for x in root)
+        pdus = 0
+        result = (None, 0, 0, ())
+        while pdus < self.args.walk_limit:
+            result = await nextCmd(self.engine, auth, self.transport, self.context,
+                                   ObjectType(ObjectIdentity(current)))
+            pdus += 1
+            err_ind, err_status, _, var_binds = result
+            if err_ind or err_status or not var_binds:
+                break
+            # nextCmd devuelve una tabla (lista de filas) en pysnmp 6.x
+            var_bind = var_binds[0][0] if isinstance(var_binds[0], list) else var_binds[0]
+            next_oid = tuple(var_bind[0])
+            if next_oid[:len(root)] != root:
+                break
+            current = ".".join(str(x) for x in next_oid)
+        return result, pdus
+
+    def _jobs(self):
+        count = 0
+        deadline = time.perf_counter() + self.args.duration if self.args.duration else None
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif count >= self.args.requests:
+                return
+            count += 1
+            community = self.communities[count % len(self.communities)]
+            yield self.rng.choice(self.args.ops), community, self.rng.choice(self.targets[community])
+
+    async def _worker(self, jobs):
+        for op, community, oid in jobs:
+            start = time.perf_counter()
+            try:
+                (err_ind, err_status, _, _), pdus = await self._request(op, community, oid)
+                if err_ind:
+                    error = type(err_ind).__name__
+                elif err_status:
+                    error = err_status.prettyPrint()
+                else:
+                    error = None
+            except Exception as e:
+                error, pdus = type(e).__name__, 1
+            self.stats[op].add(time.perf_counter() - start, error, pdus)
+
+    async def run(self):
+        self.transport = UdpTransportTarget((self.args.host, self.args.port),
+                                            timeout=self.args.timeout, retries=self.args.retries)
+        jobs = self._jobs()
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(jobs) for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        total = OpStats()
+        for s in self.stats.values():
+            total.latencies.extend(s.latencies)
+            total.pdus += s.pdus
+            for k, v in s.errors.items():
+                total.errors[k] = total.errors.get(k, 0) + v
+
+        return {
+            "target": f"{self.args.host}:{self.args.port}",
+            "data_dir": os.path.abspath(self.args.data_dir),
+            "communities": len(self.communities),
+            "concurrency": self.args.concurrency,
+            "elapsed_s": round(elapsed, 3),
+            "total": total.summary(elapsed),
+            "operations": {op: s.summary(elapsed) for op, s in self.stats.items()},
+        }
+
+
+# ---------------- CLI ---------------- #
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga para el simulador SNMP.")
+    parser.add_argument("--data-dir", default="data", help="Directorio con los .snmprec a consultar")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1024)
+    parser.add_argument("--requests", type=int, default=10000, help="Total de peticiones (si no hay --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Duración en segundos (ignora --requests)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Peticiones simultáneas en vuelo")
+    parser.add_argument("--ops", default="get,next,bulk,walk",
+                        type=lambda s: tuple(o for o in s.split(",") if o),
+                        help="Mezcla de operaciones: get,next,bulk,walk")
+    parser.add_argument("--oids-per-community", type=int, default=1000)
+    parser.add_argument("--max-repetitions", type=int, default=25)
+    parser.add_argument("--walk-limit", type=int, default=100, help="Máximo de GETNEXT por walk")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichero JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    unknown = [op for op in args.ops if op not in OPERATIONS]
+    if unknown or not args.ops:
+        parser.error(f"Operaciones no válidas: {', '.join(unknown) or '(vacío)'}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    targets = discover_targets(args.data_dir, args.oids_per_community)
+    if not targets:
+        print(f"No se encontraron .snmprec en {args.data_dir}", file=sys.stderr)
+        return 1
+
+    report = asyncio.run(Benchmark(args, targets).run())
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
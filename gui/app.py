@@ -2,12 +2,24 @@ import tkinter as tk
 from tkinter import ttk
 import os
 import queue  # Necesario para evitar que la interfaz se congele
+from collections import deque
 
 # Importar nuestros componentes modulares
+from gui import startup_trace
 from gui.topbar import TopBar
 from gui.sidebar import DeviceSidebar
 from gui.editor import DeviceEditor
+from gui.console import Console
 from gui.snmpsim_runner import SNMPSimRunner
+from gui import fleet
+from gui import dynamic_values
+
+# Límites del volcado de logs por tick para que un flood no bloquee Tk
+MAX_LOG_DRAIN_PER_TICK = 20000
+LOG_POLL_FAST_MS = 20
+LOG_POLL_IDLE_MS = 100
+LOG_POLL_MAX_MS = 500
+METRICS_POLL_MS = 1000
 
 
 class SNMPSimApp(tk.Tk):
@@ -16,64 +28,106 @@ class SNMPSimApp(tk.Tk):
         super().__init__()
         self.title("SNMPSim Manager Pro")
         self.geometry("1200x700")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # 1. Configurar cola de mensajes (Thread-Safe Log)
         self.log_queue = queue.Queue()
+        self.log_poll_ms = LOG_POLL_IDLE_MS
 
         # 2. Inicializar el Runner
         # Pasamos self.queue_log como la función que recibirá los textos
         self.sim_runner = SNMPSimRunner(on_output=self.queue_log)
-
-        # 3. Construir Interfaz
-        self._build_layout()
+        # Perfiles lanzados desde el diálogo ⧉, cada uno con su propio runner
+        self.fleet = fleet.ProfileFleet(on_output=self.queue_log)
+
+        # 3. Construir Interfaz: lo ligero ahora; sidebar y editor cuando la ventana ya se ve
+        self.sidebar = None
+        self.editor = None
+        self._mapped = False
+        self._in_mainloop = False
+        self._panels_scheduled = False
+        with startup_trace.span("App._build_layout"):
+            self._build_layout()
+        self.bind("<Map>", self._on_first_map, add="+")
         
-        # 4. Iniciar el monitor de logs (revisa la cola cada 100ms)
+        # 4. Iniciar el monitor de logs (intervalo adaptativo según la carga)
         self.check_log_queue()
-
-        # 5. Cargar directorio inicial si existe
-        initial_dir = self.topbar.get_data_dir()
-        if initial_dir and os.path.exists(initial_dir):
-            self.sidebar.set_directory(initial_dir)
+        self.update_metrics()
 
     def _build_layout(self):
-        # A. TopBar
-        self.topbar = TopBar(
-            self,
-            on_start=self.start_simulation,
-            on_stop=self.stop_simulation,
-            on_dir_change=self.on_directory_changed
-        )
-        self.topbar.pack(fill="x", pady=2)
+        # A. TopBar (lee profiles.json para el combo de perfiles)
+        with startup_trace.span("TopBar"):
+            self.topbar = TopBar(
+                self,
+                on_start=self.start_simulation,
+                on_stop=self.stop_simulation,
+                on_dir_change=self.on_directory_changed,
+                on_reload=self.reload_simulation,
+                fleet=self.fleet
+            )
+            self.topbar.pack(fill="x", pady=2)
 
         separator = ttk.Separator(self, orient='horizontal')
         separator.pack(side="top", fill="x", padx=10, pady=5)
 
-        # B. Paneles Divisores
+        # B. Paneles Divisores (se llenan en _build_panels)
         self.paned = ttk.PanedWindow(self, orient="horizontal")
         self.paned.pack(fill="both", expand=True)
 
-        # C. Sidebar
-        self.sidebar = DeviceSidebar(self.paned, on_selection_change=self.on_file_selected)
-        self.paned.add(self.sidebar, weight=1)
-
-        # D. Editor
-        self.editor = DeviceEditor(self.paned,
-                                   on_file_renamed=self.on_file_renamed,
-                                   on_template_saved=self.on_template_saved)
-        self.paned.add(self.editor, weight=4)
-
-        # E. Consola de Salida
-        self.console_frame = ttk.Frame(self, height=150)
-        self.console_frame.pack(fill="x", side="bottom")
-        
-        # Widget Text para logs (fondo oscuro, letra verde)
-        self.console_text = tk.Text(self.console_frame, height=8, bg="#1e1e1e", fg="#00ff00", font=("Consolas", 9))
-        self.console_text.pack(side="left", fill="both", expand=True)
-        
-        # Scrollbar para la consola
-        scroll = ttk.Scrollbar(self.console_frame, command=self.console_text.yview)
-        scroll.pack(side="right", fill="y")
-        self.console_text.config(yscrollcommand=scroll.set)
+        # C. Consola de Salida (fondo oscuro, letra verde, líneas limitadas)
+        with startup_trace.span("Console"):
+            self.console = Console(self, height=8, bg="#1e1e1e", fg="#00ff00", font=("Consolas", 9),
+                                   level=self.sim_runner.log_level, on_level_change=self.set_log_level)
+            self.console.pack(fill="x", side="bottom")
+
+    def _on_first_map(self, event):
+        if event.widget is not self or self._mapped:
+            return
+        startup_trace.mark("first window mapped")
+        self._mapped = True
+        self._schedule_panels()
+
+    def mainloop(self, n=0):
+        self._in_mainloop = True
+        self._schedule_panels()
+        super().mainloop(n)
+
+    def _schedule_panels(self):
+        # Solo con la ventana ya visible y el bucle principal en marcha: un update()
+        # anterior (la barra oscura de Windows en main.py) también mapea la ventana
+        # y no debe construir aquí los paneles
+        if self._mapped and self._in_mainloop and not self._panels_scheduled:
+            self._panels_scheduled = True
+            self.after_idle(self._build_panels)
+
+    def _build_panels(self):
+        if self.sidebar is not None:
+            return
+        # D. Sidebar
+        with startup_trace.span("DeviceSidebar"):
+            self.sidebar = DeviceSidebar(self.paned, on_selection_change=self.on_file_selected)
+            self.paned.add(self.sidebar, weight=1)
+
+        # E. Editor (los dos tabs del notebook)
+        with startup_trace.span("DeviceEditor"):
+            self.editor = DeviceEditor(self.paned,
+                                       on_file_renamed=self.on_file_renamed,
+                                       on_template_saved=self.on_template_saved,
+                                       on_value_changed=self.on_value_changed,
+                                       on_record_edited=self.on_record_edited,
+                                       get_epoch=lambda: self.sim_runner.epoch)
+            self.paned.add(self.editor, weight=4)
+
+        # El listado del directorio, en la siguiente vuelta: los paneles se pintan antes
+        self.after_idle(self._load_initial_data)
+
+    def _load_initial_data(self):
+        initial_dir = self.topbar.get_data_dir()
+        if initial_dir and os.path.exists(initial_dir):
+            with startup_trace.span("Sidebar.set_directory"):
+                self.sidebar.set_directory(initial_dir)
+        # El informe, tras una vuelta más del bucle: incluye el pintado de los paneles
+        self.after_idle(lambda: startup_trace.finish(on_output=self.console.write))
 
     # ---------------- LOGGING SEGURO (THREAD-SAFE) ---------------- #
 
@@ -82,17 +136,37 @@ class SNMPSimApp(tk.Tk):
         self.log_queue.put(message)
 
     def check_log_queue(self):
-        """Este método lo ejecuta la GUI principal. Saca datos de la cola y pinta."""
-        while not self.log_queue.empty():
-            try:
-                msg = self.log_queue.get_nowait()
-                self.console_text.insert(tk.END, f"{msg}\n")
-                self.console_text.see(tk.END)  # Auto-scroll al final
-            except queue.Empty:
-                pass
+        """Este método lo ejecuta la GUI principal. Vacía la cola en un único lote y pinta."""
+        # Solo las últimas max_lines sobreviven al lote; el resto se cuenta como omitido
+        batch = deque(maxlen=self.console.max_lines)
+        drained = 0
+        try:
+            while drained < MAX_LOG_DRAIN_PER_TICK:
+                batch.append(self.log_queue.get_nowait())
+                drained += 1
+        except queue.Empty:
+            pass
+
+        if drained:
+            self.console.write_many(batch, dropped=drained - len(batch))
+
+        # El runner arranca en segundo plano (y la flota puede caerse sola): reflejarlo en la TopBar
+        if self.topbar.state != self.sim_runner.state:
+            self.topbar.set_state(self.sim_runner.state)
         
-        # Se vuelve a llamar a sí mismo en 100ms
-        self.after(100, self.check_log_queue)
+        # Bajo carga sondeamos rápido; en reposo vamos espaciando hasta LOG_POLL_MAX_MS
+        if drained >= MAX_LOG_DRAIN_PER_TICK:
+            self.log_poll_ms = LOG_POLL_FAST_MS
+        elif drained:
+            self.log_poll_ms = LOG_POLL_IDLE_MS // 2
+        else:
+            self.log_poll_ms = min(max(self.log_poll_ms, LOG_POLL_IDLE_MS) * 2, LOG_POLL_MAX_MS)
+        self.after(self.log_poll_ms, self.check_log_queue)
+
+    def update_metrics(self):
+        """Refresca el req/s de la TopBar con lo que agrega el colector del runner."""
+        self.topbar.set_metrics(self.sim_runner.metrics_snapshot())
+        self.after(METRICS_POLL_MS, self.update_metrics)
 
     # ---------------- ACCIONES DE LA APP ---------------- #
 
@@ -100,16 +174,35 @@ class SNMPSimApp(tk.Tk):
         endpoint = self.topbar.get_endpoint()
         data_dir = self.topbar.get_data_dir()
         
-        self.console_text.delete(1.0, tk.END)  # Limpiar consola
-        self.console_text.insert(tk.END, f"--- PREPARANDO SIMULACIÓN ---\n")
+        self.console.clear()  # Limpiar consola
+        self.console.write("--- PREPARANDO SIMULACIÓN ---")
         
-        self.topbar.set_running(True)
-        self.sim_runner.start(endpoint, data_dir)
+        self.topbar.set_state("starting")
+        self.sim_runner.start(endpoint, data_dir, workers=self.topbar.get_workers())
+
+    def reload_simulation(self):
+        # Lo pendiente del editor tiene que estar en disco antes de comparar
+        if self.editor is not None:
+            self.editor.writer.flush()
+        if not self.sim_runner.reload():
+            self.console.write("--- Recarga no disponible (simulador parado o recarga en curso) ---")
+
+    def set_log_level(self, level):
+        self.sim_runner.set_log_level(level)
+        self.fleet.set_log_level(level)
 
     def stop_simulation(self):
         self.topbar.set_running(False)
         self.sim_runner.stop()
 
+    def on_close(self):
+        # Escribir cambios pendientes del editor y no dejar workers huérfanos
+        if self.editor is not None:
+            self.editor.writer.flush()
+        # El simulador principal y todos los perfiles se paran a la vez
+        fleet.stop_all([self.sim_runner, *self.fleet.runners.values()])
+        self.destroy()
+
     def on_directory_changed(self, new_path):
         if hasattr(self, 'sidebar') and self.sidebar:
             self.sidebar.set_directory(new_path)
@@ -125,6 +218,21 @@ class SNMPSimApp(tk.Tk):
             self.sidebar.tree.selection_set(new_filename)
             self.sidebar.tree.see(new_filename)
 
+    def on_value_changed(self, file_path, oid, tag, value):
+        """Propaga al responder en marcha los cambios de sliders/toggles."""
+        self.sim_runner.set_value(file_path, oid, tag, value)
+
+    def on_record_edited(self, file_path, old_oid, old_tag, oid, tag, value):
+        """Un registro cambiado en el diálogo sustituye en el responder a lo inyectado antes."""
+        if not self.sim_runner.is_running():
+            return
+        self.sim_runner.clear_values(file_path, [old_oid])
+        self.sim_runner.set_value(file_path, oid, tag, value)
+        if oid != old_oid or dynamic_values.is_dynamic(tag) and not dynamic_values.is_dynamic(old_tag):
+            # El índice del responder no conoce el OID nuevo ni que el registro pasó a
+            # dinámico: hace falta recargar ese fichero (reload_simulation vuelca antes lo pendiente)
+            self.reload_simulation()
+
     def on_template_saved(self):
         """Si guardan plantilla, recargamos menú del sidebar."""
         if hasattr(self.sidebar, 'reload_templates'):
@@ -0,0 +1,199 @@
+"""Generación masiva de dispositivos a partir de una plantilla de templates.json.
+
+Cada dispositivo n (de start a start+count-1) recibe una comunidad según un
+patrón ("dev-{n:05d}") y el contenido de la plantilla con reglas aplicadas
+por OID:
+
+- {"kind": "pattern", "format": "SW-{n:04d}"}   texto con n / i / community
+- {"kind": "ip", "start": "10.0.0.1", "step": 1} direcciones consecutivas
+- {"kind": "counter", "start": 0, "step": 1}     enteros crecientes
+- {"kind": "random", "min": 0, "max": 100}       aleatorio reproducible (semilla + n)
+
+El trabajo se reparte por lotes entre procesos; cada proceso escribe sus
+ficheros seguidos. Las comunidades que ya existen no se tocan.
+
+Uso: python -m gui.bulk_generate DATA_DIR --template NOMBRE --count N [opciones]
+"""
+import argparse
+import ipaddress
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui.dir_watcher import scan_dir
+from gui.record_store import oid_key
+
+OID_SYSNAME = "1.3.6.1.2.1.1.5.0"
+BATCH_SIZE = 500
+TEMPLATES_FILE = "templates.json"
+
+
+def load_template(name, path=TEMPLATES_FILE):
+    """(registros ordenados por OID, meta) de una plantilla; admite el formato antiguo (texto)."""
+    with open(path, "r", encoding="utf-8") as f:
+        templates = json.load(f)
+    if name not in templates:
+        raise KeyError(f"No existe la plantilla '{name}'")
+    data = templates[name]
+    if isinstance(data, str):
+        content, meta = data, {}
+    else:
+        content, meta = data.get("content", ""), data.get("meta", {})
+
+    records = {}
+    for line in content.splitlines():
+        parts = line.strip().split("|", 2)
+        if len(parts) == 3:
+            records[parts[0]] = (parts[1], parts[2])
+    ordered = sorted(records.items(), key=lambda kv: oid_key(kv[0]))
+    return [(oid, tag, value) for oid, (tag, value) in ordered], meta
+
+
+def _apply_rule(rule, n, i, community, rng):
+    kind = rule.get("kind")
+    if kind == "pattern":
+        return rule["format"].format(n=n, i=i, community=community)
+    if kind == "ip":
+        return str(ipaddress.IPv4Address(rule["start"]) + i * int(rule.get("step", 1)))
+    if kind == "counter":
+        return str(int(rule.get("start", 0)) + i * int(rule.get("step", 1)))
+    if kind == "random":
+        return str(rng.randint(int(rule.get("min", 0)), int(rule.get("max", 100))))
+    raise ValueError(f"Regla desconocida: {kind}")
+
+
+def validate(name_pattern, rules=None, sysname_pattern=None, start=1):
+    """Comprueba patrones y reglas con el primer dispositivo; ValueError si alguno falla."""
+    try:
+        community = name_pattern.format(n=start, i=0)
+        if sysname_pattern:
+            sysname_pattern.format(n=start, i=0, community=community)
+        rng = random.Random(0)
+        for oid, rule in (rules or {}).items():
+            _apply_rule(rule, start, 0, community, rng)
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"patrón o regla no válidos: {e!r}") from e
+
+
+def render_device(records, rules, n, i, community, seed):
+    rng = random.Random(seed * 1000003 + n)
+    lines = []
+    for oid, tag, value in records:
+        rule = rules.get(oid)
+        if rule is not None:
+            value = _apply_rule(rule, n, i, community, rng)
+        lines.append(f"{oid}|{tag}|{value}\n")
+    return "".join(lines)
+
+
+def _write_batch(task):
+    """Escribe un lote de dispositivos; se ejecuta en un proceso del pool."""
+    data_dir, records, meta_json, rules, seed, devices = task
+    written = 0
+    errors = []
+    for n, i, community in devices:
+        path = os.path.join(data_dir, f"{community}.snmprec")
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                f.write(render_device(records, rules, n, i, community, seed))
+            if meta_json:
+                with open(f"{path}.meta.json", "w", encoding="utf-8") as f:
+                    f.write(meta_json)
+            written += 1
+        except FileExistsError:
+            errors.append(f"{community}: ya existe")
+        except OSError as e:
+            errors.append(f"{community}: {e}")
+    return written, errors
+
+
+def plan_devices(data_dir, count, name_pattern, start=1):
+    """Lista (n, i, comunidad) de los dispositivos a crear y las comunidades que ya existían."""
+    existing = set(scan_dir(data_dir))
+    devices, skipped = [], []
+    for i in range(count):
+        n = start + i
+        community = name_pattern.format(n=n, i=i)
+        if f"{community}.snmprec" in existing:
+            skipped.append(community)
+        else:
+            devices.append((n, i, community))
+    return devices, skipped
+
+
+def generate(data_dir, template, count, name_pattern="device-{n:05d}", start=1, rules=None,
+             sysname_pattern=None, seed=0, workers=None, on_progress=None, templates_path=TEMPLATES_FILE):
+    """Crea los dispositivos y devuelve {"written", "skipped", "errors"}.
+
+    on_progress(hechos, total) se llama desde el hilo que invoca generate().
+    """
+    records, meta = load_template(template, templates_path)
+    validate(name_pattern, rules, sysname_pattern, start)
+    rules = dict(rules or {})
+    if sysname_pattern:
+        rules[OID_SYSNAME] = {"kind": "pattern", "format": sysname_pattern}
+    if OID_SYSNAME in rules and OID_SYSNAME not in {oid for oid, _, _ in records}:
+        records = sorted(records + [(OID_SYSNAME, "4", "")], key=lambda r: oid_key(r[0]))
+    meta_json = json.dumps(meta, indent=4) if meta else ""
+
+    devices, skipped = plan_devices(data_dir, count, name_pattern, start)
+    batches = [devices[k:k + BATCH_SIZE] for k in range(0, len(devices), BATCH_SIZE)]
+    tasks = [(data_dir, records, meta_json, rules, seed, batch) for batch in batches]
+
+    result = {"written": 0, "skipped": skipped, "errors": []}
+    done = 0
+
+    def collect(written, errors, size):
+        nonlocal done
+        result["written"] += written
+        result["errors"].extend(errors)
+        done += size
+        if on_progress:
+            on_progress(done, len(devices))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        for task in tasks:
+            collect(*_write_batch(task), len(task[-1]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_write_batch, task): len(task[-1]) for task in tasks}
+            for future in as_completed(futures):
+                collect(*future.result(), futures[future])
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera dispositivos en masa desde templates.json.")
+    parser.add_argument("data_dir")
+    parser.add_argument("--template", required=True)
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--name", default="device-{n:05d}", help="patrón de comunidad (n, i)")
+    parser.add_argument("--start", type=int, default=1)
+    parser.add_argument("--sysname", default=None, help="patrón de sysName (n, i, community)")
+    parser.add_argument("--rules", default=None, help="JSON {oid: regla} con reglas adicionales")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--templates", default=TEMPLATES_FILE)
+    args = parser.parse_args(argv)
+
+    rules = {}
+    if args.rules:
+        with open(args.rules, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+
+    result = generate(args.data_dir, args.template, args.count, args.name, args.start, rules,
+                      args.sysname, args.seed, args.workers, templates_path=args.templates)
+    print(f"{result['written']} creados, {len(result['skipped'])} ya existían, {len(result['errors'])} errores")
+    for error in result["errors"][:20]:
+        print(f"  {error}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,84 @@
 import tkinter as tk
 from tkinter import ttk
+from collections import deque
+
+
+LEVELS = ("debug", "info", "warning", "error")
+
 
 class Console(ttk.Frame):
-    def __init__(self, parent):
+    """Consola de solo lectura con un máximo fijo de líneas retenidas.
+
+    on_level_change(nivel) se llama al cambiar el filtro de nivel; el filtrado
+    lo hace quien produce las líneas (el pipeline de logs del runner).
+    """
+
+    def __init__(self, parent, max_lines=5000, level="info", on_level_change=None, **text_options):
         super().__init__(parent)
+        self.max_lines = max_lines
+        self.on_level_change = on_level_change
+        # Buffer circular: solo guarda las últimas max_lines líneas
+        self.lines = deque(maxlen=max_lines)
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(side="top", fill="x")
+        self.level_var = tk.StringVar(value=level)
+        level_combo = ttk.Combobox(toolbar, textvariable=self.level_var, values=LEVELS,
+                                   state="readonly", width=8)
+        level_combo.pack(side="right", padx=2)
+        level_combo.bind("<<ComboboxSelected>>", self._on_level_selected)
+        ttk.Label(toolbar, text="Nivel:").pack(side="right")
+
+        options = {"height": 10, "bg": "black", "fg": "lime", "insertbackground": "white"}
+        options.update(text_options)
+        self.text = tk.Text(self, **options)
+        self.text.pack(side="left", fill="both", expand=True)
 
-        self.text = tk.Text(
-            self,
-            height=10,
-            bg="black",
-            fg="lime",
-            insertbackground="white"
-        )
-        self.text.pack(fill="both", expand=True)
+        scroll = ttk.Scrollbar(self, command=self.text.yview)
+        scroll.pack(side="right", fill="y")
+        self.text.config(yscrollcommand=scroll.set)
 
         self.text.config(state="disabled")
 
     def write(self, line: str):
+        self.write_many((line,))
+
+    def write_many(self, lines, dropped=0):
+        """Inserta un lote de líneas de una sola vez y recorta lo que exceda max_lines."""
+        if not lines and not dropped:
+            return
+        # Una entrada del buffer debe ser una línea del Text: los mensajes con
+        # saltos de línea se parten para que el recorte cuente lo mismo en los dos
+        lines = [part for line in lines for part in str(line).split("\n")]
+        if dropped:
+            lines = [f"... ({dropped} líneas omitidas) ..."] + lines[-(self.max_lines - 1):]
+
+        # Solo seguimos el final si el usuario no ha subido a leer
+        follow = self.text.yview()[1] >= 0.999
+        before = len(self.lines)
+        self.lines.extend(lines)
+        overflow = before + len(lines) - len(self.lines)
+
         self.text.config(state="normal")
-        self.text.insert("end", line + "\n")
-        self.text.see("end")
+        if overflow >= before:
+            # El lote reemplaza todo el contenido visible
+            self.text.delete("1.0", "end")
+            self.text.insert("end", "\n".join(self.lines) + "\n")
+        else:
+            self.text.insert("end", "\n".join(lines) + "\n")
+            if overflow:
+                self.text.delete("1.0", f"{overflow + 1}.0")
         self.text.config(state="disabled")
 
+        if follow:
+            self.text.see("end")
+
+    def _on_level_selected(self, event=None):
+        if self.on_level_change:
+            self.on_level_change(self.level_var.get())
+
     def clear(self):
+        self.lines.clear()
         self.text.config(state="normal")
         self.text.delete("1.0", "end")
-        self.text.config(state="disabled")
\ No newline at end of file
+        self.text.config(state="disabled")
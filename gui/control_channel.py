@@ -0,0 +1,100 @@
+"""Canal de control local (UDP loopback) entre la GUI y los workers del responder.
+
+Cada mensaje es un datagrama JSON con un campo "op". El servidor vive dentro
+del proceso responder y responde a quien envió el mensaje con otro JSON.
+"""
+import json
+import os
+import socket
+import threading
+
+CONTROL_HOST = "127.0.0.1"
+MAX_DATAGRAM = 65507
+
+
+def free_udp_port() -> int:
+    """Pide al sistema un puerto UDP libre en loopback."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind((CONTROL_HOST, 0))
+        return s.getsockname()[1]
+
+
+def normalize_path(path) -> str:
+    """Clave común para identificar un fichero de datos en ambos procesos."""
+    return os.path.normcase(os.path.realpath(path))
+
+
+class ControlServer:
+    """Escucha órdenes en un hilo propio y las despacha a handlers por "op"."""
+
+    def __init__(self, port: int):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((CONTROL_HOST, port))
+        self.handlers = {"ping": lambda msg: {"pid": os.getpid()}}
+
+    def register(self, op, handler):
+        """handler(msg) -> dict de respuesta (o None)."""
+        self.handlers[op] = handler
+
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def _serve(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(MAX_DATAGRAM)
+            except OSError:
+                return
+            try:
+                msg = json.loads(data.decode("utf-8"))
+                handler = self.handlers.get(msg.get("op"))
+                if handler is None:
+                    reply = {"ok": False, "error": f"op desconocida: {msg.get('op')}"}
+                else:
+                    reply = {"ok": True, **(handler(msg) or {})}
+            except Exception as e:
+                msg, reply = {}, {"ok": False, "error": str(e)}
+            if "seq" in msg:
+                reply["seq"] = msg["seq"]
+            try:
+                self.sock.sendto(json.dumps(reply).encode("utf-8"), addr)
+            except OSError:
+                pass
+
+
+class ControlClient:
+    """Lado GUI: envía órdenes a uno o varios workers."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((CONTROL_HOST, 0))
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def send(self, ports, msg):
+        """Envío sin esperar respuesta (camino rápido para sliders/toggles)."""
+        data = json.dumps(msg).encode("utf-8")
+        for port in ports:
+            try:
+                self.sock.sendto(data, (CONTROL_HOST, port))
+            except OSError:
+                pass
+
+    def request(self, port, msg, timeout=1.0):
+        """Envía y espera la respuesta de un worker concreto; None si no contesta."""
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.bind((CONTROL_HOST, 0))
+            s.settimeout(timeout)
+            with self._lock:
+                self._seq += 1
+                seq = self._seq
+            s.sendto(json.dumps({**msg, "seq": seq}).encode("utf-8"), (CONTROL_HOST, port))
+            try:
+                while True:
+                    data, _ = s.recvfrom(MAX_DATAGRAM)
+                    reply = json.loads(data.decode("utf-8"))
+                    if reply.get("seq") == seq:
+                        return reply
+            except (socket.timeout, OSError, ValueError):
+                return None
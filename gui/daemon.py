@@ -0,0 +1,127 @@
+"""Modo headless: arranca perfiles de profiles.json sin Tk, para CI y servidores de laboratorio.
+
+No importa ningún módulo de interfaz (ni tkinter ni sv_ttk); cada perfil es
+el mismo SNMPSimRunner de la GUI, todos en paralelo (ver gui/fleet.py). Los
+mensajes van a stdout y a runtime/logs/daemon.log; la salida de los workers,
+además, a runtime/logs/<perfil>/responder.log (ver log_pipeline).
+
+Señales: SIGHUP recarga en caliente los ficheros cambiados; SIGINT y
+SIGTERM paran los workers y terminan.
+
+Uso: python main.py --headless --profile NOMBRE [--profile OTRO ...] [--workers N] [--log-level info]
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+from logging.handlers import RotatingFileHandler
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import utils
+from gui.fleet import ProfileFleet
+from gui.log_pipeline import LEVELS, LOG_BACKUPS, LOG_MAX_BYTES
+
+POLL_INTERVAL = 0.5
+
+
+class HeadlessDaemon:
+
+    def __init__(self, profiles, workers=None, log_level="info"):
+        self.profiles = profiles  # nombre -> datos de profiles.json
+        self.workers = workers
+        self.log = logging.getLogger("snmpsim_gui.daemon")
+        self.fleet = ProfileFleet(on_output=self._output, log_level=log_level)
+        self._wake = threading.Event()
+        self._pending = None  # "reload" / "stop", lo deja el manejador de señales
+
+    def _output(self, message):
+        self.log.info(message)
+
+    def _setup_logging(self):
+        self.log.setLevel(logging.INFO)
+        self.log.propagate = False
+        stdout = logging.StreamHandler(sys.stdout)
+        stdout.setFormatter(logging.Formatter("%(message)s"))
+        self.log.addHandler(stdout)
+        log_dir = self.fleet.runtime_dir / "logs"
+        os.makedirs(log_dir, exist_ok=True)
+        to_file = RotatingFileHandler(log_dir / "daemon.log", maxBytes=LOG_MAX_BYTES,
+                                      backupCount=LOG_BACKUPS, encoding="utf-8")
+        to_file.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.log.addHandler(to_file)
+
+    def _on_signal(self, signum, frame):
+        # En el manejador solo se anota; el trabajo se hace en el bucle principal
+        self._pending = "reload" if signum == getattr(signal, "SIGHUP", None) else "stop"
+        self._wake.set()
+
+    def run(self) -> int:
+        self._setup_logging()
+        signal.signal(signal.SIGINT, self._on_signal)
+        signal.signal(signal.SIGTERM, self._on_signal)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._on_signal)
+
+        # Todos los perfiles arrancan a la vez; uno mal configurado invalida el lanzamiento
+        skipped = self.fleet.start(self.profiles, workers=self.workers)
+        if skipped:
+            self.fleet.stop()
+            return 2
+
+        was_running = set()
+        try:
+            while True:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+                action, self._pending = self._pending, None
+                if action == "stop":
+                    return 0
+                if action == "reload":
+                    busy = set(self.profiles) - set(self.fleet.reload())
+                    if busy:
+                        self._output(f"--- Recarga no disponible en {', '.join(sorted(busy))} "
+                                     "(arrancando o recarga en curso) ---")
+
+                states = self.fleet.states()
+                for name, state in states.items():
+                    if state == "running":
+                        was_running.add(name)
+                    elif state == "stopped" and name in was_running:
+                        was_running.discard(name)
+                        self._output(f"--- {name}: el simulador se detuvo ---")
+                if all(state == "stopped" for state in states.values()):
+                    # Fallo de arranque o todas las flotas cayeron: salida con error para el supervisor
+                    self._output("--- No queda ningún simulador en marcha ---")
+                    return 1
+        finally:
+            self.fleet.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta un perfil de profiles.json sin interfaz gráfica.")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--profile", required=True, action="append",
+                        help="repetible: varios perfiles en paralelo, cada uno en su endpoint")
+    parser.add_argument("--profiles", default=utils.PROFILES_FILE)
+    parser.add_argument("--workers", type=int, default=None, help="sustituye al valor del perfil")
+    parser.add_argument("--log-level", default="info", choices=list(LEVELS),
+                        help="nivel mínimo de la salida de los workers en stdout")
+    args = parser.parse_args(argv)
+
+    profiles = utils.load_profiles(args.profiles)
+    missing = [name for name in args.profile if name not in profiles]
+    if missing:
+        known = ", ".join(profiles) or "ninguno"
+        print(f"No existe el perfil '{missing[0]}' en {args.profiles} (disponibles: {known})", file=sys.stderr)
+        return 2
+
+    selected = {name: profiles[name] for name in dict.fromkeys(args.profile)}
+    return HeadlessDaemon(selected, args.workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from gui import dynamic_values
+
+# Alto fijo de cada tarjeta: permite calcular qué sensores caen en pantalla sin medirlos
+CARD_HEIGHT = 88
+CARD_GAP = 6
+NUMERIC_TAGS = ("2", "65", "66", "67")
+
+
+class SensorCard(ttk.LabelFrame):
+    """Tarjeta reutilizable: se crea una vez y se reasigna a distintos sensores."""
+
+    def __init__(self, parent, on_change, on_config, get_epoch=None):
+        super().__init__(parent, padding=5)
+        self.on_change = on_change
+        self.on_config = on_config
+        self.get_epoch = get_epoch
+        self.item = None
+        self.index = None
+        self.mode = None
+        self.dynamic = False
+
+        self.body = ttk.Frame(self)
+        self.body.pack(fill="x")
+
+        # Botón Configuración (⚙), común a todos los modos
+        ttk.Button(self.body, text="⚙", width=3,
+                   command=lambda: self.item and self.on_config(self.item)).pack(side="right", padx=5)
+
+        # Los controles de cada modo se crean la primera vez que hacen falta
+        self.scale = None
+        self.toggle_var = None
+        self.toggle = None
+        self.entry_frame = None
+        self.entry = None
+
+    def bind_item(self, index, item):
+        self.index = index
+        self.item = item
+        self.config(text=item['name'] if item['name'] else item['oid'])
+
+        ui_type = item.get("ui_type", "Text Entry")
+        # Registro dinámico: el Slider mueve su parámetro principal y el Toggle lo congela
+        self.dynamic = dynamic_values.is_dynamic(item['tag'])
+        if self.dynamic:
+            try:
+                dynamic_values.parse(item['value'])
+            except ValueError:
+                self.dynamic = False
+        tag = dynamic_values.base_tag(item['tag']) if self.dynamic else item['tag']
+        if ui_type == "Slider" and tag in NUMERIC_TAGS:
+            mode = "slider"
+        elif ui_type == "Toggle" and (tag in ["2"] or self.dynamic):
+            mode = "toggle"
+        else:
+            mode = "entry"
+
+        if mode != self.mode:
+            self._show_mode(mode)
+        self._load_value()
+
+    def _show_mode(self, mode):
+        for widget in (self.scale, self.toggle, self.entry_frame):
+            if widget is not None:
+                widget.pack_forget()
+
+        if mode == "slider":
+            if self.scale is None:
+                self.scale = tk.Scale(self.body, from_=0, to=100, orient="horizontal", showvalue=True)
+                self.scale.bind("<ButtonRelease-1>", lambda e: self._emit(int(self.scale.get())))
+            self.scale.pack(side="left", fill="x", expand=True)
+        elif mode == "toggle":
+            if self.toggle is None:
+                self.toggle_var = tk.IntVar(value=0)
+                self.toggle = ttk.Checkbutton(self.body, text="ON / OFF", variable=self.toggle_var,
+                                              command=lambda: self._emit(self.toggle_var.get()))
+            self.toggle.pack(side="left", anchor="w")
+        else:
+            if self.entry_frame is None:
+                self.entry_frame = ttk.Frame(self.body)
+                self.entry = ttk.Entry(self.entry_frame)
+                self.entry.pack(side="left", fill="x", expand=True)
+                ttk.Button(self.entry_frame, text="Set", width=4,
+                           command=lambda: self.on_change(self.item, self.entry.get())).pack(side="left", padx=2)
+            self.entry_frame.pack(side="left", fill="x", expand=True)
+        self.mode = mode
+
+    def _emit(self, value):
+        if self.dynamic:
+            # Se reescriben solo los parámetros que controla la tarjeta (y su origen de tiempos)
+            start_epoch = self.get_epoch() if self.get_epoch else None
+            if self.mode == "slider":
+                value = dynamic_values.set_level(self.item['value'], value, time.time(), start_epoch)
+            else:
+                value = dynamic_values.set_running(self.item['value'], bool(value), time.time(), start_epoch)
+        self.on_change(self.item, value)
+
+    def _load_value(self):
+        value = self.item['value']
+        if self.dynamic and self.mode == "slider":
+            low, high = dynamic_values.slider_range(value)
+            self.scale.config(from_=low, to=high)
+            self.scale.set(dynamic_values.level(value))
+            return
+        if self.dynamic and self.mode == "toggle":
+            self.toggle_var.set(int(dynamic_values.running(value)))
+            return
+        if self.mode == "slider":
+            self.scale.config(from_=0, to=100)
+        if self.mode in ("slider", "toggle"):
+            try: val = int(value)
+            except: val = 0
+            if self.mode == "slider":
+                self.scale.set(val)
+            else:
+                self.toggle_var.set(val)
+        else:
+            self.entry.delete(0, tk.END)
+            self.entry.insert(0, value)
+
+
+class SensorDashboard(ttk.Frame):
+    """Lista de sensores virtualizada: solo hay tarjetas para lo que se ve.
+
+    Las tarjetas se asignan a los índices visibles como en un buffer circular
+    (índice % tamaño del pool), así al hacer scroll solo se reasignan las que
+    entran en pantalla.
+    """
+
+    def __init__(self, parent, on_change, on_config, get_epoch=None):
+        super().__init__(parent)
+        self.on_change = on_change
+        self.on_config = on_config
+        # EPOCH del simulador en marcha (o None), para los valores dinámicos
+        self.get_epoch = get_epoch
+        self.items = []
+        self.cards = []  # pool de (tarjeta, id de ventana en el canvas)
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, yscrollincrement=CARD_HEIGHT // 4)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
+
+        self.canvas.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.empty_text = self.canvas.create_text(20, 20, anchor="nw", fill="gray", state="hidden",
+                                                  text="No hay sensores configurados.")
+
+        self.canvas.bind("<Configure>", lambda e: self._layout())
+        # La rueda llega al widget bajo el puntero (a menudo una tarjeta): filtramos por ruta
+        self.canvas.bind_all("<MouseWheel>", lambda e: self._on_wheel(e, -1 * (e.delta // 120)), add="+")
+        self.canvas.bind_all("<Button-4>", lambda e: self._on_wheel(e, -1), add="+")
+        self.canvas.bind_all("<Button-5>", lambda e: self._on_wheel(e, 1), add="+")
+
+    # ---------------- API ---------------- #
+
+    def set_items(self, items):
+        """Cambia la lista de sensores. Coste proporcional a lo visible, no al total."""
+        self.items = items
+        for card, _ in self.cards:
+            card.index = None  # forzar reasignación
+        self.canvas.configure(scrollregion=(0, 0, 1, max(1, len(items) * CARD_HEIGHT)))
+        self.canvas.itemconfigure(self.empty_text, state="hidden" if items else "normal")
+        self._layout()
+
+    def extend(self, items):
+        """Añade sensores al final (carga progresiva) sin reasignar las tarjetas ya visibles."""
+        if not items:
+            return
+        self.items.extend(items)
+        self.canvas.configure(scrollregion=(0, 0, 1, max(1, len(self.items) * CARD_HEIGHT)))
+        self.canvas.itemconfigure(self.empty_text, state="hidden")
+        self._update_viewport()
+
+    def refresh(self):
+        """Vuelve a volcar los valores de las tarjetas visibles."""
+        for card, _ in self.cards:
+            if card.index is not None:
+                card.bind_item(card.index, self.items[card.index])
+
+    def update_item(self, item):
+        """Actualiza en su sitio la tarjeta de un sensor, si está visible."""
+        for card, _ in self.cards:
+            if card.item == item:
+                card.bind_item(card.index, item)
+
+    # ---------------- INTERNOS ---------------- #
+
+    def _pool_size(self):
+        return max(1, self.canvas.winfo_height() // CARD_HEIGHT + 2)
+
+    def _layout(self):
+        """Ajusta el tamaño del pool y reparte tarjetas en el viewport."""
+        size = self._pool_size()
+        width = max(1, self.canvas.winfo_width())
+        while len(self.cards) < size:
+            card = SensorCard(self.canvas, self.on_change, self.on_config, self.get_epoch)
+            window = self.canvas.create_window(0, 0, window=card, anchor="nw", state="hidden")
+            self.cards.append((card, window))
+        while len(self.cards) > size:
+            card, window = self.cards.pop()
+            self.canvas.delete(window)
+            card.destroy()
+
+        for card, window in self.cards:
+            self.canvas.itemconfigure(window, width=width, height=CARD_HEIGHT - CARD_GAP)
+        self._update_viewport()
+
+    def _update_viewport(self):
+        if not self.cards:
+            return
+        size = len(self.cards)
+        first = max(0, int(self.canvas.canvasy(0)) // CARD_HEIGHT)
+        wanted = range(first, min(first + size, len(self.items)))
+
+        assigned = set()
+        for index in wanted:
+            card, window = self.cards[index % size]
+            assigned.add(index % size)
+            if card.index != index or card.item != self.items[index]:
+                card.bind_item(index, self.items[index])
+            self.canvas.coords(window, 0, index * CARD_HEIGHT)
+            self.canvas.itemconfigure(window, state="normal")
+
+        for slot, (card, window) in enumerate(self.cards):
+            if slot not in assigned:
+                self.canvas.itemconfigure(window, state="hidden")
+
+    def _on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._update_viewport()
+
+    def _on_wheel(self, event, units):
+        if str(event.widget).startswith(str(self.canvas)):
+            self.canvas.yview_scroll(units, "units")
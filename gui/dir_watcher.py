@@ -0,0 +1,157 @@
+"""Vigilancia de un directorio de datos para mantener la lista de dispositivos al día.
+
+En Linux se usa inotify (vía ctypes, sin dependencias); en el resto de
+plataformas, o si inotify no está disponible, se sondea el mtime del
+directorio. En ambos casos el hilo del vigilante solo produce eventos
+("add", nombre) / ("remove", nombre) / ("resync", None) en una cola; quien
+los aplique (la GUI) lo hace desde su propio hilo.
+"""
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+
+SUFFIX = ".snmprec"
+POLL_INTERVAL = 1.0
+FULL_SCAN_EVERY = 10  # en modo sondeo, rescaneo completo cada N ciclos aunque no cambie el mtime
+
+# Máscaras de inotify (linux/inotify.h)
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def scan_dir(path, suffix=SUFFIX):
+    """Nombres de los ficheros del directorio con la extensión dada (sin ordenar)."""
+    with os.scandir(path) as entries:
+        return [e.name for e in entries if e.name.endswith(suffix)]
+
+
+class DirWatcher:
+    """Hilo que vigila un directorio y encola los cambios de su lista de ficheros."""
+
+    def __init__(self, path, suffix=SUFFIX):
+        self.path = path
+        self.suffix = suffix
+        self.events = queue.Queue()
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        fd = self._inotify_open() if sys.platform.startswith("linux") else None
+        if fd is not None:
+            self.mode = "inotify"
+            target, args = self._run_inotify, (fd,)
+        else:
+            # La foto inicial se toma aquí, antes de que quien llama liste el directorio:
+            # así ningún cambio intermedio se pierde (como mucho llega repetido)
+            self.mode = "polling"
+            try:
+                known = set(scan_dir(self.path, self.suffix))
+            except OSError:
+                known = None
+            target, args = self._run_polling, (known,)
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def drain(self, limit=10000):
+        """Eventos pendientes (como mucho 'limit'), sin bloquear."""
+        batch = []
+        try:
+            while len(batch) < limit:
+                batch.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    # ---------------- INOTIFY ---------------- #
+
+    def _inotify_open(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+                    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+            if libc.inotify_add_watch(fd, os.fsencode(self.path), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _run_inotify(self, fd):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                buf = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset < len(buf):
+                    _, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                    offset += _EVENT_HEADER.size
+                    name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+                    offset += length
+                    self._dispatch(mask, name)
+        except OSError:
+            # Sin inotify no nos quedamos ciegos: seguimos sondeando
+            self.events.put(("resync", None))
+            self.mode = "polling"
+            self._run_polling()
+        finally:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _dispatch(self, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.events.put(("resync", None))
+        elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            self.events.put(("resync", None))
+            self._stop.set()
+        elif name.endswith(self.suffix):
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.events.put(("add", name))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.events.put(("remove", name))
+
+    # ---------------- SONDEO ---------------- #
+
+    def _run_polling(self, known=None):
+        last_mtime = None
+        ticks = 0
+        while not self._stop.is_set():
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != last_mtime or ticks >= FULL_SCAN_EVERY:
+                    current = set(scan_dir(self.path, self.suffix))
+                    if known is not None:
+                        for name in current - known:
+                            self.events.put(("add", name))
+                        for name in known - current:
+                            self.events.put(("remove", name))
+                    known, last_mtime, ticks = current, mtime, 0
+            except OSError:
+                pass
+            ticks += 1
+            self._stop.wait(POLL_INTERVAL)
@@ -0,0 +1,280 @@
+"""Valores que cambian con el reloj: contadores, uptime, ondas y paseos aleatorios.
+
+Un registro dinámico lleva el módulo de variación en el tag y sus parámetros
+en el valor:
+
+    1.3.6.1.2.1.1.3.0|67:dynamic|kind=uptime
+    1.3.6.1.2.1.2.2.1.10.1|65:dynamic|kind=counter,rate=125000
+    1.3.6.1.4.1.9.9.109.1.1.1.1.5.1|66:dynamic|kind=wave,center=40,amplitude=25,period=600
+    1.3.6.1.4.1.2021.10.1.5.1|2:dynamic|kind=walk,center=50,step=3,min=0,max=100
+
+gui/variation/dynamic.py es el módulo que carga snmpsim; el cálculo está
+aquí para que la GUI (Slider/Toggle del panel, diálogo de edición) use los
+mismos parámetros. Cada valor es función pura de t = segundos desde EPOCH,
+que el runner comparte con todos sus workers (SNMPSIM_GUI_EPOCH): nada se
+acumula ni se escribe a disco, cada GET cuesta lo mismo y dos workers con
+SO_REUSEPORT contestan lo mismo. El paseo aleatorio es ruido fractal con
+semilla (por OID), no una suma de pasos, para cumplir eso mismo.
+
+Comunes a todos los tipos: since fija el origen de t en segundos de reloj
+(por defecto, EPOCH) y on=0 congela el valor en el instante at (el Toggle
+del panel). Ambos son absolutos, no relativos a EPOCH: lo que escribe la GUI
+sigue valiendo tras reiniciar el simulador. Al reanudar, since avanza lo que
+duró la pausa, así un contador no salta; al cambiar el ritmo de un contador
+(o el uptime) se rebasa start al valor actual con since = ahora, para no
+reescalar la historia.
+"""
+import math
+import os
+import time
+import zlib
+
+MODULE = "dynamic"
+EPOCH_ENV = "SNMPSIM_GUI_EPOCH"
+# Directorio que el runner pasa como --variation-modules-dir
+VARIATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "variation")
+
+# tipo -> parámetros con su valor por defecto (en el orden en que se escriben)
+KINDS = {
+    "counter": {"rate": 100.0, "start": 0.0},
+    "uptime": {"start": 0.0},
+    "wave": {"center": 50.0, "amplitude": 25.0, "period": 300.0, "shape": "sine", "phase": 0.0},
+    "walk": {"center": 50.0, "step": 2.0, "interval": 10.0, "min": 0.0, "max": 100.0, "seed": 0.0},
+}
+COMMON = {"on": 1.0, "at": 0.0, "since": 0.0}
+# Parámetro que mueve el Slider del panel en cada tipo
+LEVEL_PARAM = {"counter": "rate", "uptime": "start", "wave": "center", "walk": "center"}
+SHAPES = ("sine", "square", "triangle", "sawtooth")
+WALK_OCTAVES = 8
+
+# Contadores y TimeTicks dan la vuelta; el resto se satura en su rango
+WRAP = {"65": 2 ** 32, "67": 2 ** 32, "70": 2 ** 64}
+LIMITS = {"2": (-2 ** 31, 2 ** 31 - 1), "66": (0, 2 ** 32 - 1)}
+NUMERIC_TAGS = ("2", "65", "66", "67", "70")
+
+# Parámetros enviados en caliente desde la GUI (los escribe responder_hooks):
+# fichero normalizado -> {oid: texto de parámetros}
+LIVE = {}
+
+
+def is_dynamic(tag):
+    return tag.endswith(":" + MODULE)
+
+
+def base_tag(tag):
+    return tag.split(":", 1)[0]
+
+
+def dynamic_tag(tag):
+    return f"{base_tag(tag)}:{MODULE}"
+
+
+def epoch():
+    try:
+        return float(os.environ[EPOCH_ENV])
+    except (KeyError, ValueError):
+        return time.time()
+
+
+def parse_raw(text):
+    """Texto -> dict de cadenas, en el orden del fichero (para editar sin perder nada)."""
+    raw = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"se esperaba clave=valor: '{part.strip()}'")
+        raw[key.strip()] = value.strip()
+    return raw
+
+
+def format_raw(raw):
+    return ",".join(f"{key}={value}" for key, value in raw.items())
+
+
+def parse(text):
+    """Texto -> parámetros completos (con valores por defecto). ValueError si algo no cuadra."""
+    raw = parse_raw(text)
+    kind = raw.pop("kind", "")
+    if kind not in KINDS:
+        raise ValueError(f"kind debe ser uno de: {', '.join(KINDS)}")
+    params = dict(COMMON, **KINDS[kind])
+    for key, value in raw.items():
+        if key not in params:
+            raise ValueError(f"parámetro desconocido para {kind}: {key}")
+        if key == "shape":
+            if value not in SHAPES:
+                raise ValueError(f"shape debe ser uno de: {', '.join(SHAPES)}")
+            params[key] = value
+        else:
+            params[key] = float(value)
+    if kind == "wave" and params["period"] <= 0 or kind == "walk" and params["interval"] <= 0:
+        raise ValueError("period/interval deben ser mayores que 0")
+    params["kind"] = kind
+    return params
+
+
+def default_text(kind, value=""):
+    """Parámetros iniciales al convertir un registro en dinámico, partiendo de su valor actual."""
+    raw = {"kind": kind}
+    try:
+        current = float(value)
+    except (TypeError, ValueError):
+        current = None
+    if current is not None:
+        raw["start" if kind in ("counter", "uptime") else "center"] = _number(current)
+    return format_raw(raw)
+
+
+def _number(value):
+    return repr(value) if value != int(value) else str(int(value))
+
+
+def level(text):
+    params = parse(text)
+    return params[LEVEL_PARAM[params["kind"]]]
+
+
+def slider_range(text):
+    """(mínimo, máximo) del Slider para el parámetro principal del registro."""
+    params = parse(text)
+    if params["kind"] == "walk":
+        return params["min"], params["max"]
+    return 0, max(100, int(params[LEVEL_PARAM[params["kind"]]] * 2))
+
+
+def set_level(text, value, now=None, start_epoch=None):
+    """Cambia el parámetro del Slider.
+
+    En counter y uptime el valor se rebasa en el instante actual (o en el de
+    la pausa): start pasa a ser el valor de ese momento y since ese instante.
+    start_epoch es el EPOCH del simulador en marcha (None si está parado).
+    """
+    now = time.time() if now is None else now
+    params = parse(text)
+    raw = parse_raw(text)
+    kind = params["kind"]
+    if kind in ("counter", "uptime"):
+        anchor = params["at"] if params["on"] == 0 and params["at"] else now
+        if kind == "counter":
+            raw["start"] = _number(round(_raw_value(params, anchor, _origin(params, start_epoch, now))))
+        raw["since"] = f"{anchor:.3f}"
+    raw[LEVEL_PARAM[kind]] = _number(float(value))
+    return format_raw(raw)
+
+
+def running(text):
+    return parse(text)["on"] != 0
+
+
+def set_running(text, on, now=None, start_epoch=None):
+    """Congela (on=False) o reanuda el valor; al reanudar, since avanza lo que duró la pausa.
+
+    start_epoch como en set_level: fija since si el registro aún no lo tenía.
+    """
+    now = time.time() if now is None else now
+    params = parse(text)
+    raw = parse_raw(text)
+    origin = _origin(params, start_epoch, now)
+    if on and params["on"] == 0:
+        raw.pop("on", None)
+        raw.pop("at", None)
+        raw["since"] = f"{origin + max(0.0, now - params['at']) if params['at'] else origin:.3f}"
+    elif not on and params["on"] != 0:
+        raw["on"] = "0"
+        raw["at"] = f"{now:.3f}"
+        raw["since"] = f"{origin:.3f}"
+    return format_raw(raw)
+
+
+# ---------------- CÁLCULO ---------------- #
+
+def _mix(n):
+    # splitmix64: entero -> entero bien repartido, sin estado
+    n = (n + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    n = ((n ^ (n >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    n = ((n ^ (n >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return n ^ (n >> 31)
+
+
+def _noise(seed, x):
+    """Ruido de valores en [-1, 1]: aleatorio en los enteros e interpolado suave entre ellos."""
+    i = math.floor(x)
+    f = x - i
+    a = _mix(seed ^ (i & 0xFFFFFFFFFFFFFFFF)) / 2 ** 63 - 1.0
+    b = _mix(seed ^ ((i + 1) & 0xFFFFFFFFFFFFFFFF)) / 2 ** 63 - 1.0
+    f = f * f * (3 - 2 * f)
+    return a + (b - a) * f
+
+
+def _wave(shape, x):
+    """Forma de onda de periodo 1 en [-1, 1]."""
+    x %= 1.0
+    if shape == "square":
+        return 1.0 if x < 0.5 else -1.0
+    if shape == "triangle":
+        return 4 * x - 1 if x < 0.5 else 3 - 4 * x
+    if shape == "sawtooth":
+        return 2 * x - 1
+    return math.sin(2 * math.pi * x)
+
+
+def _reflect(value, low, high):
+    if high <= low:
+        return low
+    span = high - low
+    value = (value - low) % (2 * span)
+    return low + (value if value <= span else 2 * span - value)
+
+
+def salt(oid):
+    """Semilla propia de cada OID para que dos paseos no vayan a la par."""
+    return zlib.crc32(str(oid).encode("ascii", "replace"))
+
+
+def _origin(params, start_epoch, now):
+    """Instante absoluto desde el que cuenta t: since, o el EPOCH del simulador (o ahora, si está parado)."""
+    if params["since"]:
+        return params["since"]
+    return start_epoch if start_epoch is not None else now
+
+
+def _raw_value(params, now, origin, oid_salt=0):
+    """Valor sin redondear ni acotar al tipo SNMP."""
+    t = max(0.0, (params["at"] if params["on"] == 0 and params["at"] else now) - origin)
+    kind = params["kind"]
+    if kind == "counter":
+        value = params["start"] + params["rate"] * t
+    elif kind == "uptime":
+        value = params["start"] + t * 100  # TimeTicks: centésimas de segundo
+    elif kind == "wave":
+        value = params["center"] + params["amplitude"] * _wave(
+            params["shape"], t / params["period"] + params["phase"])
+    else:
+        seed = _mix(int(params["seed"]) * 0x100000001 + oid_salt)
+        x = t / params["interval"]
+        # Cada octava dobla el periodo y multiplica la amplitud por √2, como un paseo aleatorio
+        drift = sum(_noise(seed + octave, x / 2 ** octave) * 2 ** (octave / 2)
+                    for octave in range(WALK_OCTAVES))
+        value = _reflect(params["center"] + params["step"] * drift, params["min"], params["max"])
+    return value
+
+
+def value_at(params, tag, now, start_epoch, oid_salt=0):
+    """Valor entero del registro en el instante now (segundos de reloj)."""
+    value = _raw_value(params, now, _origin(params, start_epoch, now), oid_salt)
+    tag = base_tag(tag)
+    value = int(value)
+    if tag in WRAP:
+        return value % WRAP[tag]
+    low, high = LIMITS.get(tag, (None, None))
+    if low is not None:
+        value = min(max(value, low), high)
+    return value
+
+
+def live_params(key, oid):
+    """Parámetros enviados en caliente para ese registro (key: fichero normalizado), o None."""
+    table = LIVE.get(key)
+    return table.get(oid) if table else None
@@ -2,6 +2,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import os
 import json
+import functools
+
+from gui.writeback import WriteBehind
+from gui.virtual_table import VirtualTable
+from gui.dashboard import SensorDashboard
+from gui.snmprec_loader import SnmprecLoader
+from gui.record_store import RecordStore
+from gui import overlay
+from gui import dynamic_values
 
 # Mapeo de Tipos SNMP
 SNMP_TYPES = {
@@ -13,18 +22,35 @@ SNMP_TYPES = {
     "67": "TimeTicks"
 }
 TAG_BY_NAME = {v: k for k, v in SNMP_TYPES.items()}
+STATIC_VALUE = "Estático"
 OID_SYSNAME = "1.3.6.1.2.1.1.5.0"
 
 
 class DeviceEditor(ttk.Frame):
 
-    def __init__(self, parent, on_file_renamed=None, on_template_saved=None):
+    def __init__(self, parent, on_file_renamed=None, on_template_saved=None, on_value_changed=None,
+                 on_record_edited=None, get_epoch=None):
         super().__init__(parent)
         self.on_file_renamed_callback = on_file_renamed
         self.on_template_saved_callback = on_template_saved
+        self.on_value_changed_callback = on_value_changed
+        self.on_record_edited_callback = on_record_edited
+        self.get_epoch = get_epoch
         self.current_file_path = None
         self.meta_file_path = None
-        self.data = [] 
+        self.data = RecordStore()
+        self.meta_dict = {}
+        # Overlay: ruta de la base y sus valores, para guardar solo lo que difiere
+        self.overlay_base = None
+        self.overlay_deleted = set()
+        self.base_values = {}
+        # Carga en curso (None si no hay); se cancela al cambiar de dispositivo
+        self.loader = None
+        self._save_after_load = False
+        # Tras un error de lectura el almacén está incompleto: guardarlo truncaría el fichero
+        self.read_only = False
+        # Guardado diferido y atómico para no reescribir el fichero en cada gesto
+        self.writer = WriteBehind(self, on_error=self._on_flush_error)
         
         self._build_ui()
 
@@ -57,35 +83,30 @@ class DeviceEditor(ttk.Frame):
         
         ttk.Separator(self.tab_dashboard, orient="horizontal").pack(fill="x")
 
-        # Canvas y Scroll
-        self.canvas = tk.Canvas(self.tab_dashboard, highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(self.tab_dashboard, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-
-        # Bindings para scroll correcto
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.bind("<Configure>", lambda e: self.canvas.itemconfig(self.canvas_window, width=e.width))
-        
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True, padx=10, pady=10)
-        self.scrollbar.pack(side="right", fill="y")
+        # Sensores: tarjetas recicladas, solo se pintan las visibles
+        self.dashboard = SensorDashboard(self.tab_dashboard, on_change=self._update_realtime,
+                                         on_config=lambda it: EditDialog(self, it, self._on_edit_complete),
+                                         get_epoch=self.get_epoch)
+        self.dashboard.pack(fill="both", expand=True)
 
     def _render_dashboard(self):
-        """Dibuja los controles dinámicamente."""
-        # Limpiar contenido anterior
+        """Cabecera del dispositivo + lista virtual de sensores."""
+        self._render_dashboard_header()
+        if not self.data and not self.current_file_path:
+            self.dashboard.set_items([])
+            return
+        self.dashboard.set_items([i for i in self.data if i["oid"] != OID_SYSNAME])
+
+    def _render_dashboard_header(self):
         for w in self.dash_header.winfo_children(): w.destroy()
-        for w in self.scrollable_frame.winfo_children(): w.destroy()
 
         if not self.data and not self.current_file_path:
             ttk.Label(self.dash_header, text="Selecciona un dispositivo para comenzar.", font=("Segoe UI", 12)).pack()
             return
 
-        # --- A. INFO CABECERA ---
         filename = os.path.basename(self.current_file_path)
         community = os.path.splitext(filename)[0]
-        sysname_item = next((i for i in self.data if i["oid"] == OID_SYSNAME), None)
+        sysname_item = self.data.find(OID_SYSNAME)
         device_name = sysname_item['value'] if sysname_item else "Desconocido (Sin sysName)"
 
         lbl_dev = ttk.Label(self.dash_header, text=device_name, font=("Segoe UI", 16, "bold"), foreground="#007acc")
@@ -95,50 +116,8 @@ class DeviceEditor(ttk.Frame):
         f_sub.pack(anchor="w", pady=(5, 0))
         ttk.Label(f_sub, text="Community String:", font=("Segoe UI", 9, "bold"), foreground="#555").pack(side="left")
         ttk.Label(f_sub, text=community, font=("Consolas", 10), background="#e1e1e1").pack(side="left", padx=5)
-
-        # --- B. CONTROLES ---
-        found_sensors = False
-        for item in self.data:
-            if item["oid"] == OID_SYSNAME: continue
-            found_sensors = True
-            
-            display_title = item['name'] if item['name'] else item['oid']
-            frame = ttk.LabelFrame(self.scrollable_frame, text=display_title, padding=5)
-            frame.pack(fill="x", pady=5, expand=True)
-
-            ctrl_container = ttk.Frame(frame)
-            ctrl_container.pack(fill="x")
-
-            ui_type = item.get("ui_type", "Text Entry")
-
-            if ui_type == "Slider" and item['tag'] in ["2", "65", "66", "67"]:
-                try: val = int(item['value'])
-                except: val = 0
-                scale = tk.Scale(ctrl_container, from_=0, to=100, orient="horizontal", showvalue=True)
-                scale.set(val)
-                scale.pack(fill="x", expand=True)
-                scale.bind("<ButtonRelease-1>", lambda e, it=item, s=scale: self._update_realtime(it, int(s.get())))
-
-            elif ui_type == "Toggle" and item['tag'] in ["2"]:
-                try: val = int(item['value'])
-                except: val = 0
-                var = tk.IntVar(value=val)
-                chk = ttk.Checkbutton(ctrl_container, text="ON / OFF", variable=var,
-                                      command=lambda it=item, v=var: self._update_realtime(it, v.get()))
-                chk.pack(anchor="w")
-            else:
-                entry = ttk.Entry(ctrl_container)
-                entry.insert(0, item['value'])
-                entry.pack(side="left", fill="x", expand=True)
-                ttk.Button(ctrl_container, text="Set", width=4,
-                           command=lambda it=item, e=entry: self._update_realtime(it, e.get())).pack(side="left", padx=2)
-            
-            # Botón Configuración (⚙)
-            ttk.Button(ctrl_container, text="⚙", width=3, 
-                       command=lambda it=item: EditDialog(self, it, self._on_edit_complete)).pack(side="right", padx=5)
-
-        if not found_sensors:
-            ttk.Label(self.scrollable_frame, text="No hay sensores configurados.", foreground="gray").pack(pady=20)
+        if self.overlay_base:
+            ttk.Label(f_sub, text="(overlay)", foreground="gray").pack(side="left")
 
     # =======================================================
     # TAB 2: EDITOR (LAYOUT ROBUSTO)
@@ -167,32 +146,25 @@ class DeviceEditor(ttk.Frame):
         toolbar = ttk.Frame(list_frame)
         toolbar.pack(fill="x", pady=2)
         ttk.Button(toolbar, text="Refrescar Tabla", command=self._refresh_editor_ui).pack(side="right")
+        self.load_status = ttk.Label(toolbar, text="", foreground="gray")
+        self.load_status.pack(side="left")
         ttk.Button(toolbar, text="+ Nuevo OID", command=self._add_oid_dialog).pack(side="right", padx=5)
 
-        # Treeview Estático
-        cols = ("oid", "name", "type", "value", "ui")
-        self.tree = ttk.Treeview(list_frame, columns=cols, show="headings")
-        self.tree.heading("oid", text="OID")
-        self.tree.heading("name", text="Nombre Meta")
-        self.tree.heading("type", text="Tipo")
-        self.tree.heading("value", text="Valor")
-        self.tree.heading("ui", text="UI")
-        
-        self.tree.column("oid", width=180)
-        self.tree.column("name", width=120)
-        self.tree.column("type", width=80)
-        self.tree.column("value", width=100)
-        self.tree.column("ui", width=80)
-
-        self.tree.pack(fill="both", expand=True)
+        # Tabla virtual: solo se crean las filas visibles, sirva para 10 o 200k OIDs
+        self.table = VirtualTable(list_frame,
+                                  columns=("oid", "name", "type", "value", "ui"),
+                                  headings=("OID", "Nombre Meta", "Tipo", "Valor", "UI"),
+                                  widths=(180, 120, 80, 100, 80))
+        self.table.pack(fill="both", expand=True)
+        self.tree = self.table.tree
         self.tree.bind("<Double-1>", self._on_double_click_row)
 
     def _refresh_editor_ui(self):
         """Actualiza solo los campos dinámicos y la tabla."""
         
-        # A. Limpiar SOLO el frame dinámico y la tabla
+        # A. Limpiar SOLO el frame dinámico; la tabla se reapunta a los datos
         for w in self.dynamic_config_frame.winfo_children(): w.destroy()
-        self.tree.delete(*self.tree.get_children())
+        self.table.set_source(len(self.data), self._table_row)
 
         # Si no hay datos, terminamos (pero la UI estática sigue visible)
         if not self.data and not self.current_file_path:
@@ -213,7 +185,7 @@ class DeviceEditor(ttk.Frame):
                    command=lambda: self._change_community_string(e_comm.get())).grid(row=0, column=2)
 
         # 2. sysName
-        sysname_item = next((i for i in self.data if i["oid"] == OID_SYSNAME), None)
+        sysname_item = self.data.find(OID_SYSNAME)
         ttk.Label(self.dynamic_config_frame, text="Device Name:").grid(row=1, column=0, sticky="w", pady=5)
         
         if sysname_item:
@@ -226,56 +198,144 @@ class DeviceEditor(ttk.Frame):
             ttk.Button(self.dynamic_config_frame, text="➕ Crear OID de Nombre",
                        command=self._add_sysname_oid).grid(row=1, column=1, sticky="ew", pady=5)
 
-        # C. Rellenar Tabla
-        for item in self.data:
-            t = SNMP_TYPES.get(item['tag'], item['tag'])
-            self.tree.insert("", "end", values=(item['oid'], item.get('name', ''), t, item['value'], item.get('ui_type', '')))
+    def _table_row(self, idx):
+        oid, name, tag, value, ui_type = self.data.row(idx)
+        if dynamic_values.is_dynamic(tag):
+            base = dynamic_values.base_tag(tag)
+            return (oid, name, f"{SNMP_TYPES.get(base, base)} (dinámico)", value, ui_type)
+        return (oid, name, SNMP_TYPES.get(tag, tag), value, ui_type)
 
     # =======================================================
     # LOGICA DE DATOS
     # =======================================================
     def load_file(self, path):
+        # Volcar lo pendiente del fichero anterior antes de cambiar de contexto
+        self.writer.flush()
+        if self.loader is not None:
+            if self._save_after_load:
+                # Hubo cambios durante la carga: se termina de leer en segundo plano y se guardan
+                self._finish_load_detached()
+            else:
+                self.loader.cancel()
+            self.loader = None
         self.current_file_path = path
         folder = os.path.dirname(path)
         filename = os.path.basename(path)
         self.meta_file_path = os.path.join(folder, f"{filename}.meta.json")
-        self.data = []
+        self.data = RecordStore()
+        self._save_after_load = False
+        self.read_only = False
+        self.load_status.config(text="")
+        self.overlay_base = None
+        self.overlay_deleted = set()
+        self.base_values = {}
 
         if not os.path.exists(path): return
+        # Un overlay se edita ya fusionado: primero la base y encima el delta
+        self.overlay_base = overlay.read_base(path)
+        if self.overlay_base and not os.path.exists(self.overlay_base):
+            messagebox.showerror("Error", f"No se encuentra la base del overlay:\n{self.overlay_base}")
+            self.overlay_base = None
+            return
+        if self.overlay_base:
+            self.overlay_deleted = overlay.read_deleted(path)
 
-        meta_dict = {}
+        self.meta_dict = {}
         if os.path.exists(self.meta_file_path):
             try:
-                with open(self.meta_file_path, "r", encoding="utf-8") as f: meta_dict = json.load(f)
+                with open(self.meta_file_path, "r", encoding="utf-8") as f: self.meta_dict = json.load(f)
             except: pass
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if "|" in line:
-                        parts = line.split("|")
-                        if len(parts) >= 3:
-                            oid, tag, val = parts[0], parts[1], parts[2]
-                            meta = meta_dict.get(oid, {})
-                            self.data.append({
-                                "oid": oid, "tag": tag, "value": val,
-                                "name": meta.get("name", ""),
-                                "ui_type": meta.get("ui_type", "Text Entry")
-                            })
-            
-            self._render_dashboard()
-            self._refresh_editor_ui()
-            self.tabs.select(0)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error leyendo: {e}")
+        # Se pinta vacío y se va rellenando según llegan bloques del hilo lector
+        self._render_dashboard()
+        self._refresh_editor_ui()
+        self.tabs.select(0)
+        sources = [self.overlay_base, path] if self.overlay_base else [path]
+        self.loader = SnmprecLoader(self, sources, on_chunk=self._on_load_chunk, on_done=self._on_load_done,
+                                    on_progress=self._on_load_progress, on_error=self._on_load_error).start()
+
+    def _on_load_chunk(self, records, source):
+        if source == self.overlay_base:
+            base_values = self.base_values
+            for oid, tag, val in records:
+                base_values[oid] = (tag, val)
+            # Lo que el overlay quitó de la base no se muestra (y sigue quitado al guardar)
+            if self.overlay_deleted:
+                records = [r for r in records if r[0] not in self.overlay_deleted]
+        had_sysname = OID_SYSNAME in self.data
+        items = self.data.extend(records, self.meta_dict)
+
+        self.table.set_count(len(self.data))
+        if not had_sysname and OID_SYSNAME in self.data:
+            self.dashboard.extend([i for i in items if i["oid"] != OID_SYSNAME])
+            self._render_dashboard_header()
+        else:
+            self.dashboard.extend(items)
+
+    def _on_load_progress(self, done, total):
+        if total:
+            self.load_status.config(text=f"Cargando… {done * 100 // total}% ({len(self.data)} OIDs)")
+
+    def _on_load_done(self):
+        self.loader = None
+        self.load_status.config(text="")
+        # Un fichero desordenado se reordena al cargar: el panel se rehace con el orden final
+        self._render_dashboard()
+        self._refresh_editor_ui()
+        if self._save_after_load:
+            # Cambios hechos durante la carga: ahora sí hay fichero completo que escribir
+            self._save_after_load = False
+            self._save_to_disk()
+            self._save_metadata()
+
+    def _on_load_error(self, exc):
+        self.loader = None
+        self._save_after_load = False
+        self.read_only = True
+        self.load_status.config(text="Solo lectura (error al leer)")
+        messagebox.showerror("Error", f"Error leyendo: {exc}\n\nEl fichero queda en solo lectura: "
+                                      "guardar ahora lo truncaría a lo que se llegó a cargar.")
+
+    def _finish_load_detached(self):
+        """Termina la carga del fichero que se deja y guarda lo editado mientras cargaba.
+
+        El lector sigue con su almacén propio, fuera de la vista: el panel y la
+        tabla ya muestran el fichero nuevo.
+        """
+        loader, data = self.loader, self.data
+        path, meta_path, meta = self.current_file_path, self.meta_file_path, self.meta_dict
+        overlay_base, base_values, deleted = self.overlay_base, self.base_values, self.overlay_deleted
+
+        def on_chunk(records, source):
+            if source == overlay_base:
+                for oid, tag, val in records:
+                    base_values[oid] = (tag, val)
+                if deleted:
+                    records = [r for r in records if r[0] not in deleted]
+            data.extend(records, meta)
+
+        def on_done():
+            self._mark_dirty(path, meta_path, data, overlay_base, base_values)
+
+        def on_error(exc):
+            messagebox.showerror("Error", f"Error leyendo {os.path.basename(path)}: {exc}\n\n"
+                                          "Los cambios hechos durante la carga no se han guardado.")
+
+        loader.on_chunk, loader.on_done, loader.on_error = on_chunk, on_done, on_error
+        loader.on_progress = None
 
     def _update_realtime(self, item_dict, new_value):
         item_dict['value'] = str(new_value)
+        # Primero al simulador en memoria; el disco se actualiza en diferido
+        if self.on_value_changed_callback:
+            self.on_value_changed_callback(self.current_file_path, item_dict['oid'], item_dict['tag'], item_dict['value'])
         self._save_to_disk()
         if item_dict['oid'] == OID_SYSNAME:
-            self._render_dashboard()
+            self._render_dashboard_header()
             self._refresh_editor_ui()
+        else:
+            self.dashboard.update_item(item_dict)
+            self.table.refresh()
 
     def _change_community_string(self, new_community):
         new_community = new_community.strip()
@@ -289,6 +349,9 @@ class DeviceEditor(ttk.Frame):
             messagebox.showerror("Error", "Ya existe ese nombre de archivo.")
             return
 
+        # Que ninguna escritura pendiente vuelva a crear el nombre antiguo
+        self.writer.flush()
+
         try:
             os.rename(self.current_file_path, new_path)
             if os.path.exists(self.meta_file_path):
@@ -309,43 +372,55 @@ class DeviceEditor(ttk.Frame):
     def _add_sysname_oid(self):
         name = simpledialog.askstring("Nombre", "Nombre del Dispositivo:")
         if name:
-            self.data.insert(0, {"oid": OID_SYSNAME, "tag": "4", "value": name, "name": "System Name", "ui_type": "Text Entry"})
+            self.data.add(OID_SYSNAME, "4", name, name="System Name")
             self._save_to_disk()
             self._save_metadata()
             self._refresh_editor_ui()
             self._render_dashboard()
 
     def _save_to_disk(self):
-        if not self.current_file_path: return
-        try:
-            with open(self.current_file_path, "w", encoding="utf-8") as f:
-                for item in self.data:
-                    f.write(f"{item['oid']}|{item['tag']}|{item['value']}\n")
-        except: pass
+        if not self.current_file_path or self.read_only: return
+        if self.loader is not None:
+            # Con la carga a medias se truncaría el fichero: se guarda al terminar
+            self._save_after_load = True
+            return
+        self._mark_dirty(self.current_file_path, None, self.data, self.overlay_base, self.base_values)
 
     def _save_metadata(self):
-        if not self.meta_file_path: return
-        meta = {i['oid']: {"name": i.get("name", ""), "ui_type": i.get("ui_type", "")} for i in self.data}
-        try:
-            with open(self.meta_file_path, "w", encoding="utf-8") as f: json.dump(meta, f, indent=4)
-        except: pass
+        if not self.meta_file_path or self.read_only: return
+        if self.loader is not None:
+            self._save_after_load = True
+            return
+        self._mark_dirty(None, self.meta_file_path, self.data)
+
+    def _mark_dirty(self, path, meta_path, data, overlay_base=None, base_values=None):
+        """Programa la escritura del fichero de datos y/o de sus metadatos."""
+        if path and overlay_base:
+            # Del overlay solo se escribe el delta respecto a la base
+            header = overlay.header_for(overlay_base, path)
+
+            def snapshot():
+                rows = data.snapshot()
+                return lambda: overlay.render_delta(header, rows.triples(), base_values)
+            self.writer.mark_dirty(path, snapshot)
+        elif path:
+            # En el hilo de Tk solo se copian las columnas; el texto se genera en el de fondo
+            self.writer.mark_dirty(path, lambda: data.snapshot().to_snmprec)
+        if meta_path:
+            self.writer.mark_dirty(meta_path,
+                                   lambda: functools.partial(json.dumps, data.meta_dict(), indent=4),
+                                   must_exist=False)
+
+    def _on_flush_error(self, path, exc):
+        messagebox.showerror("Error al guardar", f"No se pudo guardar '{os.path.basename(path)}':\n{exc}")
 
     def _save_as_template(self):
         if not self.data: return
         tmpl_name = simpledialog.askstring("Nueva Plantilla", "Nombre para la plantilla:")
         if not tmpl_name: return
 
-        content_lines = []
-        for item in self.data:
-            content_lines.append(f"{item['oid']}|{item['tag']}|{item['value']}")
-        content_str = "\n".join(content_lines)
-
-        meta_dict = {}
-        for item in self.data:
-            if item.get("name") or item.get("ui_type") != "Text Entry":
-                meta_dict[item['oid']] = {"name": item.get("name", ""), "ui_type": item.get("ui_type", "Text Entry")}
-
-        new_template = {"content": content_str, "meta": meta_dict}
+        content_str = self.data.to_snmprec().rstrip("\n")
+        new_template = {"content": content_str, "meta": self.data.meta_dict()}
         json_path = "templates.json"
         current = {}
         
@@ -375,24 +450,32 @@ class DeviceEditor(ttk.Frame):
         if not self.current_file_path: return
         oid = simpledialog.askstring("Nuevo", "OID:")
         if oid:
-            if any(x['oid'] == oid for x in self.data):
+            if oid in self.data:
                 messagebox.showerror("Error", "OID duplicado")
                 return
-            self.data.append({"oid": oid, "tag": "2", "value": "0", "name": "", "ui_type": "Text Entry"})
+            self.data.add(oid, "2", "0")
             self._save_to_disk()
             self._save_metadata()
             self._refresh_editor_ui()
+            # Se inserta en su posición numérica, no al final: lo llevamos a la vista
+            self.table.see(self.data.position(oid))
 
     def _on_double_click_row(self, event):
-        item_id = self.tree.identify_row(event.y)
-        if not item_id: return
-        idx = self.tree.index(item_id)
+        idx = self.table.index_at(event.y)
+        if idx is None: return
         EditDialog(self, self.data[idx], self._on_edit_complete)
 
-    def _on_edit_complete(self):
+    def _on_edit_complete(self, item, old_oid, old_tag):
         self._save_to_disk()
         self._save_metadata()
+        # El responder contesta de memoria lo que movieron sliders/toggles: sin avisarle,
+        # lo editado aquí quedaría oculto mientras siga en marcha
+        if self.on_record_edited_callback:
+            self.on_record_edited_callback(self.current_file_path, old_oid, old_tag,
+                                           item['oid'], item['tag'], item['value'])
         self._refresh_editor_ui()
+        # Cambiar el OID mueve la fila: el panel se rehace con el nuevo orden
+        self._render_dashboard()
 
 
 # =======================================================
@@ -402,9 +485,12 @@ class EditDialog(tk.Toplevel):
     def __init__(self, parent, item_data, callback):
         super().__init__(parent)
         self.title("Editar OID")
-        self.geometry("380x500")
+        self.geometry("380x600")
         self.item = item_data
         self.callback = callback
+        # Lo que había antes de editar, para que el responder olvide el OID antiguo
+        self.old_oid = item_data['oid']
+        self.old_tag = item_data['tag']
         self._build()
 
     def _build(self):
@@ -437,16 +523,64 @@ class EditDialog(tk.Toplevel):
 
         ttk.Label(self, text="Tipo:").pack(**pad)
         cb_tag = ttk.Combobox(self, values=list(TAG_BY_NAME.keys()), state="readonly")
-        cb_tag.set(SNMP_TYPES.get(self.item['tag'], "Integer"))
+        cb_tag.set(SNMP_TYPES.get(dynamic_values.base_tag(self.item['tag']), "Integer"))
         cb_tag.pack(**pad)
 
+        # Valor calculado en el responder (gui/dynamic_values.py); el campo Valor lleva sus parámetros
+        ttk.Label(self, text="Valor dinámico:").pack(**pad)
+        cb_dyn = ttk.Combobox(self, values=[STATIC_VALUE] + list(dynamic_values.KINDS), state="readonly")
+        dynamic = dynamic_values.is_dynamic(self.item['tag'])
+        try:
+            cb_dyn.set(dynamic_values.parse(self.item['value'])["kind"] if dynamic else STATIC_VALUE)
+        except ValueError:
+            cb_dyn.set(STATIC_VALUE)
+        cb_dyn.pack(**pad)
+        hint = ttk.Label(self, foreground="gray", wraplength=340)
+        hint.pack(**pad)
+
+        def on_kind(event=None):
+            kind = cb_dyn.get()
+            if kind == STATIC_VALUE:
+                hint.config(text="")
+                return
+            params = ", ".join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                               for k, v in dynamic_values.KINDS[kind].items())
+            hint.config(text=f"Parámetros: {params}. Slider: {dynamic_values.LEVEL_PARAM[kind]}; Toggle: congelar.")
+            if event is not None:
+                try:
+                    current = dynamic_values.parse(e_val.get())["kind"]
+                except ValueError:
+                    current = None
+                if current != kind:
+                    old = e_val.get() if current is None else ""
+                    e_val.delete(0, tk.END)
+                    e_val.insert(0, dynamic_values.default_text(kind, old))
+
+        cb_dyn.bind("<<ComboboxSelected>>", on_kind)
+        on_kind()
+
         def save():
+            new_oid = e_oid.get()
+            if new_oid != self.item['oid'] and new_oid in self.item.store:
+                messagebox.showerror("Error", "OID duplicado", parent=self)
+                return
+            tag = TAG_BY_NAME.get(cb_tag.get(), "4")
+            if cb_dyn.get() != STATIC_VALUE:
+                if tag not in dynamic_values.NUMERIC_TAGS:
+                    messagebox.showerror("Error", "Los valores dinámicos necesitan un tipo numérico.", parent=self)
+                    return
+                try:
+                    dynamic_values.parse(e_val.get())
+                except ValueError as e:
+                    messagebox.showerror("Error", f"Parámetros no válidos: {e}", parent=self)
+                    return
+                tag = dynamic_values.dynamic_tag(tag)
             self.item['name'] = e_name.get()
             self.item['ui_type'] = cb_ui.get()
-            self.item['oid'] = e_oid.get()
+            self.item['oid'] = new_oid
             self.item['value'] = e_val.get()
-            self.item['tag'] = TAG_BY_NAME.get(cb_tag.get(), "4")
-            self.callback()
+            self.item['tag'] = tag
+            self.callback(self.item, self.old_oid, self.old_tag)
             self.destroy()
 
         ttk.Button(self, text="Guardar Cambios", command=save).pack(pady=20)
\ No newline at end of file
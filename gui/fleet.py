@@ -0,0 +1,170 @@
+"""Varios perfiles de profiles.json en marcha a la vez, cada uno con su propio runner.
+
+Cada perfil es un SNMPSimRunner independiente (sus workers, su supervisor,
+su canal de control) con métricas y logs en su propio subdirectorio de
+runtime; la caché de índices se comparte porque va por contenido. El
+arranque ya es asíncrono en cada runner, así que lanzar N perfiles es
+lanzar N arranques a la vez; para pararlos, cada stop() (que espera hasta
+2 s a sus workers) corre en su propio hilo y el total es el del más lento.
+
+No depende de Tk: lo usan el diálogo de perfiles de la TopBar y el modo
+headless con varios --profile.
+"""
+import os
+import re
+import threading
+from pathlib import Path
+
+from gui import utils
+from gui.snmpsim_runner import SNMPSimRunner
+
+
+def stop_all(runners):
+    """Para varios runners en paralelo y vuelve cuando han terminado todos."""
+    threads = [threading.Thread(target=runner.stop, daemon=True) for runner in runners]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "perfil"
+
+
+def profile_settings(profile):
+    """(ip, puerto, data_dir, workers) de un perfil, con los mismos valores por defecto que la TopBar."""
+    ip = str(profile.get("ip", "127.0.0.1")).strip()
+    port = str(profile.get("port", "1024")).strip()
+    data_dir = str(profile.get("data_dir", os.getcwd())).strip()
+    try:
+        workers = max(1, int(profile.get("workers", 1) or 1))
+    except (TypeError, ValueError):
+        workers = 1
+    return ip, port, data_dir, workers
+
+
+class ProfileFleet:
+
+    def __init__(self, on_output=None, log_level="info"):
+        self.on_output = on_output
+        self.log_level = log_level
+        # El mismo runtime que usa SNMPSimRunner (raíz del proyecto / runtime)
+        self.runtime_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent / "runtime"
+        self.runners = {}   # nombre de perfil -> SNMPSimRunner
+        self.profiles = {}  # nombre de perfil -> datos con los que se arrancó
+        self._lock = threading.Lock()
+
+    def _output_for(self, name):
+        def output(message):
+            if self.on_output:
+                self.on_output(f"[{name}] {message}")
+        return output
+
+    def _runner(self, name):
+        runner = self.runners.get(name)
+        if runner is None:
+            runner = SNMPSimRunner(on_output=self._output_for(name))
+            slug = _slug(name)
+            runner.metrics_file = runner.runtime_dir / "metrics" / f"{slug}.prom"
+            runner.log_dir = runner.runtime_dir / "logs" / slug
+            runner.set_log_level(self.log_level)
+            self.runners[name] = runner
+        return runner
+
+    def endpoints(self, exclude=()):
+        """Endpoints ocupados por los perfiles que no están parados."""
+        with self._lock:
+            return {runner.endpoint: name for name, runner in self.runners.items()
+                    if name not in exclude and runner.state != "stopped" and runner.endpoint}
+
+    def start(self, profiles, busy_endpoints=(), workers=None):
+        """Arranca a la vez los perfiles dados (nombre -> datos de profiles.json).
+
+        busy_endpoints son endpoints que ya usa alguien fuera de la flota (el
+        simulador principal). Devuelve {nombre: motivo} de los que no se lanzaron.
+        """
+        skipped = {}
+        taken = dict(self.endpoints())
+        taken.update({endpoint: "simulador principal" for endpoint in busy_endpoints})
+        with self._lock:
+            for name, profile in profiles.items():
+                if name in self.runners and self.runners[name].state != "stopped":
+                    skipped[name] = "ya está en marcha"
+                    continue
+                ip, port, data_dir, count = profile_settings(profile)
+                error = utils.validate_settings(ip, port, data_dir)
+                if error:
+                    skipped[name] = error[1]
+                    continue
+                endpoint = f"{ip}:{port}"
+                # Mismo puerto en 0.0.0.0 y en una IP concreta también choca
+                clash = taken.get(endpoint) or next(
+                    (owner for used, owner in taken.items()
+                     if used.rsplit(":", 1)[1] == port and "0.0.0.0" in (ip, used.rsplit(":", 1)[0])), None)
+                if clash:
+                    skipped[name] = f"{endpoint} ya lo usa {clash}"
+                    continue
+                taken[endpoint] = name
+                self.profiles[name] = profile
+                self._runner(name).start(endpoint, os.path.abspath(data_dir), workers=workers or count)
+
+        for name, reason in skipped.items():
+            self._output_for(name)(f"No se arranca: {reason}")
+        return skipped
+
+    def stop(self, names=None):
+        """Para los perfiles indicados (todos si names es None) en paralelo."""
+        with self._lock:
+            runners = [runner for name, runner in self.runners.items()
+                       if (names is None or name in names) and runner.state != "stopped"]
+        stop_all(runners)
+
+    def reload(self, names=None):
+        """Recarga en caliente los perfiles en marcha; devuelve los que la aceptaron."""
+        with self._lock:
+            items = list(self.runners.items())
+        return [name for name, runner in items
+                if (names is None or name in names) and runner.reload()]
+
+    def set_log_level(self, level):
+        self.log_level = level
+        with self._lock:
+            runners = list(self.runners.values())
+        for runner in runners:
+            runner.set_log_level(level)
+
+    def states(self):
+        with self._lock:
+            return {name: runner.state for name, runner in self.runners.items()}
+
+    def status(self):
+        """Una fila por perfil arrancado alguna vez: estado, endpoint, workers y carga."""
+        rows = []
+        with self._lock:
+            items = sorted(self.runners.items())
+        for name, runner in items:
+            snapshot = runner.metrics_snapshot()
+            alive = runner.alive_workers()
+            rows.append({
+                "name": name,
+                "state": runner.state,
+                "endpoint": runner.endpoint or "",
+                "data_dir": runner.data_dir or "",
+                "workers": f"{alive}/{runner.worker_count}" if runner.state != "stopped" else "",
+                "req_s": snapshot["req_s"] if snapshot else None,
+                "errors": snapshot["errors"] if snapshot else None,
+            })
+        return rows
+
+    def close(self):
+        """Para todo y cierra métricas y logs de cada runner."""
+        self.stop()
+        with self._lock:
+            runners = list(self.runners.values())
+        for runner in runners:
+            if runner.metrics is not None:
+                runner.metrics.close()
+            if runner.log_pipeline is not None:
+                runner.log_pipeline.close()
+
@@ -0,0 +1,179 @@
+"""Backends de índice para los .snmprec, intercambiables con el dbm de snmpsim.
+
+snmpsim (snmpsim.record.search.database) solo usa dbm.open(), whichdb() y el
+acceso tipo diccionario, así que cualquier objeto con esa interfaz sirve.
+
+- "sqlite": tabla B-tree en un único fichero. Se construye en una pasada con
+  inserciones por lotes dentro de una transacción y busca en O(log n), sin
+  pickle ni dbm nativo (funciona igual en el ejecutable de PyInstaller).
+  Se construye en un temporal y se publica con rename al cerrarlo: varios
+  workers pueden reconstruir la misma entrada a la vez y los demás solo ven
+  un índice completo.
+- "dumb": el dbm.dumb de la biblioteca estándar (comportamiento anterior).
+"""
+import os
+import sqlite3
+import threading
+import types
+
+from gui import index_cache
+
+DEFAULT_BACKEND = "sqlite"
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+BATCH_SIZE = 10000
+
+
+class SqliteIndex:
+    """Mapeo clave -> valor (bytes) con la API mínima de un objeto dbm."""
+
+    def __init__(self, path, flag="r"):
+        self.path = path
+        self._publish_to = None
+        self._batch = []
+        mode = flag[:1]
+
+        if mode == "n":
+            # Nunca se borra ni se reescribe el índice publicado: otro worker puede
+            # tenerlo abierto o estar comprobando su mtime en este momento
+            folder, name = os.path.split(path)
+            self._publish_to = path
+            self.path = os.path.join(folder, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            for stale in (self.path, self.path + "-journal"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        elif mode == "r" and not os.path.exists(path):
+            raise sqlite3.OperationalError(f"no existe el índice {path}")
+
+        if mode == "r":
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            # El índice se puede regenerar siempre desde el .snmprec: prima la velocidad
+            self.conn.execute("PRAGMA journal_mode=OFF")
+            self.conn.execute("PRAGMA synchronous=OFF")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS idx (k TEXT PRIMARY KEY, v BLOB NOT NULL) WITHOUT ROWID")
+
+    @staticmethod
+    def _key(key):
+        return key.decode("utf-8") if isinstance(key, bytes) else str(key)
+
+    def _flush(self):
+        if self._batch:
+            self.conn.executemany("INSERT OR REPLACE INTO idx (k, v) VALUES (?, ?)", self._batch)
+            self._batch = []
+
+    def __setitem__(self, key, value):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self._batch.append((self._key(key), value))
+        if len(self._batch) >= BATCH_SIZE:
+            self._flush()
+
+    def __getitem__(self, key):
+        self._flush()
+        row = self.conn.execute("SELECT v FROM idx WHERE k = ?", (self._key(key),)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return bytes(row[0])
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        self._flush()
+        return [row[0].encode("utf-8") for row in self.conn.execute("SELECT k FROM idx")]
+
+    def __len__(self):
+        self._flush()
+        return self.conn.execute("SELECT COUNT(*) FROM idx").fetchone()[0]
+
+    def sync(self):
+        self._flush()
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.sync()
+            self.conn.close()
+            self.conn = None
+            if self._publish_to is not None:
+                self._publish()
+
+    def _publish(self):
+        built, self.path, self._publish_to = self.path, self._publish_to, None
+        try:
+            os.replace(built, self.path)
+        except OSError:
+            # En Windows falla si otro proceso tiene abierto el destino. La entrada va
+            # por contenido, así que el índice que ya está ahí es igual de válido
+            try:
+                os.remove(built)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _sqlite_open(file, flag="r", mode=0o666):
+    return SqliteIndex(file, flag)
+
+
+def _sqlite_whichdb(file):
+    """Como dbm.whichdb: None si no existe, "" si no se reconoce el formato."""
+    try:
+        with open(file, "rb") as f:
+            header = f.read(len(SQLITE_MAGIC))
+    except OSError:
+        return None
+    return "sqlite" if header == SQLITE_MAGIC else ""
+
+
+def _dumb_module():
+    import dbm
+    import dbm.dumb
+    return types.SimpleNamespace(name="dumb", open=dbm.dumb.open, whichdb=dbm.whichdb,
+                                 error=dbm.dumb.error, single_file=False)
+
+
+BACKENDS = {
+    "sqlite": lambda: types.SimpleNamespace(name="sqlite", open=_sqlite_open, whichdb=_sqlite_whichdb,
+                                            error=sqlite3.Error, single_file=True),
+    "dumb": _dumb_module,
+}
+
+
+def get_backend(name=None):
+    try:
+        return BACKENDS[name or DEFAULT_BACKEND]()
+    except KeyError:
+        raise ValueError(f"Backend de índice desconocido: {name}") from None
+
+
+def install(name=None):
+    """Sustituye el dbm que usa snmpsim para construir y leer los índices."""
+    from snmpsim.record.search import database
+
+    backend = get_backend(name)
+    database.dbm = backend
+    database.whichdb = backend
+    if backend.single_file:
+        # Sin variantes .db/.dat: así un índice dumb antiguo no fuerza reconstrucciones
+        database.RecordIndex._db_files = property(lambda self: (self._db_file,))
+    # Los índices viven en la caché por contenido, no junto a los datos
+    index_cache.install(backend.name)
+    return backend
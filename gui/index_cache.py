@@ -0,0 +1,205 @@
+"""Caché de índices direccionada por contenido, fuera del directorio de datos.
+
+snmpsim nombra cada índice según la ruta del .snmprec y lo reconstruye en
+cuanto el fichero de datos es más nuevo que el índice. Aquí el nombre sale
+del contenido (sha1 + tamaño) y del backend:
+
+    <cache-dir>/index/<sha1>-<tamaño>.<backend>.dbm
+
+Dos ficheros idénticos comparten índice, copiar o tocar un fichero no obliga
+a reindexar y un reinicio reutiliza todo lo que ya existe. Para no leer los
+ficheros en cada arranque, manifest.json recuerda el hash de cada ruta junto
+a su tamaño y mtime; si ambos coinciden no se vuelve a calcular.
+
+Cada uso de una entrada actualiza su mtime, y collect_garbage() borra las
+menos usadas recientemente hasta quedar dentro del presupuesto de tamaño.
+"""
+import hashlib
+import json
+import os
+import time
+
+from gui.writeback import atomic_write
+
+STORE_DIR = "index"
+MANIFEST_FILE = "manifest.json"
+DEFAULT_BUDGET = 2 * 1024 ** 3  # bytes
+# Entradas usadas hace menos que esto no se borran: pueden ser de otro proceso
+# (otra instancia de la GUI, el modo headless) que las acaba de construir o abrir
+RECENT_USE = 600  # segundos
+# Un índice a medio construir (.<entrada>.<pid>.<hilo>.tmp) más viejo que esto quedó huérfano
+STALE_BUILD_AGE = 3600  # segundos
+# Ficheros que puede dejar un índice: sqlite usa uno; dbm.dumb, .dat/.dir/.bak
+INDEX_SUFFIXES = ("", ".db", ".dat", ".dir", ".bak")
+
+_backend_name = None
+_manifest = None  # manifest leído por este proceso (los workers no lo escriben)
+
+
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def store_dir(cache_dir):
+    return os.path.join(cache_dir, STORE_DIR)
+
+
+class Manifest:
+    """Ruta absoluta -> (tamaño, mtime_ns, sha1) de los ficheros ya vistos."""
+
+    def __init__(self, folder):
+        self.path = os.path.join(folder, MANIFEST_FILE)
+        self.entries = self._read()
+        self._dirty = {}
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, path, st):
+        entry = self.entries.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def digest(self, path, st=None):
+        """Hash del fichero, calculándolo solo si cambió tamaño o mtime."""
+        path = os.path.abspath(path)
+        st = st or os.stat(path)
+        known = self.lookup(path, st)
+        if known is None:
+            known = file_digest(path)
+            self.record(path, st, known)
+        return known
+
+    def record(self, path, st, digest):
+        entry = [st.st_size, st.st_mtime_ns, digest]
+        self.entries[path] = entry
+        self._dirty[path] = entry
+
+    def save(self):
+        """Mezcla con lo que haya en disco y descarta rutas que ya no existen."""
+        if not self._dirty:
+            return
+        merged = self._read()
+        merged.update(self._dirty)
+        merged = {p: e for p, e in merged.items() if os.path.exists(p)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        atomic_write(self.path, json.dumps(merged))
+        self.entries = merged
+        self._dirty = {}
+
+
+def entry_path(folder, digest, size, backend):
+    return os.path.join(folder, f"{digest}-{size}.{backend}.dbm")
+
+
+def _touch(db_file, text_mtime=0):
+    # Marca de uso para el LRU; además deja el índice más nuevo que el fichero de
+    # datos, que es lo que snmpsim comprueba para no reconstruirlo. Compara en
+    # segundos enteros: un fichero recién escrito necesita un segundo de margen
+    now = max(time.time(), int(text_mtime) + 1)
+    for suffix in INDEX_SUFFIXES:
+        try:
+            os.utime(db_file + suffix, (now, now))
+        except OSError:
+            pass
+
+
+def resolve(text_file, cache_dir, backend, manifest=None):
+    """Ruta del índice de text_file dentro de la caché (sin crearlo)."""
+    folder = store_dir(cache_dir)
+    os.makedirs(folder, exist_ok=True)
+    st = os.stat(text_file)
+    manifest = manifest or Manifest(folder)
+    db_file = entry_path(folder, manifest.digest(text_file, st), st.st_size, backend)
+    _touch(db_file, st.st_mtime)
+    return db_file
+
+
+def install(backend_name):
+    """Hace que RecordIndex busque y cree sus índices en la caché por contenido."""
+    global _backend_name
+    from snmpsim import confdir
+    from snmpsim.record.search.database import RecordIndex
+
+    _backend_name = backend_name
+    if getattr(RecordIndex, "_gui_content_addressed", False):
+        return
+
+    original_create = RecordIndex.create
+
+    def create(self, *args, **kwargs):
+        # Se resuelve en cada create(): si el fichero cambia, cambia también su entrada
+        global _manifest
+        folder = store_dir(confdir.cache)
+        if _manifest is None or _manifest.path != os.path.join(folder, MANIFEST_FILE):
+            _manifest = Manifest(folder)
+        self._db_file = resolve(self._text_file, confdir.cache, _backend_name, _manifest)
+        result = original_create(self, *args, **kwargs)
+        # Un índice recién construido puede quedar en el mismo segundo que el fichero
+        _touch(self._db_file, os.stat(self._text_file).st_mtime)
+        return result
+
+    RecordIndex.create = create
+    RecordIndex._gui_content_addressed = True
+
+
+def collect_garbage(cache_dir, budget=DEFAULT_BUDGET, keep=(), min_age=RECENT_USE):
+    """Borra las entradas menos usadas hasta que la caché ocupe como mucho budget bytes.
+
+    keep son rutas de índices en uso que no se tocan, como tampoco las usadas
+    hace menos de min_age segundos. Devuelve (entradas borradas, bytes liberados).
+    """
+    folder = store_dir(cache_dir)
+    keep = {os.path.basename(p).split(".", 1)[0] for p in keep}
+    groups = {}  # <sha1>-<tamaño> -> [bytes, último uso, ficheros]
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return 0, 0
+    now = time.time()
+    for name in names:
+        if name.startswith(".") and name.endswith(".tmp"):
+            # Construcción interrumpida (proceso muerto a mitad): no la reclama nadie
+            path = os.path.join(folder, name)
+            try:
+                if now - os.stat(path).st_mtime > STALE_BUILD_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+            continue
+        if name == MANIFEST_FILE or name.startswith("."):
+            continue
+        try:
+            st = os.stat(os.path.join(folder, name))
+        except OSError:
+            continue
+        group = groups.setdefault(name.split(".", 1)[0], [0, 0.0, []])
+        group[0] += st.st_size
+        group[1] = max(group[1], st.st_mtime)
+        group[2].append(name)
+
+    total = sum(g[0] for g in groups.values())
+    removed = freed = 0
+    for stem, (size, last_use, files) in sorted(groups.items(), key=lambda kv: kv[1][1]):
+        if total <= budget:
+            break
+        if stem in keep or now - last_use < min_age:
+            continue
+        for name in files:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+        total -= size
+        freed += size
+        removed += 1
+    return removed, freed
@@ -1,21 +1,54 @@
 import sys
 import asyncio
 import os
+import socket
 
-# Forzamos compatibilidad antes de importar snmpsim
-if sys.platform == 'win32':
-    asyncio.set_event_loop_policy(asyncio._WindowsSelectorEventLoopPolicy())
+# Permite "python gui/launcher.py" sin instalar el paquete
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
 
-# Creamos un loop explícito para evitar el error "There is no current event loop"
-try:
-    loop = asyncio.get_event_loop()
-except RuntimeError:
+
+def _enable_reuseport(port: int):
+    """Marca con SO_REUSEPORT el socket UDP del agente para que varios workers compartan el puerto."""
+    original_bind = socket.socket.bind
+
+    def bind(sock, address):
+        if sock.type == socket.SOCK_DGRAM and isinstance(address, tuple) and address[1] == port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        return original_bind(sock, address)
+
+    socket.socket.bind = bind
+
+
+def main():
+    # Forzamos compatibilidad antes de importar snmpsim
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio._WindowsSelectorEventLoopPolicy())
+
+    reuse_port = os.environ.get("SNMPSIM_GUI_REUSEPORT")
+    if reuse_port and hasattr(socket, "SO_REUSEPORT"):
+        _enable_reuseport(int(reuse_port))
+
+    # Creamos un loop explícito para evitar el error "There is no current event loop"
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
-# Ahora sí importamos y ejecutamos snmpsim
-from snmpsim.commands import responder
+    # Extensiones de la GUI (canal de control, overrides en memoria...)
+    from gui import responder_hooks
+    responder_hooks.install()
+    # Se ejecuta en la primera vuelta del bucle: datos cargados y sockets abiertos
+    loop.call_soon(responder_hooks.mark_ready)
+
+    # Ahora sí importamos y ejecutamos snmpsim
+    from snmpsim.commands import responder
+
+    try:
+        return responder.main()
+    finally:
+        loop.close()
+
 
 if __name__ == "__main__":
     # Pasamos el control al main de snmpsim
-    sys.exit(responder.main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Salida del responder convertida en eventos estructurados, muestreada y rotada a disco.
+
+En el worker, responder_hooks sustituye log.error/info/debug de snmpsim por
+emit(): cada mensaje sale ya como evento (nivel, categoría, comunidad, OID,
+PDU) en una línea JSON marcada. Lo que no pasa por snmpsim (avisos de
+Python, trazas, el ejecutable congelado sin hooks) se interpreta con
+parse_line() a partir del texto.
+
+En la GUI, LogPipeline escribe todos los eventos en runtime/logs con
+rotación por tamaño y solo reenvía a la consola los que pasan el filtro de
+nivel, el muestreo (1 de cada N) y el límite por segundo de su categoría.
+Lo descartado se resume periódicamente en una sola línea.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+EVENT_MARKER = "\x1e"  # prefijo de las líneas JSON que emite el worker
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# categoría -> (muestreo: 1 de cada N, máximo de eventos por segundo en consola)
+CATEGORY_LIMITS = {
+    "request": (10, 20),
+    "context": (10, 20),
+    "debug": (50, 10),
+    "error": (1, 50),
+    "other": (1, 100),
+}
+SUMMARY_INTERVAL = 2.0
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+
+_REQUEST_RE = re.compile(r"Request var-binds: (?P<oids>.*), flags: (?P<flags>\w+), (?P<op>\w+)")
+_CONTEXT_RE = re.compile(r"Using (?P<path>\S+) controller|contextName \"(?P<context>[^\"]*)\"")
+# Trazas que snmpsim escribe en cada petición además de la línea "Request var-binds"
+_PER_REQUEST_PREFIXES = ("Response var-binds", "SNMP EngineID")
+_OID_RE = re.compile(r"(\d+(?:\.\d+){3,})")
+
+# Ficheros que registró snmpsim en este proceso (los anota responder_hooks): ruta -> comunidad
+_REGISTERED = {}
+
+
+def register_community(path, community):
+    _REGISTERED[os.path.abspath(path)] = community
+
+
+def community_of(path, data_dirs=()):
+    """Comunidad de un fichero de datos: la que registró snmpsim para él.
+
+    Sin registro (fuera del worker), la ruta relativa al directorio de datos
+    sin extensión y con "/", que es como la forma snmpsim; si tampoco está en
+    ninguno, el nombre del fichero sin extensión.
+    """
+    path = os.path.abspath(path)
+    community = _REGISTERED.get(path)
+    if community is not None:
+        return community
+    for data_dir in data_dirs:
+        relative = os.path.relpath(path, os.path.abspath(data_dir))
+        if relative != os.pardir and not relative.startswith(os.pardir + os.sep):
+            return os.path.splitext(relative)[0].replace(os.sep, "/")
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def parse_message(level, text, community=None):
+    """Evento a partir de un mensaje de snmpsim ya separado de su nivel."""
+    event = {"t": time.time(), "level": level, "msg": text, "cat": "other"}
+    match = _REQUEST_RE.search(text)
+    if match:
+        event["cat"] = "request"
+        flags, op = match.group("flags"), match.group("op")
+        event["pdu"] = "set" if op == "SET" else ("getnext" if flags == "NEXT" else "get")
+        oid = _OID_RE.search(match.group("oids"))
+        if oid:
+            event["oid"] = oid.group(1)
+        if community:
+            event["community"] = community
+        return event
+    match = _CONTEXT_RE.search(text)
+    if match and "Using " in text:
+        event["cat"] = "context"
+        path = match.group("path")
+        # La comunidad es el nombre del fichero de datos (snmpsim muestra el hash del contexto)
+        event["community"] = community_of(path) if path else match.group("context")
+        return event
+    if text.startswith(_PER_REQUEST_PREFIXES):
+        event["cat"] = "request"
+        if community and text.startswith("Response"):  # "SNMP EngineID" va antes del contexto
+            event["community"] = community
+    if level == "error":
+        event["cat"] = "error"
+    elif level == "debug":
+        event["cat"] = "debug"
+    oid = _OID_RE.search(text)
+    if oid:
+        event["oid"] = oid.group(1)
+    return event
+
+
+def parse_line(line):
+    """Evento a partir de una línea de salida (JSON del worker o texto plano)."""
+    if line.startswith(EVENT_MARKER):
+        try:
+            return json.loads(line[len(EVENT_MARKER):])
+        except ValueError:
+            line = line[len(EVENT_MARKER):]
+    level = "info"
+    text = line
+    if line.startswith("ERROR ") or line.startswith("Traceback") or "Error:" in line:
+        level, text = "error", line[6:] if line.startswith("ERROR ") else line
+    elif line.startswith("DEBUG "):
+        level, text = "debug", line[6:]
+    elif "Warning:" in line:
+        level = "warning"
+    return parse_message(level, text.strip())
+
+
+def emit(level, text, community=None, stream=None):
+    """Lado worker: escribe el evento como una línea JSON marcada en stderr (sin búfer)."""
+    event = parse_message(level, text, community)
+    (stream or sys.stderr).write(EVENT_MARKER + json.dumps(event, ensure_ascii=False) + "\n")
+    return event
+
+
+def format_event(event, source=""):
+    parts = [source + event["level"].upper()]
+    context = "/".join(event[key] for key in ("community", "pdu") if event.get(key))
+    if context:
+        parts.append(f"[{context}]")
+    if event.get("oid") and event["oid"] not in event["msg"]:
+        parts.append(event["oid"])
+    parts.append(event["msg"])
+    return " ".join(parts)
+
+
+class LogPipeline:
+    """Reparte la salida de los workers entre disco (todo) y consola (filtrado).
+
+    feed() se llama desde los hilos lectores del runner; es seguro entre hilos.
+    """
+
+    def __init__(self, on_output, log_dir, level="info", limits=None):
+        self.on_output = on_output
+        self.level = level
+        self.limits = dict(CATEGORY_LIMITS, **(limits or {}))
+        self._lock = threading.Lock()
+        self._seen = {}     # categoría -> eventos vistos (para el muestreo)
+        self._window = {}   # categoría -> [inicio del segundo, enviados en él]
+        self._dropped = {}  # categoría -> descartados desde el último resumen
+        self._stop = threading.Event()
+
+        os.makedirs(log_dir, exist_ok=True)
+        self.log_path = os.path.join(log_dir, "responder.log")
+        self.logger = logging.getLogger(f"snmpsim_gui.responder.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        handler = RotatingFileHandler(self.log_path, maxBytes=LOG_MAX_BYTES,
+                                      backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(handler)
+
+        threading.Thread(target=self._summarize, daemon=True).start()
+
+    def set_level(self, level):
+        self.level = level
+
+    def feed(self, line, source=""):
+        if not line.strip():
+            return
+        event = parse_line(line)
+        text = format_event(event, source)
+        self.logger.log(LEVELS.get(event["level"], logging.INFO), text)
+        if self.on_output and self._admit(event):
+            self.on_output(text)
+
+    def _admit(self, event):
+        if LEVELS.get(event["level"], 20) < LEVELS.get(self.level, 20):
+            return False
+        category = event.get("cat", "other")
+        sample, per_second = self.limits.get(category, self.limits["other"])
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen[category] = self._seen.get(category, 0) + 1
+            window = self._window.setdefault(category, [now, 0])
+            if now - window[0] >= 1.0:
+                window[0], window[1] = now, 0
+            if seen % sample == 0 and window[1] < per_second:
+                window[1] += 1
+                return True
+            self._dropped[category] = self._dropped.get(category, 0) + 1
+            return False
+
+    def _summarize(self):
+        while not self._stop.wait(SUMMARY_INTERVAL):
+            with self._lock:
+                dropped, self._dropped = self._dropped, {}
+            if dropped and self.on_output:
+                detail = ", ".join(f"{n} {category}" for category, n in sorted(dropped.items()))
+                self.on_output(f"... consola: omitidos {detail} (completo en {self.log_path})")
+
+    def close(self):
+        self._stop.set()
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
@@ -0,0 +1,233 @@
+"""Métricas del responder: peticiones por comunidad y PDU, errores y latencia.
+
+Dentro de cada worker, MetricsRecorder acumula contadores en memoria (una
+suma y un incremento de histograma por petición) y cada segundo envía el
+delta por UDP a loopback, troceado en datagramas pequeños. En la GUI,
+MetricsCollector suma lo que llega de todos los workers, calcula req/s sobre
+una ventana deslizante y vuelca el total a un textfile de Prometheus (para
+el textfile collector de node_exporter).
+"""
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from gui.control_channel import CONTROL_HOST, MAX_DATAGRAM
+from gui.writeback import atomic_write
+
+# Límites superiores (segundos) de los cubos del histograma de latencia
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+FLUSH_INTERVAL = 1.0
+RATE_WINDOW = 5.0
+ENTRIES_PER_DATAGRAM = 400
+
+
+class MetricsRecorder:
+    """Lado worker: record() se llama en el camino de cada petición."""
+
+    def __init__(self, port, interval=FLUSH_INTERVAL):
+        self.port = int(port)
+        self.interval = interval
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._lock = threading.Lock()
+        self._counts = {}  # (comunidad, pdu) -> [peticiones, errores]
+        self._hist = {}    # pdu -> [cubo 0..n, +Inf, suma de segundos]
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def record(self, community, pdu, seconds, error=False):
+        with self._lock:
+            counts = self._counts.get((community, pdu))
+            if counts is None:
+                counts = self._counts[(community, pdu)] = [0, 0]
+            counts[0] += 1
+            if error:
+                counts[1] += 1
+            hist = self._hist.get(pdu)
+            if hist is None:
+                hist = self._hist[pdu] = [0] * (len(LATENCY_BUCKETS) + 2)
+            hist[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            hist[-1] += seconds
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                counts, self._counts = self._counts, {}
+                hist, self._hist = self._hist, {}
+            if counts:
+                self._send(counts, hist)
+
+    def _send(self, counts, hist):
+        entries = [[community, pdu, n, errors] for (community, pdu), (n, errors) in counts.items()]
+        for start in range(0, len(entries), ENTRIES_PER_DATAGRAM):
+            msg = {"pid": os.getpid(), "counts": entries[start:start + ENTRIES_PER_DATAGRAM]}
+            if start == 0:
+                msg["hist"] = hist
+            try:
+                self.sock.sendto(json.dumps(msg).encode("utf-8"), (CONTROL_HOST, self.port))
+            except OSError:
+                pass  # las métricas nunca tumban al responder
+
+
+class MetricsCollector:
+    """Lado GUI: agrega los deltas de todos los workers en un hilo propio."""
+
+    def __init__(self, textfile=None):
+        self.textfile = textfile
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((CONTROL_HOST, 0))
+        self.sock.settimeout(FLUSH_INTERVAL)
+        self.port = self.sock.getsockname()[1]
+        self._lock = threading.Lock()
+        self._closed = False
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}  # (comunidad, pdu) -> [peticiones, errores] acumulados
+            self.hist = {}    # pdu -> histograma acumulado
+            self.workers = {}  # pid -> hora del último informe
+            self._recent = deque()  # (hora, peticiones) dentro de RATE_WINDOW
+            self.started = time.monotonic()
+
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def close(self):
+        self._closed = True
+        self.sock.close()
+
+    def _serve(self):
+        last_write = 0.0
+        while not self._closed:
+            try:
+                data, _ = self.sock.recvfrom(MAX_DATAGRAM)
+                self._merge(json.loads(data.decode("utf-8")))
+            except socket.timeout:
+                pass
+            except (OSError, ValueError):
+                if self._closed:
+                    return
+            now = time.monotonic()
+            if self.textfile and now - last_write >= FLUSH_INTERVAL:
+                last_write = now
+                try:
+                    self.write_textfile(self.textfile)
+                except OSError:
+                    pass
+
+    def _merge(self, msg):
+        now = time.monotonic()
+        total = 0
+        with self._lock:
+            self.workers[msg.get("pid")] = now
+            for community, pdu, n, errors in msg.get("counts", []):
+                counts = self.counts.setdefault((community, pdu), [0, 0])
+                counts[0] += n
+                counts[1] += errors
+                total += n
+            for pdu, buckets in msg.get("hist", {}).items():
+                acc = self.hist.get(pdu)
+                if acc is None:
+                    self.hist[pdu] = list(buckets)
+                else:
+                    for i, value in enumerate(buckets):
+                        acc[i] += value
+            self._recent.append((now, total))
+
+    def _rate(self, now):
+        while self._recent and now - self._recent[0][0] > RATE_WINDOW:
+            self._recent.popleft()
+        window = min(RATE_WINDOW, max(now - self.started, FLUSH_INTERVAL))
+        return sum(n for _, n in self._recent) / window
+
+    @staticmethod
+    def _quantile(buckets, q):
+        count = sum(buckets[:-1])
+        if not count:
+            return None
+        target = q * count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+    def snapshot(self):
+        """Resumen para la GUI: req/s, totales por PDU, errores y p50/p99 (cota superior del cubo)."""
+        now = time.monotonic()
+        with self._lock:
+            by_pdu = {}
+            errors = 0
+            for (_, pdu), (n, err) in self.counts.items():
+                by_pdu[pdu] = by_pdu.get(pdu, 0) + n
+                errors += err
+            merged = [0] * (len(LATENCY_BUCKETS) + 2)
+            for buckets in self.hist.values():
+                for i, value in enumerate(buckets):
+                    merged[i] += value
+            return {
+                "req_s": self._rate(now),
+                "total": sum(by_pdu.values()),
+                "errors": errors,
+                "by_pdu": by_pdu,
+                "communities": len({community for community, _ in self.counts}),
+                "workers": sum(1 for seen in self.workers.values() if now - seen <= RATE_WINDOW),
+                "p50": self._quantile(merged, 0.5),
+                "p99": self._quantile(merged, 0.99),
+            }
+
+    def write_textfile(self, path):
+        """Formato de exposición de Prometheus, escrito de forma atómica."""
+        snap = self.snapshot()
+        with self._lock:
+            counts = sorted(self.counts.items())
+            hist = sorted((pdu, list(buckets)) for pdu, buckets in self.hist.items())
+
+        lines = [
+            "# HELP snmpsim_requests_total Peticiones SNMP atendidas.",
+            "# TYPE snmpsim_requests_total counter",
+        ]
+        lines += [f'snmpsim_requests_total{{community="{_label(c)}",pdu="{pdu}"}} {n}'
+                  for (c, pdu), (n, _) in counts]
+        lines += [
+            "# HELP snmpsim_request_errors_total Peticiones con error (comunidad desconocida, OID inexistente...).",
+            "# TYPE snmpsim_request_errors_total counter",
+        ]
+        lines += [f'snmpsim_request_errors_total{{community="{_label(c)}",pdu="{pdu}"}} {err}'
+                  for (c, pdu), (_, err) in counts]
+        lines += [
+            "# HELP snmpsim_request_duration_seconds Tiempo de proceso de cada petición en el responder.",
+            "# TYPE snmpsim_request_duration_seconds histogram",
+        ]
+        for pdu, buckets in hist:
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'snmpsim_request_duration_seconds_bucket{{pdu="{pdu}",le="{le}"}} {cumulative}')
+            lines.append(f'snmpsim_request_duration_seconds_sum{{pdu="{pdu}"}} {buckets[-1]:.6f}')
+            lines.append(f'snmpsim_request_duration_seconds_count{{pdu="{pdu}"}} {cumulative}')
+        lines += [
+            "# HELP snmpsim_requests_per_second Ritmo de peticiones en los últimos segundos.",
+            "# TYPE snmpsim_requests_per_second gauge",
+            f"snmpsim_requests_per_second {snap['req_s']:.3f}",
+            "# HELP snmpsim_workers Workers que han informado recientemente.",
+            "# TYPE snmpsim_workers gauge",
+            f"snmpsim_workers {snap['workers']}",
+        ]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Legible por el textfile collector de node_exporter, que corre con su propio usuario
+        atomic_write(path, "\n".join(lines) + "\n", mode=0o644)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
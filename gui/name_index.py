@@ -0,0 +1,76 @@
+"""Índice de trigramas sobre los nombres de dispositivo para el buscador del sidebar.
+
+Cada nombre (sin extensión, en minúsculas) se descompone en sus trigramas; una
+búsqueda de 3 o más caracteres intersecta los conjuntos de sus trigramas,
+empezando por el más pequeño, y solo verifica la subcadena sobre esos
+candidatos. Las consultas de 1-2 caracteres, que casan con casi todo, se
+resuelven con un recorrido sobre las claves ya normalizadas.
+"""
+import os
+from collections import defaultdict
+
+
+def name_key(filename):
+    return os.path.splitext(filename)[0].lower()
+
+
+def _trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class NameIndex:
+
+    def __init__(self):
+        self._keys = {}                  # fichero -> clave normalizada
+        self._grams = defaultdict(set)   # trigrama -> ficheros que lo contienen
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._grams.clear()
+
+    def add(self, filename):
+        if filename in self._keys:
+            return
+        key = self._keys[filename] = name_key(filename)
+        for gram in _trigrams(key):
+            self._grams[gram].add(filename)
+
+    def remove(self, filename):
+        key = self._keys.pop(filename, None)
+        if key is None:
+            return
+        for gram in _trigrams(key):
+            bucket = self._grams.get(gram)
+            if bucket is not None:
+                bucket.discard(filename)
+                if not bucket:
+                    del self._grams[gram]
+
+    def matches(self, filename, query):
+        """¿Casa un fichero (indexado o no) con la consulta ya en minúsculas?"""
+        key = self._keys.get(filename)
+        return query in (key if key is not None else name_key(filename))
+
+    def search(self, query):
+        """Conjunto de ficheros cuyo nombre contiene 'query' (en minúsculas)."""
+        if len(query) < 3:
+            return {f for f, key in self._keys.items() if query in key}
+
+        buckets = []
+        for gram in _trigrams(query):
+            bucket = self._grams.get(gram)
+            if not bucket:
+                return set()
+            buckets.append(bucket)
+        buckets.sort(key=len)
+
+        candidates = set(buckets[0])
+        for bucket in buckets[1:]:
+            candidates &= bucket
+            if not candidates:
+                return candidates
+        # Los trigramas no garantizan el orden: confirmamos la subcadena
+        return {f for f in candidates if query in self._keys[f]}
@@ -0,0 +1,92 @@
+"""Pasada de "ordenar y normalizar" sobre los .snmprec de un directorio de datos.
+
+Cada fichero queda con sus registros en orden numérico de OID, sin líneas
+vacías ni OIDs repetidos (gana el último, como en el responder) y con los
+comentarios al principio. Los ficheros son independientes, así que se
+reparten entre procesos; solo se reescriben (de forma atómica) los que
+cambian.
+
+Uso: python -m gui.normalize DATA_DIR [--workers N]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui.dir_watcher import scan_dir
+from gui.record_store import oid_key
+from gui.writeback import atomic_write
+
+
+def normalize_text(text):
+    """Devuelve el contenido normalizado y el número de registros."""
+    comments = []
+    records = {}
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            comments.append(line)
+            continue
+        parts = line.split("|", 2)
+        if len(parts) != 3:
+            raise ValueError(f"línea {lineno} no válida: {line[:60]}")
+        records[parts[0]] = line  # un OID repetido se queda con la última línea
+
+    ordered = sorted(records.items(), key=lambda kv: oid_key(kv[0]))
+    lines = comments + [line for _, line in ordered]
+    return "".join(f"{line}\n" for line in lines), len(ordered)
+
+
+def normalize_file(path):
+    """Normaliza un fichero; pensado para ejecutarse en un proceso del pool."""
+    result = {"path": path, "changed": False, "records": 0, "error": None}
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            original = f.read()
+        content, result["records"] = normalize_text(original)
+        if content != original:
+            atomic_write(path, content)
+            result["changed"] = True
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+    return result
+
+
+def normalize_dir(data_dir, workers=None):
+    """Normaliza todos los .snmprec de data_dir en paralelo; devuelve un resultado por fichero."""
+    paths = [os.path.join(data_dir, name) for name in sorted(scan_dir(data_dir))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    if workers == 1:
+        return [normalize_file(p) for p in paths]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(normalize_file, paths, chunksize=max(1, len(paths) // (workers * 8))))
+
+
+def summarize(results):
+    changed = sum(1 for r in results if r["changed"])
+    failed = [r for r in results if r["error"]]
+    return changed, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ordena y normaliza los .snmprec de un directorio.")
+    parser.add_argument("data_dir")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, uno por CPU)")
+    args = parser.parse_args(argv)
+
+    results = normalize_dir(args.data_dir, args.workers)
+    changed, failed = summarize(results)
+    print(f"{len(results)} ficheros, {changed} reescritos, {len(failed)} con errores")
+    for r in failed:
+        print(f"  {os.path.basename(r['path'])}: {r['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
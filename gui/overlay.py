@@ -0,0 +1,112 @@
+"""Dispositivos overlay: una base compartida más un delta pequeño.
+
+Un overlay es un .snmprec normal cuya primera línea es un comentario
+
+    # overlay-base: .bases/3f2a9c....snmpbase
+
+seguido de una marca por cada OID de la base que el overlay ya no tiene
+(borrado o renombrado en el editor)
+
+    # overlay-deleted: 1.3.6.1.2.1.1.5.0
+
+y solo de los OIDs (ordenados) que difieren de la base. snmpsim ignora
+los comentarios, así que el fichero es válido por sí mismo; los hooks del
+responder resuelven cada petición contra el delta y, si no está ahí, contra
+la base (saltando los OIDs marcados), que se indexa una sola vez para todos
+los overlays que la usan.
+
+Las bases se guardan por contenido en DATA_DIR/.bases/<sha1>.snmpbase: la
+extensión no es de snmpsim (no se publican como comunidad) y duplicar dos
+veces el mismo dispositivo reutiliza la misma base.
+"""
+import hashlib
+import os
+import shutil
+
+from gui.record_store import oid_key
+
+OVERLAY_PREFIX = "# overlay-base:"
+DELETED_PREFIX = "# overlay-deleted:"
+BASES_DIR = ".bases"
+BASE_SUFFIX = ".snmpbase"
+
+
+def read_base(path):
+    """Ruta absoluta de la base de un overlay, o None si el fichero no es un overlay."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            first = f.readline(4096)
+    except OSError:
+        return None
+    if not first.startswith(OVERLAY_PREFIX):
+        return None
+    ref = first[len(OVERLAY_PREFIX):].strip()
+    if not ref:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)), ref))
+
+
+def read_deleted(path):
+    """OIDs de la base que el overlay quitó. Las marcas van justo tras la cabecera."""
+    deleted = set()
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith(DELETED_PREFIX):
+                    oid = line[len(DELETED_PREFIX):].strip()
+                    if oid:
+                        deleted.add(oid)
+                elif not line.startswith("#"):
+                    break
+    except OSError:
+        pass
+    return deleted
+
+
+def header_for(base_path, overlay_path):
+    ref = os.path.relpath(base_path, os.path.dirname(os.path.abspath(overlay_path)))
+    return f"{OVERLAY_PREFIX} {ref.replace(os.sep, '/')}\n"
+
+
+def snapshot_base(src_path, data_dir):
+    """Copia (una vez) el contenido de src_path como base direccionada por su hash."""
+    digest = hashlib.sha1()
+    with open(src_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    folder = os.path.join(data_dir, BASES_DIR)
+    os.makedirs(folder, exist_ok=True)
+    base_path = os.path.join(folder, digest.hexdigest() + BASE_SUFFIX)
+    if not os.path.exists(base_path):
+        tmp_path = base_path + ".tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, base_path)
+    return base_path
+
+
+def make_overlay(src_path, dest_path):
+    """Crea dest_path como overlay de src_path.
+
+    Si src_path ya es un overlay se copia tal cual (misma base, mismo delta):
+    no se encadenan overlays.
+    """
+    if read_base(src_path):
+        shutil.copyfile(src_path, dest_path)
+        return dest_path
+    base_path = snapshot_base(src_path, os.path.dirname(os.path.abspath(dest_path)))
+    with open(dest_path, "x", encoding="utf-8") as f:
+        f.write(header_for(base_path, dest_path))
+    return dest_path
+
+
+def render_delta(header, rows, base_values):
+    """Contenido del overlay: cabecera, marcas de los OIDs de la base que ya no
+    están en rows y filas (oid, tag, valor) que difieren de la base."""
+    parts = []
+    present = set()
+    for oid, tag, value in rows:
+        present.add(oid)
+        if base_values.get(oid) != (tag, value):
+            parts.append(f"{oid}|{tag}|{value}\n")
+    deleted = sorted(base_values.keys() - present, key=oid_key)
+    return header + "".join(f"{DELETED_PREFIX} {oid}\n" for oid in deleted) + "".join(parts)
@@ -0,0 +1,144 @@
+"""Construcción de índices en paralelo antes de lanzar los workers del responder.
+
+El responder indexa cada fichero de datos en serie al arrancar (y cada worker
+lo intentaría a la vez). Aquí se construyen todos los índices en un pool de
+procesos con el mismo backend y el mismo --cache-dir que usarán los workers,
+que al arrancar los encuentran al día y solo los abren.
+
+Los índices están direccionados por contenido (ver index_cache): primero se
+calculan en paralelo los hashes que el manifest no conoce, después se indexa
+una sola vez cada contenido distinto y al final se recoge la basura.
+
+La caché es común a todos los runners del proceso (el simulador principal y
+los perfiles de la flota): cada uno anota en IN_USE las entradas que usan sus
+workers y la recogida respeta las de todos, no solo las del que la lanza.
+"""
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from gui import index_cache, overlay
+
+PROGRESS_INTERVAL = 0.5  # segundos entre mensajes de progreso
+
+# dueño (un runner) -> entradas de la caché que usan sus workers
+IN_USE = {}
+_in_use_lock = threading.Lock()
+
+
+def release(owner):
+    """El dueño ya no usa sus entradas (runner parado): la recogida puede borrarlas."""
+    with _in_use_lock:
+        IN_USE.pop(owner, None)
+
+
+def _in_use(owner, entries, cancelled=None):
+    with _in_use_lock:
+        # Con el arranque ya cancelado, release() pudo pasar antes: no se vuelve a anotar
+        if owner is not None and not (cancelled is not None and cancelled.is_set()):
+            IN_USE[owner] = set(entries)
+        return set(entries).union(*IN_USE.values())
+
+
+def discover(data_dir):
+    """[(ruta, extensión)] de los ficheros que el responder va a indexar, con las bases de los overlays."""
+    from snmpsim import datafile
+
+    tasks = []
+    bases = set()
+    for full_path, text_parser, _ in datafile.get_data_files(data_dir):
+        tasks.append((full_path, text_parser.ext))
+        base = overlay.read_base(full_path) if full_path.endswith(".snmprec") else None
+        if base and base not in bases and os.path.exists(base):
+            bases.add(base)
+            tasks.append((base, "snmprec"))
+    return tasks
+
+
+def build_index(path, ext, cache_dir, backend):
+    """Crea (o valida) el índice de un fichero; se ejecuta en un proceso del pool."""
+    warnings.filterwarnings("ignore")
+    from snmpsim import confdir, variation
+    from gui import index_backends
+
+    index_backends.install(backend)
+    confdir.cache = cache_dir
+    started = time.monotonic()
+    try:
+        from snmpsim.record.search.database import RecordIndex
+        RecordIndex(path, variation.RECORD_TYPES[ext]).create()
+    except Exception as e:
+        return path, time.monotonic() - started, str(e)
+    return path, time.monotonic() - started, None
+
+
+def _digest(path):
+    return path, os.stat(path), index_cache.file_digest(path)
+
+
+def prewarm(data_dir, cache_dir, backend, workers=None, on_output=None, cancelled=None,
+            budget=index_cache.DEFAULT_BUDGET, owner=None):
+    """Indexa todo data_dir en paralelo. Devuelve False si se canceló.
+
+    owner identifica a quien va a usar los índices (ver IN_USE y release()).
+    """
+    folder = index_cache.store_dir(cache_dir)
+    os.makedirs(folder, exist_ok=True)
+    tasks = discover(data_dir)
+    if not tasks:
+        return True
+
+    manifest = index_cache.Manifest(folder)
+    tasks = [(os.path.abspath(path), ext) for path, ext in tasks]
+    unknown = [path for path, _ in tasks if manifest.lookup(path, os.stat(path)) is None]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    started = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1. Hashes de los ficheros nuevos o modificados
+        if unknown:
+            if on_output:
+                on_output(f"Calculando hash de {len(unknown)} ficheros...")
+            for path, st, digest in pool.map(_digest, unknown, chunksize=max(1, len(unknown) // (workers * 8))):
+                manifest.record(path, st, digest)
+                if cancelled is not None and cancelled.is_set():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    return False
+            manifest.save()
+
+        # 2. Un índice por contenido distinto; los que ya están en la caché solo se validan
+        entries = {}
+        for path, ext in tasks:
+            entry = index_cache.entry_path(folder, manifest.digest(path), os.path.getsize(path), backend)
+            entries.setdefault(entry, (path, ext))
+        if on_output:
+            on_output(f"Preparando índices: {len(entries)} contenidos distintos "
+                      f"({len(tasks)} ficheros) en {workers} procesos...")
+
+        last_report = time.monotonic()
+        done = 0
+        slowest = (0.0, None)
+        futures = [pool.submit(build_index, path, ext, cache_dir, backend) for path, ext in entries.values()]
+        for future in as_completed(futures):
+            if cancelled is not None and cancelled.is_set():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return False
+            path, elapsed, error = future.result()
+            done += 1
+            if error and on_output:
+                on_output(f"ERROR indexando {path}: {error}")
+            slowest = max(slowest, (elapsed, path))
+            now = time.monotonic()
+            if on_output and now - last_report >= PROGRESS_INTERVAL:
+                on_output(f"Índices: {done}/{len(entries)}")
+                last_report = now
+
+    removed, freed = index_cache.collect_garbage(cache_dir, budget, keep=_in_use(owner, entries, cancelled))
+    if on_output:
+        on_output(f"Índices listos: {done} en {time.monotonic() - started:.1f}s"
+                  + (f" (más lento: {os.path.basename(slowest[1])}, {slowest[0]:.1f}s)" if slowest[1] else ""))
+        if removed:
+            on_output(f"Caché de índices: {removed} entradas antiguas borradas ({freed / 1024 ** 2:.0f} MB)")
+    return True
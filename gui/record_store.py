@@ -0,0 +1,261 @@
+"""Almacén compacto de los registros de un .snmprec para el editor.
+
+En vez de un dict por OID se guardan columnas (listas paralelas) indexadas por
+un id de registro estable, con las etiquetas de tipo internadas y los
+metadatos de interfaz (nombre, tipo de control) en diccionarios dispersos,
+porque casi todos los OIDs usan los valores por defecto. Un índice
+OID -> id da búsquedas, comprobación de duplicados y actualizaciones en O(1).
+
+Record es una vista ligera (store, id) con la misma interfaz de diccionario
+que usaba el editor (item['value'], item.get('name')...), así que diálogos y
+tarjetas siguen funcionando sin saber cómo se guardan los datos.
+
+Los registros se mantienen en orden numérico de OID (el que necesita
+GETNEXT/walk): cada alta se coloca por bisección sobre claves tupla de
+enteros y un cambio de OID mueve la fila, así que guardar nunca reordena.
+"""
+import bisect
+import math
+import sys
+
+DEFAULT_UI_TYPE = "Text Entry"
+FIELDS = ("oid", "tag", "value", "name", "ui_type")
+
+
+def oid_key(oid):
+    """Clave de orden numérico: "1.3.6.1.10" va después de "1.3.6.1.9"."""
+    try:
+        return tuple(int(part) for part in oid.strip(".").split("."))
+    except ValueError:
+        # OIDs no numéricos (ficheros a mano): al final, en orden de texto
+        return (math.inf, oid)
+
+
+class Record:
+    __slots__ = ("store", "rid")
+
+    def __init__(self, store, rid):
+        self.store = store
+        self.rid = rid
+
+    def __getitem__(self, key):
+        return self.store.get_field(self.rid, key)
+
+    def __setitem__(self, key, value):
+        self.store.set_field(self.rid, key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self.store.get_field(self.rid, key)
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        return isinstance(other, Record) and other.store is self.store and other.rid == self.rid
+
+    def __hash__(self):
+        return hash((id(self.store), self.rid))
+
+    def __repr__(self):
+        return f"Record({self['oid']!r}, {self['tag']!r}, {self['value']!r})"
+
+
+class RecordStore:
+    """Secuencia de Records en orden numérico de OID con índice por OID."""
+
+    def __init__(self):
+        # Columnas indexadas por id de registro (los ids no se reutilizan)
+        self.oids = []
+        self.tags = []
+        self.values = []
+        self.names = {}      # id -> nombre, solo si no está vacío
+        self.ui_types = {}   # id -> tipo de control, solo si no es el de por defecto
+        self.index = {}      # oid -> id
+        self.order = []      # ids en orden de OID (el que se muestra y se guarda)
+        self.keys = []       # oid_key de cada posición de 'order', para bisect
+
+    # ---------------- SECUENCIA ---------------- #
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, pos):
+        return Record(self, self.order[pos])
+
+    def __iter__(self):
+        for rid in self.order:
+            yield Record(self, rid)
+
+    def __contains__(self, oid):
+        return oid in self.index
+
+    def find(self, oid):
+        rid = self.index.get(oid)
+        return None if rid is None else Record(self, rid)
+
+    def position(self, oid):
+        """Posición de un OID en el orden, o None."""
+        if oid not in self.index:
+            return None
+        return bisect.bisect_left(self.keys, oid_key(oid))
+
+    def row(self, pos):
+        """(oid, nombre, tag, valor, ui_type) de la posición dada, sin crear vistas."""
+        rid = self.order[pos]
+        return (self.oids[rid], self.names.get(rid, ""), self.tags[rid], self.values[rid],
+                self.ui_types.get(rid, DEFAULT_UI_TYPE))
+
+    # ---------------- ALTAS ---------------- #
+
+    def _new(self, oid, tag, value, name="", ui_type=DEFAULT_UI_TYPE):
+        if oid in self.index:
+            raise KeyError(f"OID duplicado: {oid}")
+        rid = len(self.oids)
+        self.oids.append(oid)
+        self.tags.append(sys.intern(tag))
+        self.values.append(value)
+        if name:
+            self.names[rid] = name
+        if ui_type != DEFAULT_UI_TYPE:
+            self.ui_types[rid] = sys.intern(ui_type)
+        self.index[oid] = rid
+        return rid
+
+    def _place(self, rid, key):
+        if not self.keys or key > self.keys[-1]:
+            self.order.append(rid)
+            self.keys.append(key)
+        else:
+            pos = bisect.bisect_left(self.keys, key)
+            self.order.insert(pos, rid)
+            self.keys.insert(pos, key)
+
+    def _unplace(self, rid, key):
+        pos = bisect.bisect_left(self.keys, key)
+        # "1.3.6" y "1.3.06" comparten clave: buscamos el id exacto entre los empates
+        while self.order[pos] != rid:
+            pos += 1
+        del self.order[pos]
+        del self.keys[pos]
+
+    def add(self, oid, tag, value, name="", ui_type=DEFAULT_UI_TYPE):
+        """Alta en su posición numérica."""
+        rid = self._new(oid, tag, value, name, ui_type)
+        self._place(rid, oid_key(oid))
+        return Record(self, rid)
+
+    def extend(self, records, meta=None):
+        """Añade (oid, tag, valor) con sus metadatos; devuelve las vistas nuevas.
+
+        Un OID repetido en el fichero se queda con el último valor, como haría
+        el responder al reindexar. Lo normal es que lleguen ya ordenados (se
+        añaden al final); si no, se reordena una vez al terminar el bloque.
+        """
+        meta = meta or {}
+        added = []
+        unsorted = False
+        last = self.keys[-1] if self.keys else None
+        for oid, tag, value in records:
+            rid = self.index.get(oid)
+            if rid is not None:
+                self.tags[rid] = sys.intern(tag)
+                self.values[rid] = value
+                continue
+            m = meta.get(oid)
+            if m:
+                rid = self._new(oid, tag, value, m.get("name", ""), m.get("ui_type", DEFAULT_UI_TYPE))
+            else:
+                rid = self._new(oid, tag, value)
+            key = oid_key(oid)
+            if last is not None and key < last:
+                unsorted = True
+            last = key
+            self.order.append(rid)
+            self.keys.append(key)
+            added.append(Record(self, rid))
+
+        if unsorted:
+            pairs = sorted(zip(self.keys, self.order))
+            self.keys = [k for k, _ in pairs]
+            self.order = [rid for _, rid in pairs]
+        return added
+
+    # ---------------- CAMPOS ---------------- #
+
+    def get_field(self, rid, key):
+        if key == "value":
+            return self.values[rid]
+        if key == "oid":
+            return self.oids[rid]
+        if key == "tag":
+            return self.tags[rid]
+        if key == "name":
+            return self.names.get(rid, "")
+        if key == "ui_type":
+            return self.ui_types.get(rid, DEFAULT_UI_TYPE)
+        raise KeyError(key)
+
+    def set_field(self, rid, key, value):
+        if key == "value":
+            self.values[rid] = value
+        elif key == "oid":
+            self._rename(rid, value)
+        elif key == "tag":
+            self.tags[rid] = sys.intern(value)
+        elif key == "name":
+            if value:
+                self.names[rid] = value
+            else:
+                self.names.pop(rid, None)
+        elif key == "ui_type":
+            if value and value != DEFAULT_UI_TYPE:
+                self.ui_types[rid] = sys.intern(value)
+            else:
+                self.ui_types.pop(rid, None)
+        else:
+            raise KeyError(key)
+
+    def _rename(self, rid, oid):
+        old = self.oids[rid]
+        if oid == old:
+            return
+        if oid in self.index:
+            raise KeyError(f"OID duplicado: {oid}")
+        # La fila se mueve a su nueva posición: el orden se mantiene sin reordenar todo
+        self._unplace(rid, oid_key(old))
+        del self.index[old]
+        self.index[oid] = rid
+        self.oids[rid] = oid
+        self._place(rid, oid_key(oid))
+
+    # ---------------- SERIALIZACIÓN ---------------- #
+
+    def triples(self):
+        """(oid, tag, valor) en orden."""
+        oids, tags, values = self.oids, self.tags, self.values
+        return ((oids[rid], tags[rid], values[rid]) for rid in self.order)
+
+    def snapshot(self):
+        """Copia para serializar en otro hilo (to_snmprec, triples, meta_dict).
+
+        Solo se copian las listas de referencias, no las cadenas: cuesta poco
+        incluso con 100k OIDs y el hilo de Tk puede seguir modificando el original.
+        """
+        copy = RecordStore.__new__(RecordStore)
+        copy.oids, copy.tags, copy.values = self.oids[:], self.tags[:], self.values[:]
+        copy.names, copy.ui_types = dict(self.names), dict(self.ui_types)
+        copy.order = self.order[:]
+        copy.index, copy.keys = None, None  # no se usan al serializar
+        return copy
+
+    def to_snmprec(self):
+        oids, tags, values = self.oids, self.tags, self.values
+        return "".join(f"{oids[rid]}|{tags[rid]}|{values[rid]}\n" for rid in self.order)
+
+    def meta_dict(self):
+        """Metadatos de interfaz solo de los OIDs que se apartan de los valores por defecto."""
+        meta = {}
+        for rid in sorted(self.names.keys() | self.ui_types.keys()):
+            meta[self.oids[rid]] = {"name": self.names.get(rid, ""),
+                                    "ui_type": self.ui_types.get(rid, DEFAULT_UI_TYPE)}
+        return meta
@@ -0,0 +1,485 @@
+"""Extensiones que se instalan dentro del proceso responder antes de arrancar snmpsim.
+
+SNMPSimRunner pasa la configuración por variables de entorno SNMPSIM_GUI_*;
+el launcher llama a install() justo antes de responder.main().
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Future
+from hashlib import md5
+
+from gui import dynamic_values
+from gui import index_backends
+from gui import log_pipeline
+from gui import overlay
+from gui.control_channel import ControlServer, normalize_path
+from gui.metrics import MetricsRecorder
+
+# Valores inyectados en caliente desde la GUI:
+# fichero normalizado -> {oid: valor pyasn1 ya construido}
+OVERRIDES = {}
+
+_record = None
+
+# Pasa a True cuando el bucle del responder ya atiende peticiones (ver launcher)
+READY = False
+
+# Overlays: ruta normalizada de la base -> DataFile compartido por todos sus overlays
+_BASES = {}
+# Ruta del overlay -> (mtime del fichero, DataFile base o None si no es overlay, OIDs quitados)
+_OVERLAY_INFO = {}
+
+# Petición en curso (el responder atiende una a una en su bucle): comunidad y errores
+_REQUEST = {"community": None, "error": False}
+
+# Lo que configuró snmpsim al arrancar, para poder recargar sin reiniciar:
+# motor SNMP, contexto, controlador del índice de ficheros y directorios escaneados
+_SNMP = {"loop": None, "engine": None, "context": None, "index": None, "variation": None}
+_DATA_DIRS = []
+# comunidad -> (ruta, contextName, (tamaño, mtime_ns) del fichero cuando se cargó)
+_COMMUNITIES = {}
+RELOAD_TIMEOUT = 30.0
+
+
+def install():
+    from snmpsim import datafile
+
+    index_backends.install(os.environ.get("SNMPSIM_GUI_INDEX"))
+    _patch_logging()
+    # Primero overlays y encima overrides: un valor inyectado gana a delta y base
+    _patch_overlays(datafile)
+    _patch_overrides(datafile)
+    _patch_registration(datafile)
+
+    metrics_port = os.environ.get("SNMPSIM_GUI_METRICS")
+    if metrics_port:
+        _patch_metrics(datafile, MetricsRecorder(metrics_port).start())
+
+    port = os.environ.get("SNMPSIM_GUI_CONTROL")
+    if port:
+        server = ControlServer(int(port))
+        server.register("ping", lambda msg: {"pid": os.getpid(), "ready": READY})
+        server.register("set", _handle_set)
+        server.register("clear", _handle_clear)
+        server.register("reload", _handle_reload)
+        server.start()
+
+
+def mark_ready():
+    global READY
+    READY = True
+
+
+# ---------------- TABLA DE OVERRIDES ---------------- #
+
+def _handle_set(msg):
+    global _record
+    key = normalize_path(msg["file"])
+    if dynamic_values.is_dynamic(msg["tag"]):
+        # Parámetros nuevos para el módulo "dynamic"; el valor se sigue calculando en cada GET
+        dynamic_values.parse(msg["value"])
+        live = dict(dynamic_values.LIVE.get(key, {}))
+        live[msg["oid"]] = msg["value"]
+        dynamic_values.LIVE[key] = live
+        if msg["oid"] in OVERRIDES.get(key, {}):
+            table = dict(OVERRIDES[key])
+            del table[msg["oid"]]
+            OVERRIDES[key] = table
+        return
+
+    if _record is None:
+        from snmpsim.record.snmprec import SnmprecRecord
+        _record = SnmprecRecord()
+
+    # Construimos el objeto pyasn1 una sola vez, fuera del camino de las peticiones
+    _, _, value = _record.evaluate_value(msg["oid"], msg["tag"].split(":", 1)[0], msg["value"])
+    live = dynamic_values.LIVE.get(key)
+    if live and msg["oid"] in live:
+        # Pasa a estático: el override manda y los parámetros en caliente sobran
+        dynamic_values.LIVE[key] = {oid: text for oid, text in live.items() if oid != msg["oid"]}
+    table = dict(OVERRIDES.get(key, {}))
+    table[msg["oid"]] = value
+    OVERRIDES[key] = table  # sustitución atómica: el hilo SNMP nunca ve un dict a medias
+
+
+def _handle_clear(msg):
+    if msg.get("file") and msg.get("oids") is not None:
+        # Solo esos OIDs; las tablas se sustituyen enteras, como en _handle_set
+        key = normalize_path(msg["file"])
+        oids = set(msg["oids"])
+        for tables in (OVERRIDES, dynamic_values.LIVE):
+            table = tables.get(key)
+            if table and oids & table.keys():
+                tables[key] = {oid: value for oid, value in table.items() if oid not in oids}
+    elif msg.get("file"):
+        OVERRIDES.pop(normalize_path(msg["file"]), None)
+        dynamic_values.LIVE.pop(normalize_path(msg["file"]), None)
+    else:
+        OVERRIDES.clear()
+        dynamic_values.LIVE.clear()
+
+
+# ---------------- OVERLAYS ---------------- #
+
+def _is_missing(value):
+    from pysnmp.smi import exval
+    return isinstance(value, (type(exval.noSuchObject), type(exval.noSuchInstance), type(exval.endOfMib)))
+
+
+def _overlay_base(df, datafile):
+    """(DataFile de la base, OIDs de la base que quitó) si df es un overlay, o (None, None).
+
+    Se revalida cuando cambia el fichero.
+    """
+    path = df._text_file
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, None
+    cached = _OVERLAY_INFO.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    base = deleted = None
+    base_path = overlay.read_base(path)
+    if base_path:
+        key = normalize_path(base_path)
+        base = _BASES.get(key)
+        if base is None:
+            if os.path.exists(base_path):
+                from snmpsim import log
+                log.info(f"Overlay {path}: indexando base compartida {base_path}")
+                base = _BASES[key] = datafile.DataFile(
+                    base_path, df._text_parser, df._variation_modules).index_text()
+            else:
+                from snmpsim import log
+                log.error(f"Overlay {path}: no existe la base {base_path}")
+        deleted = {oid.strip(".") for oid in overlay.read_deleted(path)}
+    _OVERLAY_INFO[path] = (mtime, base, deleted)
+    return base, deleted
+
+
+def _base_lookup(base, original, var_binds, deleted, **context):
+    """Respuesta de la base sin los OIDs que quitó el overlay: en GET no existen y
+    en GETNEXT se sigue avanzando hasta el primero que sigue en la base."""
+    inherited = original(base, var_binds, **context)
+    if not deleted:
+        return inherited
+    from pysnmp.smi import exval
+    result = []
+    for (_, request_value), (oid, value) in zip(var_binds, inherited):
+        while not _is_missing(value) and str(oid) in deleted:
+            if not context.get("nextFlag"):
+                value = exval.noSuchInstance
+                break
+            (oid, value), = original(base, [(oid, request_value)], **context)
+        result.append((oid, value))
+    return result
+
+
+def _patch_overlays(datafile):
+    original = datafile.DataFile.process_var_binds
+
+    def process_var_binds(self, var_binds, **context):
+        base, deleted = _overlay_base(self, datafile)
+        if base is None or context.get("setFlag"):
+            return original(self, var_binds, **context)
+
+        own = original(self, var_binds, **context)
+        next_flag = context.get("nextFlag")
+        if not next_flag and not any(_is_missing(value) for _, value in own):
+            return own  # GET resuelto entero por el delta
+
+        inherited = _base_lookup(base, original, var_binds, deleted, **context)
+        merged = []
+        for (oid, value), (base_oid, base_value) in zip(own, inherited):
+            if _is_missing(value):
+                merged.append((base_oid, base_value))
+            elif not next_flag or _is_missing(base_value) or oid <= base_oid:
+                # GETNEXT: el siguiente de los dos; en empate manda el delta
+                merged.append((oid, value))
+            else:
+                merged.append((base_oid, base_value))
+        return merged
+
+    datafile.DataFile.process_var_binds = process_var_binds
+
+
+def _patch_overrides(datafile):
+    original = datafile.DataFile.process_var_binds
+    keys = {}  # ruta del DataFile -> clave normalizada (se calcula una vez)
+
+    def process_var_binds(self, var_binds, **context):
+        if not OVERRIDES or context.get("setFlag"):
+            return original(self, var_binds, **context)
+
+        key = keys.get(self._text_file)
+        if key is None:
+            key = keys[self._text_file] = normalize_path(self._text_file)
+        table = OVERRIDES.get(key)
+        if not table:
+            return original(self, var_binds, **context)
+
+        if not context.get("nextFlag"):
+            # GET exacto resuelto entero en memoria: ni índice ni fichero
+            hits = [table.get(str(oid)) for oid, _ in var_binds]
+            if None not in hits:
+                return [(oid, value) for (oid, _), value in zip(var_binds, hits)]
+
+        return [(oid, table.get(str(oid), value)) for oid, value in original(self, var_binds, **context)]
+
+    datafile.DataFile.process_var_binds = process_var_binds
+
+
+# ---------------- LOGS ESTRUCTURADOS ---------------- #
+
+def _patch_logging():
+    """Los mensajes de snmpsim salen como eventos JSON (ver log_pipeline), no como texto."""
+    from snmpsim import log
+
+    # snmpsim registra el contexto ("Using ... community name") antes de cada petición
+    last = {"community": None}
+
+    def make(level, threshold):
+        def log_message(message, ctx=""):
+            if log.log_level <= threshold:
+                event = log_pipeline.emit(level, f"{message} {ctx}".rstrip(), last["community"])
+                if event["cat"] == "context":
+                    last["community"] = event.get("community")
+        return log_message
+
+    log.error = make("error", log.LOG_ERROR)
+    log.info = make("info", log.LOG_INFO)
+    log.debug = make("debug", log.LOG_DEBUG)
+
+
+# ---------------- MÉTRICAS ---------------- #
+
+def _patch_metrics(datafile, recorder):
+    from snmpsim.commands import responder
+
+    original = datafile.DataFile.process_var_binds
+    communities = {}  # ruta del DataFile -> comunidad (ver log_pipeline.community_of)
+
+    def process_var_binds(self, var_binds, **context):
+        result = original(self, var_binds, **context)
+        community = communities.get(self._text_file)
+        if community is None:
+            community = communities[self._text_file] = log_pipeline.community_of(self._text_file, _DATA_DIRS)
+        _REQUEST["community"] = community
+        if not context.get("nextFlag") and any(_is_missing(value) for _, value in result):
+            _REQUEST["error"] = True
+        return result
+
+    datafile.DataFile.process_var_binds = process_var_binds
+
+    def timed(cls, pdu):
+        handle = cls.handleMgmtOperation
+
+        def handleMgmtOperation(self, *args, **kwargs):
+            _REQUEST["community"] = None
+            _REQUEST["error"] = False
+            started = time.perf_counter()
+            try:
+                return handle(self, *args, **kwargs)
+            except Exception:
+                _REQUEST["error"] = True
+                raise
+            finally:
+                # Sin comunidad resuelta: no había fichero de datos para el contexto pedido
+                community = _REQUEST["community"]
+                recorder.record(community or "-", pdu, time.perf_counter() - started,
+                                _REQUEST["error"] or community is None)
+
+        cls.handleMgmtOperation = handleMgmtOperation
+
+    timed(responder.GetCommandResponder, "get")
+    timed(responder.NextCommandResponder, "getnext")
+    timed(responder.BulkCommandResponder, "getbulk")
+    timed(responder.SetCommandResponder, "set")
+
+
+# ---------------- RECARGA EN CALIENTE ---------------- #
+
+def _patch_registration(datafile):
+    """Anota lo que snmpsim registra al arrancar (no cambia su comportamiento)."""
+    from pysnmp.entity import config
+    from pysnmp.entity.rfc3413 import context
+    from snmpsim import controller
+
+    _SNMP["loop"] = asyncio.get_event_loop()
+
+    get_data_files = datafile.get_data_files
+
+    def scan(tgt_dir, *args, **kwargs):
+        if not args and tgt_dir not in _DATA_DIRS:
+            _DATA_DIRS.append(tgt_dir)  # solo la llamada de primer nivel, no la recursión
+        return get_data_files(tgt_dir, *args, **kwargs)
+
+    datafile.get_data_files = scan
+
+    add_v1_system = config.addV1System
+
+    def addV1System(snmp_engine, *args, **kwargs):
+        _SNMP["engine"] = snmp_engine
+        return add_v1_system(snmp_engine, *args, **kwargs)
+
+    config.addV1System = addV1System
+
+    register = context.SnmpContext.registerContextName
+
+    def registerContextName(self, *args, **kwargs):
+        _SNMP["context"] = self
+        return register(self, *args, **kwargs)
+
+    context.SnmpContext.registerContextName = registerContextName
+
+    add_data_file = controller.DataIndexInstrumController.add_data_file
+
+    def add(self, full_path, community_name, context_name, *args):
+        _SNMP["index"] = self
+        try:
+            st = os.stat(full_path)
+            _COMMUNITIES[community_name] = (full_path, context_name, (st.st_size, st.st_mtime_ns))
+        except OSError:
+            pass
+        log_pipeline.register_community(full_path, community_name)
+        if _SNMP["variation"] is None and _SNMP["context"] is not None:
+            data_file = getattr(_SNMP["context"].getMibInstrum(context_name), "_data_file", None)
+            _SNMP["variation"] = getattr(data_file, "_variation_modules", None)
+        return add_data_file(self, full_path, community_name, context_name, *args)
+
+    controller.DataIndexInstrumController.add_data_file = add
+
+
+def _in_loop(fn):
+    """Ejecuta fn en el hilo del responder, entre dos peticiones, y espera el resultado."""
+    done = Future()
+
+    def call():
+        try:
+            done.set_result(fn())
+        except Exception as e:
+            done.set_exception(e)
+
+    _SNMP["loop"].call_soon_threadsafe(call)
+    return done.result(timeout=RELOAD_TIMEOUT)
+
+
+def _forget_injected(path):
+    """Lo inyectado desde la GUI para un fichero ya no vale cuando se recarga o se retira."""
+    key = normalize_path(path)
+    OVERRIDES.pop(key, None)
+    dynamic_values.LIVE.pop(key, None)
+
+
+def _unlist_community(index_controller, community):
+    """Quita la fila de la comunidad de la tabla de ficheros que publica snmpsim.
+
+    DataIndexInstrumController guarda <base>.<columna>.<fila> con la ruta, la
+    comunidad (columna 2) y el contexto; no tiene forma de borrar una fila.
+    """
+    if index_controller is None:
+        return
+    table = index_controller._db
+    rows = {key[-1] for key, value in list(table.items()) if key[-2] == 2 and str(value) == community}
+    for key in [key for key in list(table.keys()) if key[-1] in rows]:
+        del table[key]
+
+
+def _handle_reload(msg):
+    """Compara el directorio con lo cargado y aplica solo las diferencias.
+
+    Los índices se construyen en este hilo (el del canal de control); en el
+    bucle del responder solo se intercambian referencias, así que el puerto
+    SNMP sigue atendiendo durante toda la recarga.
+    """
+    from pyasn1.type import univ
+    from pysnmp.entity import config
+    from snmpsim import controller, datafile, log
+    from snmpsim.record.search.database import RecordIndex
+
+    snmp_context = _SNMP["context"]
+    if snmp_context is None:
+        return {"error": "el responder aún no ha registrado sus ficheros"}
+
+    found = {}
+    for data_dir in list(_DATA_DIRS):
+        for full_path, text_parser, community in datafile.get_data_files(data_dir):
+            found.setdefault(community, (full_path, text_parser))
+
+    changed, added, removed, errors = [], [], [], []
+    for community, (path, context_name, stamp) in list(_COMMUNITIES.items()):
+        if community not in found or found[community][0] != path:
+            removed.append(community)
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            removed.append(community)
+            continue
+        if (st.st_size, st.st_mtime_ns) != stamp:
+            data_file = snmp_context.getMibInstrum(context_name)._data_file
+            try:
+                index = RecordIndex(path, data_file._text_parser)
+                index.create()
+            except Exception as e:
+                errors.append(f"{community}: {e}")  # se sigue sirviendo la versión anterior
+                continue
+            changed.append((community, data_file, index, (st.st_size, st.st_mtime_ns)))
+
+    for community, (path, text_parser) in found.items():
+        if community not in _COMMUNITIES:
+            try:
+                st = os.stat(path)
+                data_file = datafile.DataFile(path, text_parser, _SNMP["variation"] or {}).index_text()
+            except Exception as e:
+                errors.append(f"{community}: {e}")
+                continue
+            added.append((community, data_file, (st.st_size, st.st_mtime_ns)))
+
+    def apply():
+        for community, data_file, index, stamp in changed:
+            old = data_file._record_index
+            was_open = old.is_open()
+            data_file._record_index = index
+            if was_open:
+                old.close()
+                index.open()
+            path, context_name, _ = _COMMUNITIES[community]
+            _COMMUNITIES[community] = (path, context_name, stamp)
+            # Los valores de sliders ya están en el fichero recargado: que no lo tapen
+            _forget_injected(path)
+
+        for community in removed:
+            path, context_name, _ = _COMMUNITIES.pop(community)
+            data_file = snmp_context.getMibInstrum(context_name)._data_file
+            for name in {context_name, community}:
+                snmp_context.unregisterContextName(name)
+            if _SNMP["engine"] is not None:
+                config.delV1System(_SNMP["engine"], context_name)
+            if data_file in datafile.DataFile.opened_queue:
+                datafile.DataFile.opened_queue.remove(data_file)
+                data_file.close()
+            _forget_injected(path)
+            _unlist_community(_SNMP["index"], community)
+
+        for community, data_file, stamp in added:
+            # Mismo registro que hace snmpsim en configure_managed_objects()
+            context_name = md5(univ.OctetString(community).asOctets()).hexdigest()
+            mib_instrum = controller.MIB_CONTROLLERS[data_file.layout](data_file)
+            if _SNMP["engine"] is not None:
+                config.addV1System(_SNMP["engine"], context_name, community, contextName=context_name)
+            snmp_context.registerContextName(context_name, mib_instrum)
+            if len(community) <= 32:
+                snmp_context.registerContextName(community, mib_instrum)
+            _SNMP["index"].add_data_file(data_file._text_file, community, context_name)
+            _COMMUNITIES[community] = (data_file._text_file, context_name, stamp)
+        return len(changed), len(added), len(removed)
+
+    counts = _in_loop(apply)
+    log.info(f"Recarga: {counts[0]} ficheros cambiados, {counts[1]} añadidos, {counts[2]} retirados")
+    for error in errors:
+        log.error(f"Recarga: {error}")
+    return {"changed": counts[0], "added": counts[1], "removed": counts[2], "errors": errors[:20]}
@@ -1,8 +1,26 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog, Menu
+from tkinter import ttk, messagebox, simpledialog, filedialog, Menu
 import os
-import shutil
 import json
+import bisect
+import queue
+import threading
+
+from gui.dir_watcher import DirWatcher, scan_dir
+from gui.name_index import NameIndex
+from gui import normalize
+from gui import bulk_generate
+from gui import timeseries
+from gui import overlay
+
+# Cada cuánto se aplican a la lista los cambios detectados en el directorio
+WATCH_POLL_MS = 250
+# Espera tras la última tecla antes de filtrar
+SEARCH_DEBOUNCE_MS = 150
+# Por encima de este número de altas/bajas se reordena el árbol de una sola vez
+INCREMENTAL_LIMIT = 200
+# Marca de "plantillas aún no leídas" (distinta de None, que es "no hay templates.json")
+TEMPLATES_NOT_LOADED = -1
 
 
 class DeviceSidebar(ttk.Frame):
@@ -11,11 +29,19 @@ class DeviceSidebar(ttk.Frame):
         super().__init__(parent)
         self.on_selection_change = on_selection_change
         self.current_dir = ""
-        self.all_files = []
-        
-        self.templates = self._load_templates()
+        self.all_files = []  # índice ordenado de todos los .snmprec del directorio
+        self.visible = []    # subconjunto ordenado que muestra el árbol (según el filtro)
+        self.name_index = NameIndex()
+        self.query = ""      # filtro aplicado (el del Entry puede ir por delante)
+        self._search_job = None
+        self.watcher = None
+        self.bulk_running = False  # durante una generación masiva no se aplican eventos sueltos
+        # Las plantillas se leen al abrir el menú "Nuevo" por primera vez (no en el arranque)
+        self._templates_mtime = TEMPLATES_NOT_LOADED
+        self.templates = {}
 
         self._build_ui()
+        self.after(WATCH_POLL_MS, self._poll_watcher)
 
     def _build_ui(self):
         # Header
@@ -37,14 +63,16 @@ class DeviceSidebar(ttk.Frame):
         btn_frame.pack(side="bottom", fill="x", pady=5, padx=5)
         
         ttk.Button(btn_frame, text="🔄", width=3, command=self.refresh).pack(side="left")
+        self.btn_normalize = ttk.Button(btn_frame, text="⇅", width=3, command=self._normalize_directory)
+        self.btn_normalize.pack(side="left", padx=(2, 0))
         
         # Botón con menú desplegable para "+ Nuevo"
         self.btn_new = ttk.Menubutton(btn_frame, text="➕ Nuevo", direction='above')
-        self.menu_new = Menu(self.btn_new, tearoff=0)
+        # Las plantillas se releen al abrir el menú, solo si templates.json cambió
+        self.menu_new = Menu(self.btn_new, tearoff=0, postcommand=self._reload_templates_if_changed)
         
         # Llenar el menú de plantillas dinámicamente
-        for name in self.templates.keys():
-            self.menu_new.add_command(label=name, command=lambda n=name: self._create_from_template(n))
+        self._fill_template_menu()
             
         self.btn_new.config(menu=self.menu_new)
         self.btn_new.pack(side="right", fill="x", expand=True, padx=(5, 0))
@@ -79,47 +107,182 @@ class DeviceSidebar(ttk.Frame):
     # ---------------- LÓGICA DE FILTRADO (NUEVO) ---------------- #
 
     def _on_search_change(self, *args):
-        query = self.search_var.get().lower()
-        self._populate_tree(query)
+        # Debounce: solo filtramos cuando el usuario deja de teclear
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._apply_search)
 
-    def _populate_tree(self, filter_text=""):
-        """Llena el Treeview basándose en self.all_files y el filtro."""
-        # Limpiar vista actual
+    def _apply_search(self):
+        self._search_job = None
+        query = self.search_var.get().lower()
+        if query == self.query:
+            return
+        self.query = query
+        if query:
+            visible = sorted(self.name_index.search(query))
+        else:
+            visible = list(self.all_files)
+        self._show(visible)
+
+    def _show(self, visible):
+        """Pasa el árbol de self.visible a 'visible' sin recrear ítems (detach/move)."""
+        old = set(self.visible)
+        new = set(visible)
+        gone = old - new
+        come = new - old
+
+        if len(gone) + len(come) > INCREMENTAL_LIMIT:
+            # Una sola llamada a Tk: reengancha los que vuelven y suelta el resto
+            self.tree.set_children("", *visible)
+        else:
+            if gone:
+                self.tree.detach(*gone)
+            # En orden ascendente, cada posición ya tiene delante todo lo que le precede
+            for filename in sorted(come):
+                self.tree.move(filename, "", bisect.bisect_left(visible, filename))
+        self.visible = visible
+
+    def _populate_tree(self):
+        """Crea un ítem por fichero (una sola vez) y deja visibles los que pasan el filtro."""
         self.tree.delete(*self.tree.get_children())
-        
+        self.name_index.clear()
         for filename in self.all_files:
-            # Lógica de filtro: si el texto está en el nombre
-            display_name = os.path.splitext(filename)[0]
-            
-            if filter_text in display_name.lower():
-                # Añadimos un icono unicode para que se vea bonito
-                text_with_icon = f"📄 {display_name}"
-                self.tree.insert("", "end", iid=filename, text=text_with_icon)
-    
+            self.name_index.add(filename)
+            self.tree.insert("", "end", iid=filename, text=self._display_text(filename))
+        self.visible = list(self.all_files)
+
+        self.query = ""
+        self._apply_search()
+
+    @staticmethod
+    def _display_text(filename):
+        # Añadimos un icono unicode para que se vea bonito
+        return f"📄 {os.path.splitext(filename)[0]}"
+
+    # ---------------- ÍNDICE INCREMENTAL ---------------- #
+
+    def _add_entry(self, filename):
+        """Inserta un fichero en el índice y, si pasa el filtro, en su posición del árbol."""
+        i = bisect.bisect_left(self.all_files, filename)
+        if i < len(self.all_files) and self.all_files[i] == filename:
+            return
+        self.all_files.insert(i, filename)
+        self.name_index.add(filename)
+
+        if self.name_index.matches(filename, self.query):
+            pos = bisect.bisect_left(self.visible, filename)
+            self.visible.insert(pos, filename)
+            self.tree.insert("", pos, iid=filename, text=self._display_text(filename))
+        else:
+            # El ítem existe (por si el filtro cambia) pero queda fuera del árbol
+            self.tree.insert("", "end", iid=filename, text=self._display_text(filename))
+            self.tree.detach(filename)
+
+    def _remove_entry(self, filename):
+        i = bisect.bisect_left(self.all_files, filename)
+        if i == len(self.all_files) or self.all_files[i] != filename:
+            return
+        del self.all_files[i]
+        self.name_index.remove(filename)
+
+        pos = bisect.bisect_left(self.visible, filename)
+        if pos < len(self.visible) and self.visible[pos] == filename:
+            del self.visible[pos]
+        self.tree.delete(filename)
+
+    def _poll_watcher(self):
+        if self.watcher is not None and self.bulk_running:
+            # Miles de altas seguidas: se descartan y se sincroniza una vez al terminar
+            self.watcher.drain()
+        elif self.watcher is not None:
+            for kind, name in self.watcher.drain():
+                if kind == "add":
+                    self._add_entry(name)
+                elif kind == "remove":
+                    self._remove_entry(name)
+                else:
+                    self.refresh()
+        self.after(WATCH_POLL_MS, self._poll_watcher)
+
     # ---------------- GESTIÓN DE ARCHIVOS ---------------- #
 
     def set_directory(self, path):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
         self.current_dir = path
-        self.refresh()
-
-    def refresh(self):
         self.all_files = []
-        
-        # Limpiar lista actual
-        self.tree.delete(*self.tree.get_children())
-        
-        self.reload_templates_from_disk()
-        
-        if self.current_dir and os.path.exists(self.current_dir):
+
+        if path and os.path.isdir(path):
+            # El vigilante se arma antes de listar: lo que cambie entre medias no se pierde
+            self.watcher = DirWatcher(path).start()
             try:
-                # Cachear todos los archivos .snmprec
-                files = [f for f in os.listdir(self.current_dir) if f.endswith(".snmprec")]
-                self.all_files = sorted(files)
-            except Exception as e:
+                self.all_files = sorted(scan_dir(path))
+            except OSError as e:
                 print(f"Error listando: {e}")
-        
+
         # Repoblar usando el filtro actual (si hay texto escrito, se mantiene el filtro)
-        self._populate_tree(self.search_var.get().lower())
+        self._populate_tree()
+
+    def refresh(self):
+        """Sincroniza la lista con el disco aplicando solo las diferencias."""
+        current = set()
+        if self.current_dir and os.path.isdir(self.current_dir):
+            try:
+                current = set(scan_dir(self.current_dir))
+            except OSError as e:
+                print(f"Error listando: {e}")
+                return
+
+        known = set(self.all_files)
+        for filename in known - current:
+            self._remove_entry(filename)
+        for filename in sorted(current - known):
+            self._add_entry(filename)
+
+    def destroy(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        super().destroy()
+
+    def _normalize_directory(self):
+        """Ordena por OID y normaliza todos los .snmprec del directorio (en varios procesos)."""
+        if not self.current_dir:
+            messagebox.showwarning("Aviso", "Selecciona un directorio de datos.")
+            return
+        if not messagebox.askyesno("Ordenar y normalizar",
+                                   "Se reescribirán en orden de OID los ficheros del directorio que lo necesiten.\n¿Continuar?"):
+            return
+
+        self.btn_normalize.config(state="disabled")
+        results = queue.Queue()
+        data_dir = self.current_dir
+
+        def run():
+            try:
+                results.put(normalize.normalize_dir(data_dir))
+            except Exception as e:
+                results.put(e)
+
+        def poll():
+            try:
+                outcome = results.get_nowait()
+            except queue.Empty:
+                self.after(200, poll)
+                return
+            self.btn_normalize.config(state="normal")
+            if isinstance(outcome, Exception):
+                messagebox.showerror("Error", f"No se pudo normalizar: {outcome}")
+                return
+            changed, failed = normalize.summarize(outcome)
+            msg = f"{len(outcome)} ficheros revisados, {changed} reescritos."
+            if failed:
+                msg += "\n\nCon errores:\n" + "\n".join(
+                    f"{os.path.basename(r['path'])}: {r['error']}" for r in failed[:10])
+            messagebox.showinfo("Ordenar y normalizar", msg)
+
+        threading.Thread(target=run, daemon=True).start()
+        self.after(200, poll)
 
     def _on_select(self, event):
         selected = self.tree.selection()
@@ -135,7 +298,11 @@ class DeviceSidebar(ttk.Frame):
         default = {"Dispositivo Vacío": {"content": "", "meta": {}}}
         path = "templates.json"
         
-        if not os.path.exists(path): return default
+        try:
+            self._templates_mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._templates_mtime = None
+            return default
             
         try:
             with open(path, "r", encoding="utf-8") as f:
@@ -193,7 +360,7 @@ class DeviceSidebar(ttk.Frame):
             with open(path_meta, "w", encoding="utf-8") as f:
                 json.dump(meta, f, indent=4)
 
-            self.refresh()
+            self._add_entry(new_name)
             # Auto-seleccionar
             if self.tree.exists(new_name):
                 self.tree.selection_set(new_name)
@@ -207,10 +374,84 @@ class DeviceSidebar(ttk.Frame):
     def reload_templates(self):
         self.templates = self._load_templates()
         # Reconstruir menú
+        self._fill_template_menu()
+
+    def _fill_template_menu(self):
         self.menu_new.delete(0, "end")
         for name in self.templates.keys():
             self.menu_new.add_command(label=name, command=lambda n=name: self._create_from_template(n))
-            
+        self.menu_new.add_separator()
+        self.menu_new.add_command(label="Generación masiva…", command=self._open_bulk_dialog)
+        self.menu_new.add_command(label="Importar histórico…", command=self._import_history)
+
+    def _open_bulk_dialog(self):
+        if not self.current_dir:
+            messagebox.showwarning("Aviso", "Selecciona un directorio de datos.")
+            return
+        BulkGenerateDialog(self, list(self.templates.keys()))
+
+    def _import_history(self):
+        """Crea un dispositivo que reproduce varias instantáneas .snmprec (ver gui/timeseries.py)."""
+        if not self.current_dir:
+            messagebox.showwarning("Aviso", "Selecciona un directorio de datos.")
+            return
+        paths = filedialog.askopenfilenames(title="Instantáneas del dispositivo (en orden de nombre)",
+                                            filetypes=[("SNMP records", "*.snmprec"), ("Todos", "*.*")])
+        if not paths:
+            return
+        if len(paths) < 2:
+            messagebox.showerror("Error", "Hacen falta al menos dos instantáneas.")
+            return
+
+        base_name = os.path.splitext(os.path.basename(sorted(paths)[0]))[0]
+        new_name = simpledialog.askstring("Importar histórico", "Nombre del dispositivo:", initialvalue=base_name)
+        if not new_name: return
+        if not new_name.endswith(".snmprec"): new_name += ".snmprec"
+        out_path = os.path.join(self.current_dir, new_name)
+        if os.path.exists(out_path):
+            messagebox.showerror("Error", "Ya existe ese archivo.")
+            return
+
+        interval = simpledialog.askstring(
+            "Importar histórico", "Segundos entre instantáneas\n(vacío: fecha de modificación de cada fichero):",
+            initialvalue="60")
+        if interval is None: return
+        try:
+            interval = float(interval) if interval.strip() else None
+            if interval is not None and interval <= 0: raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "El intervalo debe ser un número mayor que 0.")
+            return
+
+        results = queue.Queue()
+
+        def run():
+            try:
+                results.put(("done", timeseries.import_snapshots(paths, out_path, interval)))
+            except Exception as e:
+                results.put(("error", e))
+
+        def poll():
+            try:
+                kind, value = results.get_nowait()
+            except queue.Empty:
+                self.after(100, poll)
+                return
+            self.refresh()
+            if kind == "error":
+                messagebox.showerror("Error", f"No se pudo importar: {value}")
+                return
+            if self.tree.exists(new_name):
+                self.tree.selection_set(new_name)
+                self.tree.see(new_name)
+                self._on_select(None)
+            messagebox.showinfo("Importar histórico",
+                                f"{value['snapshots']} instantáneas ({value['duration']:.0f} s).\n"
+                                f"{value['series']} OIDs se reproducen desde la serie, {value['static']} quedan fijos.")
+
+        threading.Thread(target=run, daemon=True).start()
+        self.after(100, poll)
+
     def _duplicate_device(self):
         selected = self.tree.selection()
         if not selected: 
@@ -235,8 +476,9 @@ class DeviceSidebar(ttk.Frame):
             return
 
         try:
-            shutil.copy2(src_path, dest_path)
-            self.refresh()
+            # Overlay: la copia comparte la base (una sola copia e índice) y guarda solo su delta
+            overlay.make_overlay(src_path, dest_path)
+            self._add_entry(new_name)
         except Exception as e:
             messagebox.showerror("Error", f"Fallo al duplicar: {e}")
 
@@ -252,22 +494,20 @@ class DeviceSidebar(ttk.Frame):
             path = os.path.join(self.current_dir, filename)
             try:
                 os.remove(path)
-                self.refresh()
+                self._remove_entry(filename)
                 # Limpiar el editor avisando selección vacía o nula
                 # (Opcional: podrías implementar un método clear en editor)
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo eliminar: {e}")
 
-    def reload_templates_from_disk(self): 
-        self.templates = self._load_templates()
+    def _reload_templates_if_changed(self):
+        try:
+            mtime = os.stat("templates.json").st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._templates_mtime:
+            self.reload_templates()
 
-        # Reconstruir el menú
-        self.menu_new.delete(0, "end")
-        for name in self.templates.keys():
-            self.menu_new.add_command(label=name, command=lambda n=name: self._create_from_template(n))
-        
-        print("Plantillas recargadas.")
-        
     def _rename_device(self):
         selected = self.tree.selection()
         if not selected:
@@ -308,7 +548,8 @@ class DeviceSidebar(ttk.Frame):
             os.rename(src_path, dst_path)
             
             # Actualizar la lista
-            self.refresh()
+            self._remove_entry(filename)
+            self._add_entry(new_name)
             
             # Seleccionar el archivo renombrado automáticamente
             # Esto es importante para que el Editor sepa que el archivo cambió
@@ -320,3 +561,125 @@ class DeviceSidebar(ttk.Frame):
                 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo renombrar el archivo: {e}")
+
+
+# =======================================================
+# POPUP DE GENERACIÓN MASIVA
+# =======================================================
+class BulkGenerateDialog(tk.Toplevel):
+    def __init__(self, sidebar, template_names):
+        super().__init__(sidebar)
+        self.title("Generación masiva")
+        self.geometry("420x470")
+        self.sidebar = sidebar
+        self.progress = queue.Queue()
+        self._build(template_names)
+
+    def _build(self, template_names):
+        pad = {'padx': 15, 'pady': 3}
+        frame = ttk.Frame(self)
+        frame.pack(fill="both", expand=True, pady=10)
+        frame.columnconfigure(1, weight=1)
+
+        self.vars = {}
+        fields = [
+            ("template", "Plantilla:", template_names[0] if template_names else ""),
+            ("count", "Cantidad:", "100"),
+            ("name", "Patrón de comunidad:", "device-{n:05d}"),
+            ("start", "Primer número (n):", "1"),
+            ("sysname", "Patrón de sysName:", "{community}"),
+            ("ip_oid", "OID con IP (opcional):", ""),
+            ("ip_start", "IP inicial:", "10.0.0.1"),
+            ("seed", "Semilla aleatoria:", "0"),
+        ]
+        for row, (key, label, default) in enumerate(fields):
+            ttk.Label(frame, text=label).grid(row=row, column=0, sticky="w", **pad)
+            var = self.vars[key] = tk.StringVar(value=default)
+            if key == "template":
+                widget = ttk.Combobox(frame, textvariable=var, values=template_names, state="readonly")
+            else:
+                widget = ttk.Entry(frame, textvariable=var)
+            widget.grid(row=row, column=1, sticky="ew", **pad)
+
+        ttk.Label(frame, text="Patrones: {n} número, {i} posición, {community} comunidad.\n"
+                              "Los contadores (65/66/67) se aleatorizan con la semilla.",
+                  foreground="gray").grid(row=len(fields), column=0, columnspan=2, sticky="w", **pad)
+
+        self.bar = ttk.Progressbar(self, mode="determinate")
+        self.bar.pack(fill="x", padx=15, pady=5)
+        self.btn = ttk.Button(self, text="Generar", command=self._start)
+        self.btn.pack(pady=10)
+
+    def _rules(self, template):
+        rules = {}
+        ip_oid = self.vars["ip_oid"].get().strip()
+        if ip_oid:
+            rules[ip_oid] = {"kind": "ip", "start": self.vars["ip_start"].get().strip()}
+        records, _ = bulk_generate.load_template(template)
+        for oid, tag, value in records:
+            if tag in ("65", "66", "67") and oid not in rules:
+                try: top = max(100, int(value) * 2)
+                except ValueError: top = 100
+                rules[oid] = {"kind": "random", "min": 0, "max": top}
+        return rules
+
+    def _start(self):
+        v = {k: var.get().strip() for k, var in self.vars.items()}
+        try:
+            count, start, seed = int(v["count"]), int(v["start"]), int(v["seed"])
+            if count < 1: raise ValueError("la cantidad debe ser mayor que 0")
+            rules = self._rules(v["template"])
+            bulk_generate.validate(v["name"], rules, v["sysname"] or None, start)
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"Parámetros no válidos: {e}", parent=self)
+            return
+
+        self.btn.config(state="disabled")
+        self.sidebar.bulk_running = True
+        data_dir = self.sidebar.current_dir
+
+        def run():
+            try:
+                result = bulk_generate.generate(
+                    data_dir, v["template"], count, v["name"], start, rules, v["sysname"] or None, seed,
+                    on_progress=lambda done, total: self.progress.put(("progress", done, total)))
+                self.progress.put(("done", result, None))
+            except Exception as e:
+                self.progress.put(("error", e, None))
+
+        threading.Thread(target=run, daemon=True).start()
+        # El sondeo va en el sidebar: si cierran el diálogo, la generación sigue y termina bien
+        self.sidebar.after(100, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                kind, a, b = self.progress.get_nowait()
+            except queue.Empty:
+                self.sidebar.after(100, self._poll)
+                return
+            if kind == "progress":
+                if self.winfo_exists():
+                    self.bar.config(maximum=max(1, b), value=a)
+                continue
+            break
+
+        # Fin: una sola sincronización del sidebar para todos los ficheros nuevos
+        try:
+            self.sidebar.refresh()
+        finally:
+            self.sidebar.bulk_running = False
+        is_open = self.winfo_exists()
+        if kind == "error":
+            messagebox.showerror("Error", f"Fallo en la generación: {a}", parent=self if is_open else self.sidebar)
+            if is_open:
+                self.btn.config(state="normal")
+            return
+        msg = f"{a['written']} dispositivos creados."
+        if a["skipped"]:
+            msg += f"\n{len(a['skipped'])} ya existían y no se tocaron."
+        if a["errors"]:
+            msg += f"\n{len(a['errors'])} errores (p.ej. {a['errors'][0]})."
+        messagebox.showinfo("Generación masiva", msg, parent=self.sidebar)
+        if is_open:
+            self.destroy()
@@ -0,0 +1,133 @@
+"""Carga de ficheros .snmprec en segundo plano, por trozos y cancelable.
+
+El parseo (iter_records) es un generador puro; SnmprecLoader lo ejecuta en un
+hilo y entrega los registros al hilo de Tk en bloques, sondeando con after(),
+para que el editor pueda pintar mientras se lee un walk de varios GB.
+
+Se pueden encadenar varios ficheros (la base de un overlay y su delta): se
+leen en orden y cada bloque indica de qué fichero viene.
+"""
+import os
+import queue
+import threading
+
+CHUNK_SIZE = 5000        # registros por bloque entregado a la GUI
+MAX_PENDING_CHUNKS = 8   # el lector no se adelanta más de esto a la GUI
+POLL_MS = 30
+CHUNKS_PER_TICK = 4      # bloques aplicados como mucho en cada vuelta del bucle de Tk
+
+
+def iter_records(path, chunk_size=CHUNK_SIZE, cancelled=None):
+    """Genera (bloque de (oid, tag, valor), bytes leídos) hasta agotar el fichero."""
+    chunk = []
+    done = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            done += len(raw)
+            line = raw.decode("utf-8", errors="replace").strip()
+            if "|" in line and not line.startswith("#"):
+                parts = line.split("|", 2)
+                if len(parts) == 3:
+                    chunk.append((parts[0], parts[1], parts[2]))
+            if len(chunk) >= chunk_size:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                yield chunk, done
+                chunk = []
+    yield chunk, done
+
+
+class SnmprecLoader:
+    """Lee un .snmprec en un hilo y llama a los callbacks desde el hilo de Tk.
+
+    on_chunk(registros, ruta), on_progress(leídos, total), on_done() y
+    on_error(excepción). Tras cancel() no se vuelve a llamar a ninguno.
+    """
+
+    def __init__(self, widget, paths, on_chunk, on_done=None, on_progress=None, on_error=None):
+        self.widget = widget
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.on_chunk = on_chunk
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.total = 0
+        self._queue = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+        self._cancelled = threading.Event()
+        self._job = None
+
+    def start(self):
+        self.total = 0
+        for path in self.paths:
+            try:
+                self.total += os.path.getsize(path)
+            except OSError:
+                pass
+        threading.Thread(target=self._run, daemon=True).start()
+        self._job = self.widget.after(POLL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    # ---------------- HILO LECTOR ---------------- #
+
+    def _put(self, item):
+        # put con espera corta: si cancelan, el hilo no se queda bloqueado en la cola
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            offset = 0
+            for path in self.paths:
+                done = 0
+                for chunk, done in iter_records(path, cancelled=self._cancelled):
+                    if not self._put(("chunk", (chunk, path), offset + done)):
+                        return
+                offset += done
+            self._put(("done", None, self.total))
+        except Exception as e:
+            self._put(("error", e, 0))
+
+    # ---------------- HILO DE TK ---------------- #
+
+    def _poll(self):
+        self._job = None
+        for _ in range(CHUNKS_PER_TICK):
+            if self._cancelled.is_set():
+                return
+            try:
+                kind, payload, done = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "chunk":
+                records, path = payload
+                if records:
+                    self.on_chunk(records, path)
+                if self.on_progress:
+                    self.on_progress(done, self.total)
+            elif kind == "done":
+                if self.on_done:
+                    self.on_done()
+                return
+            else:
+                if self.on_error:
+                    self.on_error(payload)
+                return
+
+        if not self._cancelled.is_set():
+            self._job = self.widget.after(POLL_MS, self._poll)
@@ -5,19 +5,75 @@ import threading
 import time
 from pathlib import Path
 
+from gui.control_channel import ControlClient, free_udp_port
+from gui.index_backends import DEFAULT_BACKEND
+from gui.log_pipeline import LogPipeline
+from gui.metrics import MetricsCollector
+from gui import prewarm
+from gui import dynamic_values
 
-class SNMPSimRunner: 
+
+# Un worker que muere antes de este tiempo se considera un fallo de arranque
+# (puerto ocupado, datos inválidos...) y no se vuelve a lanzar.
+MIN_WORKER_UPTIME = 5.0
+# Plazo para que todos los workers contesten "ready" al ping tras lanzarlos
+READY_TIMEOUT = 120.0
+# Plazo de cada worker para aplicar una recarga (los índices ya vienen precalentados)
+RELOAD_TIMEOUT = 60.0
+
+
+def reuseport_supported() -> bool:
+    """Solo Linux reparte datagramas UDP entre sockets con SO_REUSEPORT."""
+    return sys.platform.startswith("linux")
+
+
+class SNMPSimRunner:
 
     def __init__(self, on_output=None):
-        self.process = None
+        self.workers = {}  # índice -> (Popen, hora de arranque)
         self.on_output = on_output
         # Ajustamos base_dir para que apunte a la raíz del proyecto
         # Asumiendo que este archivo está en /gui/, subimos un nivel (.parent)
         self.base_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent
         self.runtime_dir = self.base_dir / "runtime"
+        self.cache_dir = self.runtime_dir / "cache"
+        self.worker_count = 1
+        self.endpoint = None
+        self.data_dir = None
+        self.index_backend = DEFAULT_BACKEND
+        # "stopped" -> "starting" (índices + arranque) -> "running" (todos los workers listos)
+        self.state = "stopped"
+        self.epoch = None  # origen de tiempos de los valores dinámicos mientras está en marcha
+        self.control = None
+        self.control_ports = {}  # índice de worker -> puerto del canal de control
+        self.metrics = None  # MetricsCollector, vive mientras viva el runner
+        self.metrics_file = self.runtime_dir / "metrics" / "snmpsim.prom"
+        self.log_dir = self.runtime_dir / "logs"
+        self.log_level = "info"  # nivel mínimo que llega a la consola (a disco va todo)
+        self.log_pipeline = None
+        self._cmd = None
+        self._env = None
+        self._lock = threading.Lock()
+        # Un Event nuevo por arranque: los hilos de un arranque anterior conservan el
+        # suyo (ya activado) y no pueden lanzar workers en el arranque siguiente
+        self._stopping = threading.Event()
+        self._stopping.set()
+        self._reloading = threading.Lock()
 
-    def start(self, endpoint: str, data_dir: str):
-        if self.process:
+    def is_running(self) -> bool:
+        with self._lock:
+            return bool(self.workers)
+
+    def alive_workers(self) -> int:
+        with self._lock:
+            return len(self.workers)
+
+    def start(self, endpoint: str, data_dir: str, workers: int = 1, index_backend: str = DEFAULT_BACKEND):
+        """Arranca en segundo plano: índices en paralelo, workers y espera a que contesten.
+
+        Vuelve enseguida; el progreso llega por on_output y el estado en self.state.
+        """
+        if self.state != "stopped":
             return
 
         # 1. Asegurar que el directorio runtime exista
@@ -28,74 +84,299 @@ class SNMPSimRunner:
                 if self.on_output: self.on_output(f"Error creando directorio runtime: {e}")
                 return
 
+        workers = max(1, int(workers))
+        if workers > 1 and not reuseport_supported():
+            if self.on_output:
+                self.on_output("AVISO: SO_REUSEPORT no disponible en esta plataforma, se usará 1 worker.")
+            workers = 1
+        self.worker_count = workers
+        self.endpoint = endpoint
+        self.data_dir = data_dir
+        self.index_backend = index_backend
+
         if self.on_output:
             self.on_output(f"--- Iniciando simulador ---")
             self.on_output(f"Data: {data_dir}")
             self.on_output(f"Endpoint: {endpoint}")
+            self.on_output(f"Índice: {index_backend}")
+            if workers > 1:
+                self.on_output(f"Workers: {workers} (SO_REUSEPORT)")
+
+        self._cmd = self._build_command(endpoint, data_dir)
+        self._env = dict(os.environ)
+        self._env["SNMPSIM_GUI_INDEX"] = index_backend
+        # Origen de tiempos común: contadores y uptime iguales en todos los workers y relanzamientos
+        self.epoch = time.time()
+        self._env[dynamic_values.EPOCH_ENV] = repr(self.epoch)
+        if workers > 1:
+            # El launcher activa SO_REUSEPORT solo sobre el puerto SNMP
+            self._env["SNMPSIM_GUI_REUSEPORT"] = endpoint.rsplit(":", 1)[-1]
+
+        self.control_ports = {idx: free_udp_port() for idx in range(workers)}
+
+        if self.log_pipeline is None:
+            self.log_pipeline = LogPipeline(self.on_output, str(self.log_dir), level=self.log_level)
+
+        # Los workers envían sus contadores cada segundo a este colector
+        if self.metrics is None:
+            self.metrics = MetricsCollector(textfile=str(self.metrics_file)).start()
+        else:
+            self.metrics.reset()
+        self._env["SNMPSIM_GUI_METRICS"] = str(self.metrics.port)
+
+        stopping = self._stopping = threading.Event()
+        self.state = "starting"
+        threading.Thread(target=self._startup, args=(data_dir, index_backend, stopping), daemon=True).start()
+
+    def _startup(self, data_dir, index_backend, stopping):
+        # 1. Índices en paralelo con el mismo backend y cache-dir que los workers
+        try:
+            if not prewarm.prewarm(data_dir, str(self.cache_dir), index_backend,
+                                   on_output=self.on_output, cancelled=stopping, owner=self):
+                return
+        except Exception as e:
+            # Sin precalentado los workers indexan por su cuenta: más lento, pero funciona
+            if self.on_output:
+                self.on_output(f"AVISO: no se pudieron precalentar los índices: {e}")
+        if stopping.is_set():
+            return
+
+        # 2. Workers
+        for idx in range(self.worker_count):
+            if not self._spawn_worker(idx, stopping):
+                if not stopping.is_set():
+                    self.stop()
+                return
+        threading.Thread(target=self._supervise, args=(stopping,), daemon=True).start()
+
+        # 3. En verde cuando todos atienden peticiones, o al agotar la espera si alguno lo hace
+        ready = self._wait_ready(stopping)
+        if stopping.is_set() or not self.is_running():
+            return  # sin workers, _supervise lo da por detenido
+        self.state = "running"
+        if self.on_output:
+            if ready:
+                self.on_output(f"--- Simulador listo ({self.worker_count} worker{'s' if self.worker_count > 1 else ''}) ---")
+            else:
+                self.on_output(f"--- Simulador en marcha con {self.alive_workers()} worker(s) "
+                               f"(no todos confirmaron el arranque) ---")
+
+    def _wait_ready(self, stopping) -> bool:
+        if self.control is None:
+            self.control = ControlClient()
+        pending = set(self.control_ports.values())
+        deadline = time.monotonic() + READY_TIMEOUT
+        while pending and time.monotonic() < deadline:
+            if stopping.is_set() or not self.is_running():
+                return False
+            for port in list(pending):
+                reply = self.control.request(port, {"op": "ping"}, timeout=0.3)
+                if reply and reply.get("ready"):
+                    pending.discard(port)
+            if pending:
+                stopping.wait(0.2)
+        if pending and self.on_output:
+            self.on_output(f"AVISO: {len(pending)} worker(s) no respondieron al ping de arranque")
+        return not pending and not stopping.is_set()
+
+    def _build_command(self, endpoint, data_dir):
+        # Solo el módulo "dynamic" (valores que cambian con el reloj, ver gui/dynamic_values.py)
+        variation_dir = dynamic_values.VARIATION_DIR
 
         is_frozen = getattr(sys, 'frozen', False)
-        
+
         if is_frozen:
-            empty_dir = os.path.join(os.environ['TEMP'], "snmpsim_empty")
-            os.makedirs(empty_dir, exist_ok=True)
-            executable = sys.executable
-            cmd = [
-                executable,
+            return [
+                sys.executable,
                 "-m", "snmpsim.commands.responder",  # Invocamos el módulo interno
                 "--data-dir", data_dir,
+                "--variation-modules-dir", variation_dir,
+                "--cache-dir", str(self.cache_dir),
                 "--agent-udpv4-endpoint", endpoint
             ]
-        else:
-            # En modo desarrollo, seguimos usando tu launcher.py
-            launcher_path = self.base_dir / "gui" / "launcher.py"
-            cmd = [
-                "python",
-                str(launcher_path),
-                "--data-dir", data_dir,
-                "--variation-modules-dir", empty_dir,
-                "--agent-udpv4-endpoint", endpoint
-            ]
+        # En modo desarrollo, seguimos usando tu launcher.py
+        launcher_path = self.base_dir / "gui" / "launcher.py"
+        return [
+            sys.executable,
+            str(launcher_path),
+            "--data-dir", data_dir,
+            "--variation-modules-dir", variation_dir,
+            "--cache-dir", str(self.cache_dir),
+            "--agent-udpv4-endpoint", endpoint
+        ]
 
+    def _spawn_worker(self, idx, stopping) -> bool:
+        prefix = f"[w{idx + 1}] " if self.worker_count > 1 else ""
         try:
             # Usamos cwd=str(self.runtime_dir) para que cree archivos temporales ahí si lo necesita
-            self.process = subprocess.Popen(
-                cmd,
+            process = subprocess.Popen(
+                self._cmd,
                 cwd=str(self.runtime_dir),
+                env={**self._env, "SNMPSIM_GUI_CONTROL": str(self.control_ports[idx])},
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
                 bufsize=1  # Line buffered
             )
-
-            # Hilos para leer la salida sin bloquear la GUI
-            threading.Thread(target=self._read_stream, args=(self.process.stdout,), daemon=True).start()
-            threading.Thread(target=self._read_stream, args=(self.process.stderr,), daemon=True).start()
-            
         except Exception as e:
             if self.on_output:
                 self.on_output(f"ERROR CRÍTICO AL INICIAR: {e}")
+            return False
+
+        with self._lock:
+            # stop() pudo llegar mientras arrancaba: este proceso ya no es de nadie
+            orphan = stopping.is_set()
+            if not orphan:
+                self.workers[idx] = (process, time.monotonic())
+        if orphan:
+            process.kill()
+            process.wait()
+            return False
+
+        # Hilos para leer la salida sin bloquear la GUI
+        threading.Thread(target=self._read_stream, args=(process.stdout, prefix), daemon=True).start()
+        threading.Thread(target=self._read_stream, args=(process.stderr, prefix), daemon=True).start()
+        return True
+
+    def set_value(self, data_file, oid, tag, value) -> bool:
+        """Inyecta un valor en memoria en todos los workers, sin pasar por disco."""
+        if not self.is_running():
+            return False
+        if self.control is None:
+            self.control = ControlClient()
+        self.control.send(list(self.control_ports.values()), {
+            "op": "set", "file": str(data_file), "oid": oid, "tag": tag, "value": str(value)
+        })
+        return True
+
+    def clear_values(self, data_file=None, oids=None) -> bool:
+        """Olvida lo inyectado con set_value: todo, un fichero o solo algunos OIDs de él."""
+        if not self.is_running():
+            return False
+        if self.control is None:
+            self.control = ControlClient()
+        msg = {"op": "clear"}
+        if data_file is not None:
+            msg["file"] = str(data_file)
+            if oids is not None:
+                msg["oids"] = list(oids)
+        self.control.send(list(self.control_ports.values()), msg)
+        return True
 
-    def _read_stream(self, stream):
-        """Lee línea por línea del subproceso."""
+    def reload(self) -> bool:
+        """Aplica en caliente los cambios del directorio de datos, sin parar el endpoint.
+
+        Los índices de lo que cambió se construyen en el pool (como al arrancar)
+        y después cada worker intercambia solo esos ficheros y registra o retira
+        las comunidades nuevas o borradas.
+        """
+        if self.state != "running" or not self._reloading.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._reload, daemon=True).start()
+        return True
+
+    def _reload(self):
+        stopping = self._stopping
         try:
-            for line in iter(stream.readline, ""):
+            if self.on_output:
+                self.on_output("--- Recargando datos ---")
+            try:
+                if not prewarm.prewarm(self.data_dir, str(self.cache_dir), self.index_backend,
+                                       on_output=self.on_output, cancelled=stopping, owner=self):
+                    return
+            except Exception as e:
+                if self.on_output:
+                    self.on_output(f"AVISO: no se pudieron precalentar los índices: {e}")
+
+            if self.control is None:
+                self.control = ControlClient()
+            for idx, port in sorted(self.control_ports.items()):
+                reply = self.control.request(port, {"op": "reload"}, timeout=RELOAD_TIMEOUT)
+                if not self.on_output:
+                    continue
+                prefix = f"[w{idx + 1}] " if self.worker_count > 1 else ""
+                if reply is None:
+                    self.on_output(f"{prefix}AVISO: el worker no respondió a la recarga")
+                elif not reply.get("ok") or reply.get("error"):
+                    self.on_output(f"{prefix}ERROR en la recarga: {reply.get('error')}")
+                else:
+                    self.on_output(f"{prefix}Recarga: {reply['changed']} cambiados, "
+                                   f"{reply['added']} añadidos, {reply['removed']} retirados")
+            if self.on_output:
+                self.on_output("--- Recarga terminada ---")
+        finally:
+            self._reloading.release()
+
+    def metrics_snapshot(self):
+        """Resumen de métricas (req/s, errores, latencias) o None si no está en marcha."""
+        if self.metrics is None or self.state == "stopped":
+            return None
+        return self.metrics.snapshot()
+
+    def _supervise(self, stopping):
+        """Vigila la flota: relanza workers caídos y la da por muerta si no queda ninguno."""
+        while not stopping.wait(0.5):
+            with self._lock:
+                dead = [(idx, proc, started) for idx, (proc, started) in self.workers.items()
+                        if proc.poll() is not None]
+                for idx, _, _ in dead:
+                    del self.workers[idx]
+
+            for idx, proc, started in dead:
+                if stopping.is_set():
+                    return
+                uptime = time.monotonic() - started
                 if self.on_output:
-                    self.on_output(line.rstrip())
+                    self.on_output(f"--- Worker {idx + 1} terminó (código {proc.returncode}) ---")
+                if uptime >= MIN_WORKER_UPTIME:
+                    if self.on_output:
+                        self.on_output(f"--- Relanzando worker {idx + 1} ---")
+                    self._spawn_worker(idx, stopping)
+
+            if not self.is_running() and not stopping.is_set():
+                self.state = "stopped"
+                if self.on_output:
+                    self.on_output("--- Simulador detenido (sin workers activos) ---")
+                return
+
+    def set_log_level(self, level):
+        self.log_level = level
+        if self.log_pipeline is not None:
+            self.log_pipeline.set_level(level)
+
+    def _read_stream(self, stream, prefix=""):
+        """Lee línea por línea del subproceso y la pasa por el pipeline de logs."""
+        try:
+            for line in iter(stream.readline, ""):
+                self.log_pipeline.feed(line.rstrip(), prefix)
         except ValueError:
             pass  # El archivo se cerró
 
     def stop(self):
-        if self.process:
-            if self.on_output:
-                self.on_output("--- Deteniendo simulador... ---")
-            
-            self.process.terminate()
+        self._stopping.set()
+        self.state = "stopped"
+        self.epoch = None
+        prewarm.release(self)
+        with self._lock:
+            processes = [proc for proc, _ in self.workers.values()]
+            self.workers.clear()
+
+        if not processes:
+            return
+
+        if self.on_output:
+            self.on_output("--- Deteniendo simulador... ---")
+
+        # Terminamos todos a la vez y esperamos con un único plazo compartido
+        for proc in processes:
+            proc.terminate()
+        deadline = time.monotonic() + 2
+        for proc in processes:
             try:
-                self.process.wait(timeout=2)
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
             except subprocess.TimeoutExpired:
-                self.process.kill()  # Forzar cierre si se cuelga
-            
-            self.process = None
-            if self.on_output:
-                self.on_output("--- Simulador detenido ---")
+                proc.kill()  # Forzar cierre si se cuelga
+
+        if self.on_output:
+            self.on_output("--- Simulador detenido ---")
@@ -0,0 +1,168 @@
+"""Traza de arranque: tiempo de cada import y de cada fase de construcción de la GUI.
+
+Se activa con `python main.py --trace-startup[=fichero.json]` o con la
+variable SNMPSIM_GUI_TRACE=fichero.json (igual en el ejecutable congelado).
+Desactivada, span() y mark() no hacen nada.
+
+Los imports se miden con un finder al principio de sys.meta_path que delega
+en los demás (también en el de PyInstaller) y envuelve el loader del módulo
+encontrado; así cada import tiene su tiempo acumulado y el propio (sin sus
+imports anidados). Al terminar, finish() escribe un JSON con fases, marcas y
+los imports más caros.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+DEFAULT_REPORT = "startup_trace.json"
+TOP_IMPORTS = 40
+
+_t0 = time.perf_counter()
+_enabled = False
+_report_path = None
+_spans = []     # [nombre, inicio ms, duración ms, profundidad]
+_marks = []     # [nombre, ms desde el inicio]
+_imports = []   # [módulo, acumulado ms, propio ms]
+_depth = 0
+_import_stack = []  # tiempo de imports hijos de cada import en curso
+
+
+def _now_ms():
+    return (time.perf_counter() - _t0) * 1000.0
+
+
+def enabled():
+    return _enabled
+
+
+def enable(path=None, import_hook=True):
+    """Activa la traza (idempotente). path: fichero JSON del informe."""
+    global _enabled, _report_path
+    _report_path = path or _report_path or DEFAULT_REPORT
+    if _enabled:
+        return
+    _enabled = True
+    if import_hook:
+        sys.meta_path.insert(0, _TimingFinder())
+
+
+def enable_from_argv(argv):
+    """Busca --trace-startup[=ruta] o SNMPSIM_GUI_TRACE; devuelve argv sin la opción."""
+    rest = []
+    path = os.environ.get("SNMPSIM_GUI_TRACE")
+    wanted = bool(path)
+    for arg in argv:
+        if arg == "--trace-startup":
+            wanted = True
+        elif arg.startswith("--trace-startup="):
+            wanted, path = True, arg.split("=", 1)[1]
+        else:
+            rest.append(arg)
+    if wanted:
+        enable(path)
+    return rest
+
+
+@contextmanager
+def span(name):
+    global _depth
+    if not _enabled:
+        yield
+        return
+    entry = [name, _now_ms(), 0.0, _depth]
+    _spans.append(entry)
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        entry[2] = _now_ms() - entry[1]
+
+
+def mark(name):
+    if _enabled:
+        _marks.append([name, _now_ms()])
+
+
+def report():
+    imports = sorted(_imports, key=lambda item: item[2], reverse=True)
+    return {
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "python": sys.version.split()[0],
+        "total_ms": round(_now_ms(), 1),
+        "marks": [{"name": n, "ms": round(ms, 1)} for n, ms in _marks],
+        "spans": [{"name": n, "start_ms": round(s, 1), "ms": round(d, 1), "depth": depth}
+                  for n, s, d, depth in _spans],
+        "imports_total_ms": round(sum(self_ms for _, _, self_ms in _imports), 1),
+        "imports_count": len(_imports),
+        "imports_top": [{"module": m, "cumulative_ms": round(c, 1), "self_ms": round(s, 1)}
+                        for m, c, s in imports[:TOP_IMPORTS]],
+    }
+
+
+def finish(on_output=None):
+    """Escribe el informe (una vez) y devuelve su ruta, o None si la traza está desactivada."""
+    global _enabled
+    if not _enabled:
+        return None
+    mark("finish")
+    data = report()
+    _enabled = False
+    with open(_report_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    if on_output:
+        slowest = ", ".join(f"{s['name']} {s['ms']:.0f} ms" for s in
+                            sorted(data["spans"], key=lambda s: s["ms"], reverse=True)[:3])
+        on_output(f"Traza de arranque: {data['total_ms']:.0f} ms, imports {data['imports_total_ms']:.0f} ms "
+                  f"({slowest}) -> {os.path.abspath(_report_path)}")
+    return _report_path
+
+
+class _TimedLoader:
+    """Envuelve el loader real; el resto de atributos se delegan tal cual."""
+
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        return create(spec) if create else None
+
+    def exec_module(self, module):
+        started = time.perf_counter()
+        _import_stack.append(0.0)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            children = _import_stack.pop()
+            total = (time.perf_counter() - started) * 1000.0
+            if _import_stack:
+                _import_stack[-1] += total
+            _imports.append([self._name, total, total - children])
+
+
+class _TimingFinder:
+
+    def find_spec(self, name, path, target=None):
+        if not _enabled:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, name)
+        return spec
+
+    def invalidate_caches(self):
+        pass
@@ -0,0 +1,355 @@
+"""Reproducción de históricos: un fichero de series por dispositivo, leído con mmap.
+
+Un .snmpts guarda una matriz instante × OID en columnas de 8 bytes:
+
+    cabecera | JSON con oids, tags y tipos | tiempos (filas) | columna OID 1 | columna OID 2 | ...
+
+Contadores y TimeTicks van como enteros sin signo (uint64, exactos hasta
+2^64); el resto como float64.
+Los tiempos son segundos desde la primera muestra y van en orden, así que
+buscar un instante es una bisección sobre la columna de tiempos mapeada
+(sin copiarla a memoria) y el valor sale de interpolar las dos filas
+vecinas de la columna del OID. El fichero lo comparten todos los workers a
+través de la caché de páginas del sistema: miles de dispositivos cuestan
+lo que ocupan sus series, no un proceso ni una copia por dispositivo.
+
+En el .snmprec, cada OID que varía apunta a la serie con el módulo replay:
+
+    1.3.6.1.2.1.2.2.1.10.1|65:replay|series=.series/router.snmpts
+
+Opciones del valor: speed (1 = tiempo real), offset (segundos), loop (0/1)
+e interp (linear o step; por defecto step para Integer y linear para el
+resto). El instante reproducido es (ahora - EPOCH) * speed + offset, con el
+mismo EPOCH que los valores dinámicos (ver dynamic_values): todos los
+workers reproducen lo mismo. Al dar la vuelta, contadores y TimeTicks
+suman lo que avanzaron en cada vuelta en lugar de retroceder.
+
+Al importar, un Counter32 que baja poco antes de 2^32 dio la vuelta y se
+guarda desenrollado; cualquier otra bajada de un contador o de TimeTicks es
+un reinicio del equipo y se guarda tal cual. En un reinicio no se interpola:
+el valor salta en la fila siguiente, y una serie con reinicios se repite sin
+sumar vueltas.
+
+import_snapshots() crea el .snmprec y su serie a partir de varias
+instantáneas .snmprec del mismo dispositivo.
+
+Uso: python -m gui.timeseries SNAPSHOT... --out data/router.snmprec [--interval 60]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import dynamic_values
+from gui.record_store import oid_key
+from gui.writeback import atomic_write
+
+MODULE = "replay"
+SERIES_DIR = ".series"
+SERIES_SUFFIX = ".snmpts"
+MAGIC = b"SNMPTS1\n"
+# magia, versión, filas, columnas, instante absoluto de la primera fila, bytes del JSON
+HEADER = struct.Struct("<8sIIIdQ")
+VERSION = 2
+MONOTONIC_TAGS = ("65", "67", "70")  # al repetir el histórico siguen creciendo
+INTEGER, FLOAT = "Q", "d"  # tipos de columna (códigos de array)
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class SeriesFile:
+    """Serie mapeada en memoria; sample() es una bisección y una interpolación."""
+
+    def __init__(self, path):
+        self.path = path
+        st = os.stat(path)
+        self.stamp = (st.st_size, st.st_mtime_ns)
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, self.t0, meta_len = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            if magic == MAGIC:
+                raise ValueError(f"{path}: versión {version} de {SERIES_SUFFIX} no soportada; vuelve a importarla")
+            raise ValueError(f"{path}: no es una serie {SERIES_SUFFIX} válida")
+        meta = json.loads(self._map[HEADER.size:HEADER.size + meta_len].decode("utf-8"))
+        self.rows = rows
+        self.oids = meta["oids"]
+        self.tags = meta["tags"]
+        self.integer = [code == INTEGER for code in meta["types"]]
+        # Columnas con algún reinicio: al repetir el histórico no suman vueltas
+        self.resets = set(meta["resets"])
+        self.columns = {oid: i for i, oid in enumerate(self.oids)}
+
+        start = _align(HEADER.size + meta_len)
+        self._view = memoryview(self._map)
+        self.times = self._view[start:start + rows * 8].cast("d")
+        self._values = []
+        for col, code in enumerate(meta["types"]):
+            offset = start + rows * 8 * (col + 1)
+            self._values.append(self._view[offset:offset + rows * 8].cast(code))
+        self.duration = self.times[rows - 1] if rows else 0.0
+
+    def column(self, oid):
+        return self.columns.get(oid)
+
+    def sample(self, col, t, step=False, hint=None):
+        """Valor de la columna en el instante t (segundos desde la primera fila).
+
+        hint es la fila de la llamada anterior: como el tiempo avanza, casi
+        siempre sigue valiendo y la bisección se evita. Devuelve (valor, fila).
+        """
+        times = self.times
+        rows = self.rows
+        if hint is not None and 0 < hint < rows and times[hint - 1] <= t < times[hint]:
+            i = hint
+        else:
+            i = bisect_right(times, t)
+        values = self._values[col]
+        if i <= 0:
+            return values[0], i
+        if i >= rows:
+            return values[rows - 1], i
+        before = values[i - 1]
+        after = values[i]
+        # Un contador que baja es un reinicio: salta en la fila siguiente, sin valores intermedios
+        if step or self.integer[col] and after < before:
+            return before, i
+        t_before = times[i - 1]
+        delta = (after - before) * (t - t_before) / (times[i] - t_before)
+        # En las columnas enteras solo el incremento pasa por float: before queda exacto
+        return before + (int(delta) if self.integer[col] else delta), i
+
+    def first_last(self, col):
+        values = self._values[col]
+        return values[0], values[self.rows - 1]
+
+    def close(self):
+        for view in (self.times, *self._values, self._view):
+            view.release()
+        self._map.close()
+
+
+def parse_params(text):
+    raw = dynamic_values.parse_raw(text)
+    params = {"series": raw.pop("series", ""), "oid": raw.pop("oid", ""), "interp": raw.pop("interp", ""),
+              "speed": 1.0, "offset": 0.0, "loop": 1.0}
+    if not params["series"]:
+        raise ValueError("falta series=<fichero .snmpts>")
+    if params["interp"] not in ("", "linear", "step"):
+        raise ValueError("interp debe ser linear o step")
+    for key, value in raw.items():
+        if key not in params:
+            raise ValueError(f"parámetro desconocido: {key}")
+        params[key] = float(value)
+    return params
+
+
+def replay_value(series, col, tag, params, now, start_epoch, hint=None):
+    """Valor entero del OID en el instante de reproducción. Devuelve (valor, fila)."""
+    tag = dynamic_values.base_tag(tag)
+    t = max(0.0, (now - start_epoch) * params["speed"] + params["offset"])
+    laps = 0
+    if series.duration > 0:
+        if params["loop"]:
+            laps, t = divmod(t, series.duration)
+            laps = int(laps)  # entero: en columnas enteras la suma debe quedar exacta
+        else:
+            t = min(t, series.duration)
+    step = params["interp"] == "step" or (not params["interp"] and tag == "2")
+    value, row = series.sample(col, t, step, hint)
+    if laps and tag in MONOTONIC_TAGS and col not in series.resets:
+        first, last = series.first_last(col)
+        value += laps * (last - first)
+
+    value = int(value)
+    if tag in dynamic_values.WRAP:
+        return value % dynamic_values.WRAP[tag], row
+    low, high = dynamic_values.LIMITS.get(tag, (None, None))
+    if low is not None:
+        value = min(max(value, low), high)
+    return value, row
+
+
+# ---------------- IMPORTACIÓN ---------------- #
+
+def read_snapshot(path):
+    """{oid: (tag, valor)} de un .snmprec (comentarios y líneas vacías fuera)."""
+    records = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split("|", 2)
+            if len(parts) == 3:
+                records[parts[0]] = (parts[1], parts[2])
+    return records
+
+
+def _number(value, tag):
+    """Valor numérico del registro: entero sin signo en contadores y TimeTicks, float en el resto."""
+    try:
+        if tag in MONOTONIC_TAGS:
+            number = int(value)
+            return number if number >= 0 else None
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _unwrap(tag, numbers):
+    """Columna de un contador lista para guardar: desenrolla las vueltas de Counter32.
+
+    Una bajada es una vuelta solo en Counter32 y si lo recorrido pasando por
+    2^32 es menos de media vuelta; si no (y siempre en Counter64 y TimeTicks)
+    es un reinicio y el valor se queda como está. Devuelve (valores, hay_reinicio).
+    """
+    wrap, extra, reset = dynamic_values.WRAP[tag], 0, False
+    unwrapped = [numbers[0]]
+    for before, after in zip(numbers, numbers[1:]):
+        if after < before:
+            if tag == "65" and after + wrap - before < wrap // 2:
+                extra += wrap
+            else:
+                # Tras un reinicio el contador vuelve a empezar desde su valor real
+                reset, extra = True, 0
+        unwrapped.append(after + extra)
+    return unwrapped, reset
+
+
+def write_series(path, times, oids, tags, columns, t0=0.0, resets=()):
+    """Escribe la serie de forma atómica (temporal + rename).
+
+    Las columnas de contadores y TimeTicks se guardan como enteros; resets son
+    los índices de las columnas que tienen algún reinicio.
+    """
+    types = [INTEGER if tag in MONOTONIC_TAGS else FLOAT for tag in tags]
+    meta = json.dumps({"oids": oids, "tags": tags, "types": types,
+                       "resets": sorted(resets)}).encode("utf-8")
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(times), len(oids), t0, len(meta)))
+            f.write(meta)
+            f.write(b"\0" * (_align(HEADER.size + len(meta)) - HEADER.size - len(meta)))
+            array("d", times).tofile(f)
+            for code, column in zip(types, columns):
+                array(code, column).tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def import_snapshots(paths, out_path, interval=None, on_progress=None):
+    """Crea out_path (.snmprec) y su serie en DATA_DIR/.series a partir de instantáneas.
+
+    Las instantáneas se toman en orden de nombre. Sin interval, el instante de
+    cada una es su fecha de modificación. Los OIDs numéricos que cambian van a
+    la serie; el resto queda como registro normal con su último valor.
+    """
+    paths = sorted(paths, key=os.path.basename)
+    if len(paths) < 2:
+        raise ValueError("hacen falta al menos dos instantáneas")
+    if interval:
+        times = [i * float(interval) for i in range(len(paths))]
+        t0 = os.stat(paths[0]).st_mtime
+    else:
+        stamps = [os.stat(p).st_mtime for p in paths]
+        t0 = stamps[0]
+        times = [s - t0 for s in stamps]
+        if any(b <= a for a, b in zip(times, times[1:])):
+            raise ValueError("las fechas de los ficheros no van en orden; indica el intervalo")
+
+    snapshots = []
+    for done, path in enumerate(paths, 1):
+        snapshots.append(read_snapshot(path))
+        if on_progress:
+            on_progress(done, len(paths))
+
+    oids = sorted({oid for snap in snapshots for oid in snap}, key=oid_key)
+    static = {}
+    series_oids, series_tags, columns, resets = [], [], [], set()
+    for oid in oids:
+        values = []
+        last = None
+        for snap in snapshots:
+            # Un OID que falta en una instantánea conserva el valor anterior
+            last = snap.get(oid, last)
+            values.append(last)
+        first = next(v for v in values if v is not None)
+        values = [v or first for v in values]
+        tag = values[-1][0]
+        numbers = [_number(v, tag) for _, v in values]
+        if tag not in dynamic_values.NUMERIC_TAGS or None in numbers or len(set(numbers)) == 1 \
+                or any(t != tag for t, _ in values):
+            static[oid] = values[-1]
+            continue
+        if tag in MONOTONIC_TAGS:
+            numbers, reset = _unwrap(tag, numbers)
+            if reset:
+                resets.add(len(series_oids))
+        series_oids.append(oid)
+        series_tags.append(tag)
+        columns.append(numbers)
+
+    data_dir = os.path.dirname(os.path.abspath(out_path))
+    name = os.path.splitext(os.path.basename(out_path))[0]
+    ref = f"{SERIES_DIR}/{name}{SERIES_SUFFIX}"
+    if series_oids:
+        write_series(os.path.join(data_dir, SERIES_DIR, name + SERIES_SUFFIX),
+                     times, series_oids, series_tags, columns, t0, resets)
+
+    lines = []
+    replayed = dict(zip(series_oids, series_tags))
+    for oid in oids:
+        if oid in replayed:
+            lines.append(f"{oid}|{replayed[oid]}:{MODULE}|series={ref}\n")
+        else:
+            tag, value = static[oid]
+            lines.append(f"{oid}|{tag}|{value}\n")
+    # Los workers pueden correr con otro usuario
+    atomic_write(out_path, "".join(lines), mode=0o644)
+    return {"snapshots": len(paths), "series": len(series_oids), "static": len(static),
+            "duration": times[-1], "series_path": ref if series_oids else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crea un dispositivo que reproduce un histórico de instantáneas .snmprec.")
+    parser.add_argument("snapshots", nargs="+")
+    parser.add_argument("--out", required=True, help="fichero .snmprec del dispositivo (en el directorio de datos)")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="segundos entre instantáneas (por defecto, su fecha de modificación)")
+    args = parser.parse_args(argv)
+
+    try:
+        result = import_snapshots(args.snapshots, args.out, args.interval)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{result['snapshots']} instantáneas, {result['duration']:.0f} s: "
+          f"{result['series']} OIDs en la serie, {result['static']} fijos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
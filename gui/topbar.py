@@ -3,15 +3,25 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import json
+import threading
 from gui import utils
 
+FLEET_POLL_MS = 1000
+# Color de cada estado en el diálogo de perfiles (mismos que el LED)
+STATE_COLORS = {"running": "#00AA00", "starting": "#B8860B", "stopped": "#CC0000"}
+
 class TopBar(ttk.Frame):
 
-    def __init__(self, parent, on_start, on_stop, on_dir_change=None):
+    def __init__(self, parent, on_start, on_stop, on_dir_change=None, on_reload=None, fleet=None):
         super().__init__(parent)
         self.on_start = on_start
         self.on_stop = on_stop
+        self.on_reload = on_reload
         self.on_dir_change = on_dir_change
+        self.fleet = fleet  # ProfileFleet: perfiles en paralelo, aparte del simulador principal
+        self.fleet_dialog = None
+        self.running = False
+        self.state = "stopped"
         
         self._build_ui()
 
@@ -29,13 +39,22 @@ class TopBar(ttk.Frame):
         self.btn_stop = ttk.Button(exec_frame, text="⏹", width=3, command=self.on_stop, state="disabled")
         self.btn_stop.pack(side="left", padx=2)
 
+        # Recarga en caliente de los ficheros cambiados (solo con el simulador en marcha)
+        self.btn_reload = ttk.Button(exec_frame, text="⟳", width=3, state="disabled",
+                                     command=lambda: self.on_reload and self.on_reload())
+        self.btn_reload.pack(side="left", padx=2)
+
         # LED de estado
         self.led = tk.Canvas(self, width=15, height=15, highlightthickness=0)
         self.led_circle = self.led.create_oval(2, 2, 13, 13, fill="red")
         self.led.pack(side="left", padx=(5, 0))
 
         self.status_var = tk.StringVar(value="STOPPED")
-        ttk.Label(self, textvariable=self.status_var, font=("Segoe UI", 9, "bold")).pack(side="left", padx=(5, 15))
+        ttk.Label(self, textvariable=self.status_var, font=("Segoe UI", 9, "bold")).pack(side="left", padx=(5, 5))
+
+        # Carga del responder (req/s, p99 y errores), vacío con el simulador parado
+        self.rate_var = tk.StringVar(value="")
+        ttk.Label(self, textvariable=self.rate_var, width=24, foreground="#555555").pack(side="left", padx=(0, 10))
 
         ttk.Separator(self, orient="vertical").pack(side="left", fill="y", padx=10)
         
@@ -69,6 +88,13 @@ class TopBar(ttk.Frame):
         self.port_entry.insert(0, "1024")
         self.port_entry.pack(side="left", padx=2)
 
+        # Número de procesos responder que comparten el endpoint
+        ttk.Label(self, text="Workers:").pack(side="left", padx=(8, 0))
+        self.workers_spin = ttk.Spinbox(self, from_=1, to=os.cpu_count() or 1, width=3,
+                                        validate='key', validatecommand=vcmd)
+        self.workers_spin.set("1")
+        self.workers_spin.pack(side="left", padx=2)
+
         # --- 4. Perfiles ---
         ttk.Separator(self, orient="vertical").pack(side="left", fill="y", padx=10)
 
@@ -82,6 +108,10 @@ class TopBar(ttk.Frame):
         self.btn_save.pack(side="left", padx=2)
         self.btn_delete = ttk.Button(self, text="🗑", width=3, command=self._delete_current_profile)
         self.btn_delete.pack(side="left", padx=2)
+
+        # Varios perfiles a la vez, cada uno en su endpoint
+        if self.fleet is not None:
+            ttk.Button(self, text="⧉", width=3, command=self._open_fleet).pack(side="left", padx=2)
         
         # Cargar perfiles al iniciar
         self._refresh_profile_list()
@@ -96,46 +126,76 @@ class TopBar(ttk.Frame):
             self.on_start()
 
     def set_running(self, running: bool):
-        if running:
-            self.status_var.set("RUNNING")
-            self.led.itemconfig(self.led_circle, fill="#00FF00")  # Verde
+        self.set_state("running" if running else "stopped")
+
+    def set_state(self, sim_state: str):
+        """stopped (rojo), starting (amarillo: preparando índices/workers) o running (verde)."""
+        self.state = sim_state
+        self.running = sim_state != "stopped"
+        if self.running:
+            if sim_state == "starting":
+                self.status_var.set("STARTING")
+                self.led.itemconfig(self.led_circle, fill="#FFD700")  # Amarillo
+            else:
+                self.status_var.set("RUNNING")
+                self.led.itemconfig(self.led_circle, fill="#00FF00")  # Verde
             self.btn_start.config(state="disabled")
             self.btn_stop.config(state="normal")
+            self.btn_reload.config(state="normal" if sim_state == "running" else "disabled")
             state = "disabled"
         else:
             self.status_var.set("STOPPED")
             self.led.itemconfig(self.led_circle, fill="red")
             self.btn_start.config(state="normal")
             self.btn_stop.config(state="disabled")
+            self.btn_reload.config(state="disabled")
             state = "normal" # O 'readonly' para el directorio si prefieres
             
         self.ip_entry.config(state=state)
         self.port_entry.config(state=state)
+        self.workers_spin.config(state=state)
         self.profile_combo.config(state=state)
         self.btn_delete.config(state=state)
         self.btn_save.config(state=state)
         self.btn_dir.config(state=state)
         
 
+    def set_metrics(self, snapshot):
+        if not snapshot:
+            self.rate_var.set("")
+            return
+        text = f"{snapshot['req_s']:,.0f} req/s"
+        if snapshot["p99"] is not None:
+            p99 = snapshot["p99"]
+            text += " · p99 >1 s" if p99 == float("inf") else f" · p99 ≤{p99 * 1000:g} ms"
+        if snapshot["errors"]:
+            text += f" · {snapshot['errors']:,} err"
+        self.rate_var.set(text)
+
     def validate_inputs(self) -> bool:
         ip = self.ip_entry.get().strip()
         port = self.port_entry.get().strip()
         data_dir = self.data_dir_var.get().strip()
 
-        if not utils.is_valid_ip(ip):
-            messagebox.showerror("Error de Red", f"La IP '{ip}' no es válida.")
+        # Misma validación que el modo headless (gui/daemon.py)
+        error = utils.validate_settings(ip, port, data_dir)
+        if error:
+            messagebox.showerror(*error)
             return False
 
-        if not utils.is_valid_port(port):
-            messagebox.showerror("Error de Red", "El puerto debe ser un número entre 1 y 65535.")
-            return False
-            
-        if not os.path.isdir(data_dir):
-            messagebox.showerror("Error de Archivo", "El directorio de datos seleccionado no existe.")
+        owner = self.fleet.endpoints().get(f"{ip}:{port}") if self.fleet is not None else None
+        if owner:
+            messagebox.showerror("Error de Red", f"El endpoint {ip}:{port} ya lo usa el perfil '{owner}'.")
             return False
 
         return True
 
+    def _open_fleet(self):
+        if self.fleet_dialog is not None and self.fleet_dialog.winfo_exists():
+            self.fleet_dialog.lift()
+            return
+        self.fleet_dialog = FleetDialog(self, self.fleet)
+
     # ---------------- LÓGICA DE ARCHIVOS ---------------- #
 
     def _select_dir(self):
@@ -207,7 +267,8 @@ class TopBar(ttk.Frame):
         new_data = {
             "data_dir": self.get_data_dir(),
             "ip": self.ip_entry.get(),
-            "port": self.port_entry.get()
+            "port": self.port_entry.get(),
+            "workers": self.get_workers()
         }
 
         try:
@@ -254,6 +315,8 @@ class TopBar(ttk.Frame):
                     
                     self.port_entry.delete(0, tk.END)
                     self.port_entry.insert(0, data.get("port", "1024"))
+
+                    self.workers_spin.set(str(data.get("workers", 1)))
         except Exception:
             # Silencioso o log error
             pass
@@ -271,5 +334,128 @@ class TopBar(ttk.Frame):
              port = "1024"
         return f"{ip}:{port}"
 
+    def get_workers(self) -> int:
+        workers = self.workers_spin.get().strip()
+        return max(1, int(workers)) if workers.isdigit() else 1
+
     def get_data_dir(self) -> str:
-        return self.data_dir_var.get()
\ No newline at end of file
+        return self.data_dir_var.get()
+
+
+class FleetDialog(tk.Toplevel):
+    """Estado de todos los perfiles de profiles.json y arranque/parada en bloque.
+
+    Cerrar la ventana no para nada: los perfiles siguen en marcha hasta
+    pararlos aquí o cerrar la aplicación.
+    """
+
+    COLUMNS = (("state", "Estado", 80), ("endpoint", "Endpoint", 130), ("workers", "Workers", 60),
+               ("load", "Carga", 110), ("data_dir", "Directorio", 260))
+
+    def __init__(self, topbar, fleet):
+        super().__init__(topbar)
+        self.title("Perfiles en paralelo")
+        self.geometry("820x360")
+        self.topbar = topbar
+        self.fleet = fleet
+        self._stopping = set()  # perfiles con una parada en curso (en otro hilo)
+        self._build()
+        self._refresh()
+
+    def _build(self):
+        self.tree = ttk.Treeview(self, columns=[c for c, _, _ in self.COLUMNS], selectmode="extended")
+        self.tree.heading("#0", text="Perfil")
+        self.tree.column("#0", width=140)
+        for column, title, width in self.COLUMNS:
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=width, stretch=column == "data_dir")
+        for state, color in STATE_COLORS.items():
+            self.tree.tag_configure(state, foreground=color)
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        buttons = ttk.Frame(self)
+        buttons.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Button(buttons, text="▶ Iniciar selección", command=self._start_selected).pack(side="left", padx=2)
+        ttk.Button(buttons, text="⏹ Detener selección", command=lambda: self._stop(self._selected())).pack(side="left", padx=2)
+        ttk.Button(buttons, text="⟳ Recargar selección", command=self._reload_selected).pack(side="left", padx=2)
+        ttk.Button(buttons, text="⏹ Detener todos", command=lambda: self._stop(None)).pack(side="right", padx=2)
+        self.summary_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.summary_var, foreground="gray").pack(anchor="w", padx=12, pady=(0, 8))
+
+    def _selected(self):
+        return list(self.tree.selection())
+
+    def _start_selected(self):
+        names = self._selected()
+        if not names:
+            messagebox.showwarning("Perfiles", "Selecciona uno o varios perfiles.", parent=self)
+            return
+        profiles = utils.load_profiles()
+        # El endpoint del simulador principal, si está en marcha, no se puede repetir
+        busy = [self.topbar.get_endpoint()] if self.topbar.running else []
+        skipped = self.fleet.start({name: profiles[name] for name in names if name in profiles}, busy_endpoints=busy)
+        if skipped:
+            detail = "\n".join(f"{name}: {reason}" for name, reason in skipped.items())
+            messagebox.showwarning("Perfiles", f"No se arrancaron:\n{detail}", parent=self)
+        self._refresh(reschedule=False)
+
+    def _stop(self, names):
+        # stop() espera a los workers: en un hilo para no congelar la ventana
+        targets = set(names) if names is not None else set(self.fleet.states())
+        self._stopping |= targets
+
+        def run():
+            self.fleet.stop(names)
+            self._stopping.difference_update(targets)
+
+        threading.Thread(target=run, daemon=True).start()
+        self._refresh(reschedule=False)
+
+    def _reload_selected(self):
+        names = self._selected()
+        accepted = self.fleet.reload(names)
+        refused = [name for name in names if name not in accepted]
+        if refused:
+            messagebox.showinfo("Perfiles", "Recarga no disponible (parado, arrancando o recarga en curso): "
+                                + ", ".join(refused), parent=self)
+
+    def _refresh(self, reschedule=True):
+        if not self.winfo_exists():
+            return
+        profiles = utils.load_profiles()
+        rows = {row["name"]: row for row in self.fleet.status()}
+        names = list(profiles) + [name for name in rows if name not in profiles]
+        for item in self.tree.get_children():
+            if item not in names:
+                self.tree.delete(item)
+
+        counts = {"running": 0, "starting": 0}
+        req_s = 0.0
+        for index, name in enumerate(names):
+            row = rows.get(name)
+            state = row["state"] if row else "stopped"
+            if state in counts:
+                counts[state] += 1
+            if name in self._stopping and state != "stopped":
+                label = "parando"
+            else:
+                label = state
+            if row and row["req_s"] is not None:
+                req_s += row["req_s"]
+                load = f"{row['req_s']:,.0f} req/s" + (f" · {row['errors']:,} err" if row["errors"] else "")
+            else:
+                load = ""
+            ip, port = profiles.get(name, {}).get("ip", ""), profiles.get(name, {}).get("port", "")
+            values = (label,
+                      row["endpoint"] if row and row["endpoint"] else (f"{ip}:{port}" if ip else ""),
+                      row["workers"] if row else "",
+                      load,
+                      (row["data_dir"] if row and row["data_dir"] else profiles.get(name, {}).get("data_dir", "")))
+            if self.tree.exists(name):
+                self.tree.item(name, values=values, tags=(state,))
+            else:
+                self.tree.insert("", index, iid=name, text=name, values=values, tags=(state,))
+
+        self.summary_var.set(f"{counts['running']} en marcha, {counts['starting']} arrancando · {req_s:,.0f} req/s en total")
+        if reschedule:
+            self.after(FLEET_POLL_MS, self._refresh)
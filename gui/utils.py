@@ -1,9 +1,12 @@
 # utils.py
 import re
 import os
+import json
 import platform
 import subprocess
 
+PROFILES_FILE = "profiles.json"
+
 def is_valid_ip(ip: str) -> bool:
     pattern = r"^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$"
     if not re.match(pattern, ip):
@@ -17,6 +20,23 @@ def is_valid_port(port) -> bool:
     except (ValueError, TypeError):
         return False
 
+def validate_settings(ip: str, port, data_dir: str):
+    """Devuelve (título, mensaje) del primer error de configuración, o None si todo es válido."""
+    if not is_valid_ip(ip):
+        return "Error de Red", f"La IP '{ip}' no es válida."
+    if not is_valid_port(port):
+        return "Error de Red", "El puerto debe ser un número entre 1 y 65535."
+    if not os.path.isdir(data_dir):
+        return "Error de Archivo", "El directorio de datos seleccionado no existe."
+    return None
+
+def load_profiles(path: str = PROFILES_FILE) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
 def open_file_explorer(path: str) -> bool:
     if not os.path.exists(path):
         return False
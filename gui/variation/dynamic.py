@@ -0,0 +1,59 @@
+"""Módulo de variación "dynamic": contadores, uptime, ondas y paseos aleatorios.
+
+snmpsim lo carga de --variation-modules-dir con exec() (no es un import) y
+antes de cada variate() deja en los globales recordContext, un dict propio
+de cada OID. Ahí se guardan los parámetros ya interpretados y el texto del
+que salieron: si el fichero se recarga o la GUI manda otros parámetros, se
+vuelven a interpretar; si no, cada GET es una comparación de cadenas y una
+cuenta (ver gui/dynamic_values.py).
+
+Uso en el .snmprec: <oid>|<tipo>:dynamic|kind=counter,rate=1000
+"""
+import time
+
+from gui import dynamic_values
+from gui.control_channel import normalize_path
+
+
+def init(**context):
+    moduleContext["epoch"] = dynamic_values.epoch()
+
+
+def variate(oid, tag, value, **context):
+    if not context["nextFlag"] and not context["exactMatch"]:
+        return context["origOid"], tag, context["errorStatus"]
+
+    if context["setFlag"]:
+        # Los valores dinámicos no se escriben por SNMP
+        return context["origOid"], tag, context["errorStatus"]
+
+    if "oid" not in recordContext:
+        recordContext["oid"] = str(oid)
+        recordContext["salt"] = dynamic_values.salt(recordContext["oid"])
+
+    if dynamic_values.LIVE:
+        key = agentContext.get("key")
+        if key is None:
+            key = agentContext["key"] = normalize_path(context["dataFile"])
+        value = dynamic_values.live_params(key, recordContext["oid"]) or value
+
+    if recordContext.get("text") != value:
+        recordContext["text"] = value
+        try:
+            recordContext["params"] = dynamic_values.parse(value)
+        except ValueError as exc:
+            # Se avisa una vez por texto inválido, no en cada petición
+            recordContext["params"] = None
+            from snmpsim import log
+            log.error(f"dynamic: {recordContext['oid']}: {exc}")
+
+    params = recordContext["params"]
+    if params is None:
+        return context["origOid"], tag, context["errorStatus"]
+
+    return oid, tag, dynamic_values.value_at(params, tag, time.time(),
+                                             moduleContext["epoch"], recordContext["salt"])
+
+
+def shutdown(**context):
+    pass
@@ -0,0 +1,92 @@
+"""Módulo de variación "replay": reproduce un histórico .snmpts (ver gui/timeseries.py).
+
+Como "dynamic", snmpsim lo carga con exec() y deja recordContext en los
+globales antes de cada variate(). Cada serie se mapea una sola vez por
+proceso (moduleContext["series"]) y se comprueba como mucho una vez por
+segundo si el fichero cambió, para que una reimportación se note sin
+reiniciar. En recordContext queda la columna del OID y la fila de la última
+consulta, que casi siempre evita la bisección.
+
+Uso en el .snmprec: <oid>|<tipo>:replay|series=.series/router.snmpts
+"""
+import os
+import time
+
+from gui import dynamic_values
+from gui import timeseries
+
+RECHECK_INTERVAL = 1.0
+
+
+def init(**context):
+    moduleContext["epoch"] = dynamic_values.epoch()
+    moduleContext["series"] = {}  # ruta absoluta -> [SeriesFile, última comprobación]
+
+
+def _open(path, now):
+    cached = moduleContext["series"].get(path)
+    if cached is not None:
+        if now - cached[1] < RECHECK_INTERVAL:
+            return cached[0]
+        cached[1] = now
+        st = os.stat(path)
+        if (st.st_size, st.st_mtime_ns) == cached[0].stamp:
+            return cached[0]
+        # La serie antigua no se cierra: puede haber filas suyas en otros recordContext
+    series = timeseries.SeriesFile(path)
+    moduleContext["series"][path] = [series, now]
+    return series
+
+
+def variate(oid, tag, value, **context):
+    if not context["nextFlag"] and not context["exactMatch"]:
+        return context["origOid"], tag, context["errorStatus"]
+
+    if context["setFlag"]:
+        return context["origOid"], tag, context["errorStatus"]
+
+    if recordContext.get("text") != value:
+        recordContext["text"] = value
+        recordContext["hint"] = None
+        try:
+            params = timeseries.parse_params(value)
+            params["path"] = os.path.join(os.path.dirname(context["dataFile"]), params["series"])
+            params["oid"] = params["oid"] or str(oid)
+            recordContext["params"] = params
+        except ValueError as exc:
+            # Se avisa una vez por texto inválido, no en cada petición
+            recordContext["params"] = None
+            from snmpsim import log
+            log.error(f"replay: {oid}: {exc}")
+
+    params = recordContext["params"]
+    if params is None:
+        return context["origOid"], tag, context["errorStatus"]
+
+    now = time.time()
+    try:
+        series = _open(params["path"], now)
+    except (OSError, ValueError) as exc:
+        from snmpsim import log
+        log.error(f"replay: {params['path']}: {exc}")
+        return context["origOid"], tag, context["errorStatus"]
+
+    if recordContext.get("series") is not series:
+        recordContext["series"] = series
+        recordContext["column"] = series.column(params["oid"])
+        recordContext["hint"] = None
+    column = recordContext["column"]
+    if column is None:
+        return context["origOid"], tag, context["errorStatus"]
+
+    result, recordContext["hint"] = timeseries.replay_value(
+        series, column, tag, params, now, moduleContext["epoch"], recordContext["hint"])
+    return oid, tag, result
+
+
+def shutdown(**context):
+    for series, _ in moduleContext.get("series", {}).values():
+        try:
+            series.close()
+        except BufferError:
+            pass
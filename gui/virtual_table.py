@@ -0,0 +1,126 @@
+from tkinter import ttk
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview virtual: solo existen los ítems de las filas visibles.
+
+    Los datos se piden bajo demanda a row_fn(índice) -> tupla de valores, así
+    que el coste de pintar no depende del número total de filas. Los ítems del
+    Treeview se reciclan al hacer scroll.
+    """
+
+    def __init__(self, parent, columns, headings, widths):
+        super().__init__(parent)
+        self.count = 0
+        self.row_fn = None
+        self.offset = 0
+        self.selected_index = None
+        self._slots = []  # iids reutilizables, uno por fila visible
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        for col, text, width in zip(columns, headings, widths):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width)
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", lambda e: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 * (e.delta // 120) * 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self._visible_rows()))
+        self.tree.bind("<Next>", lambda e: self.scroll(self._visible_rows()))
+
+    # ---------------- API ---------------- #
+
+    def set_source(self, count, row_fn):
+        self.row_fn = row_fn
+        self.set_count(count)
+
+    def set_count(self, count):
+        """Cambia el total de filas (p.ej. mientras se carga un fichero) y repinta lo visible."""
+        self.count = count
+        if self.selected_index is not None and self.selected_index >= count:
+            self.selected_index = None
+        self.offset = max(0, min(self.offset, count - self._visible_rows()))
+        self._render()
+
+    def refresh(self):
+        """Vuelve a pedir los valores de las filas visibles."""
+        self._render()
+
+    def refresh_row(self, index):
+        """Actualiza una sola fila en su sitio, si está en pantalla."""
+        slot = index - self.offset
+        if 0 <= slot < len(self._slots) and index < self.count:
+            self.tree.item(self._slots[slot], values=self.row_fn(index))
+
+    def index_at(self, y):
+        """Índice de datos de la fila bajo la coordenada y, o None."""
+        iid = self.tree.identify_row(y)
+        if not iid or iid not in self._slots:
+            return None
+        index = self.offset + self._slots.index(iid)
+        return index if index < self.count else None
+
+    def see(self, index):
+        rows = self._visible_rows()
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + rows:
+            self.offset = index - rows + 1
+        self._render()
+
+    def scroll(self, rows):
+        self.offset = max(0, min(self.offset + rows, self.count - self._visible_rows()))
+        self._render()
+        return "break"
+
+    # ---------------- INTERNOS ---------------- #
+
+    def _visible_rows(self):
+        height = self.tree.winfo_height()
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # Descontamos la cabecera (≈ una fila) y contamos la última fila parcial
+        return max(1, (height - row_height) // row_height + 1)
+
+    def _render(self):
+        rows = min(self._visible_rows(), self.count)
+
+        while len(self._slots) < rows:
+            self._slots.append(self.tree.insert("", "end", values=()))
+        while len(self._slots) > rows:
+            self.tree.delete(self._slots.pop())
+
+        for i, iid in enumerate(self._slots):
+            self.tree.item(iid, values=self.row_fn(self.offset + i))
+
+        # La selección sigue al dato, no al ítem reciclado
+        slot = None if self.selected_index is None else self.selected_index - self.offset
+        if slot is not None and 0 <= slot < len(self._slots):
+            self.tree.selection_set(self._slots[slot])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if self.count:
+            self.scrollbar.set(self.offset / self.count, min(1.0, (self.offset + rows) / self.count))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, *args):
+        rows = self._visible_rows()
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.count)
+        elif args[0] == "scroll":
+            step = rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.offset = max(0, min(self.offset, self.count - rows))
+        self._render()
+
+    def _on_select(self, event):
+        selected = self.tree.selection()
+        if selected and selected[0] in self._slots:
+            self.selected_index = self.offset + self._slots.index(selected[0])
@@ -0,0 +1,141 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+
+
+def atomic_write(path, content, encoding="utf-8", retries=5, mode=None):
+    """Escribe en un temporal del mismo directorio y lo sustituye con rename.
+
+    Quien lea el fichero (el responder) ve siempre la versión anterior completa
+    o la nueva completa, nunca una a medio escribir. mode son los permisos de
+    un fichero nuevo (si no, los 0600 de mkstemp); uno existente conserva los suyos.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # mkstemp crea el fichero con 0600; conservamos los permisos del original
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        elif mode is not None:
+            os.chmod(tmp_path, mode)
+
+        # En Windows el rename falla si otro proceso tiene el destino abierto
+        for attempt in range(retries):
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                if attempt == retries - 1:
+                    raise
+                time.sleep(0.05 * (2 ** attempt))
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehind:
+    """Escritura diferida: agrupa ráfagas de cambios y guarda en un hilo de fondo.
+
+    mark_dirty() se llama desde el hilo de Tk. Cada ruta marcada reinicia un
+    temporizador; cuando vence, se toma una instantánea barata de cada fichero
+    en el hilo de Tk y un hilo de fondo genera el contenido y lo escribe de
+    forma atómica. Los errores vuelven al hilo de Tk a través de on_error(path, exc).
+    """
+
+    def __init__(self, widget, delay_ms=400, on_error=None):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.on_error = on_error
+
+        self._pending = {}  # path -> (snapshot, must_exist), solo hilo Tk
+        self._timer = None
+        self._latest = {}  # path -> (render, must_exist), compartido con el worker
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._errors = queue.Queue()
+
+        threading.Thread(target=self._worker, daemon=True).start()
+        self._poll_errors()
+
+    def mark_dirty(self, path, snapshot, must_exist=True):
+        """Programa la escritura de path.
+
+        snapshot() se llama en el hilo de Tk al vencer el temporizador y debe
+        ser barata: copia el estado y devuelve render(), que se ejecuta en el
+        hilo de fondo y devuelve el contenido completo.
+
+        Con must_exist=True no se escribe si el fichero desapareció entretanto
+        (borrado o renombrado desde fuera), para no resucitarlo.
+        """
+        self._pending[path] = (snapshot, must_exist)
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+        self._timer = self.widget.after(self.delay_ms, self._flush_pending)
+
+    def flush(self, timeout=5.0):
+        """Escribe ya todo lo pendiente y espera a que termine (p.ej. antes de cambiar de fichero)."""
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+        self._flush_pending()
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._latest and self._jobs.unfinished_tasks == 0:
+                    break
+            time.sleep(0.01)
+        self._report_errors()
+
+    def _flush_pending(self):
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        for path, (snapshot, must_exist) in pending.items():
+            try:
+                render = snapshot()
+            except Exception as e:
+                self._errors.put((path, e))
+                continue
+            with self._lock:
+                self._latest[path] = (render, must_exist)
+            self._jobs.put(path)
+
+    def _worker(self):
+        while True:
+            path = self._jobs.get()
+            try:
+                # Si llegó una versión más nueva mientras tanto, ya se escribió esa
+                with self._lock:
+                    job = self._latest.pop(path, None)
+                if job is None:
+                    continue
+                render, must_exist = job
+                if must_exist and not os.path.exists(path):
+                    continue
+                atomic_write(path, render())
+            except Exception as e:
+                self._errors.put((path, e))
+            finally:
+                self._jobs.task_done()
+
+    def _report_errors(self):
+        while True:
+            try:
+                path, exc = self._errors.get_nowait()
+            except queue.Empty:
+                return
+            if self.on_error:
+                self.on_error(path, exc)
+
+    def _poll_errors(self):
+        self._report_errors()
+        self.widget.after(250, self._poll_errors)
@@ -26,48 +26,53 @@ def apply_dark_title_bar(window):
 
 if __name__ == "__main__":
     import multiprocessing
-    import asyncio
-    import shelve
-    import dbm.dumb
     
         
     multiprocessing.freeze_support()
     
     if len(sys.argv) > 1 and sys.argv[1] == "-m":
-        sys.modules['dbm.ndbm'] = dbm.dumb
-        
-        from snmpsim.commands import responder
+        # El backend de índice (sqlite por defecto) lo instala el launcher
+        from gui import launcher
         
         # Limpiar argumentos: [exe, -m, mod, ...] -> [exe, ...]
         sys.argv = [sys.argv[0]] + sys.argv[3:]
         
-        # Parche de Event Loop para Python 3.12+
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+        # El launcher aplica el parche de Event Loop para Python 3.12+
         try:
-            responder.main()
+            launcher.main()
         except SystemExit:
             pass
-        finally:
-            loop.close()
         sys.exit(0)
-        
-        
-    from gui.app import SNMPSimApp
-    import sv_ttk
+
+    if "--headless" in sys.argv[1:]:
+        # Sin Tk: perfil de profiles.json en consola (CI, servidores de laboratorio)
+        from gui import daemon
+        sys.exit(daemon.main(sys.argv[1:]))
+
+    # --trace-startup[=fichero.json]: tiempos de imports y construcción (ver gui/startup_trace.py)
+    from gui import startup_trace
+    sys.argv = startup_trace.enable_from_argv(sys.argv)
+
+    with startup_trace.span("import gui.app"):
+        from gui.app import SNMPSimApp
+    with startup_trace.span("import sv_ttk"):
+        import sv_ttk
     
-    app = SNMPSimApp()
+    with startup_trace.span("SNMPSimApp()"):
+        app = SNMPSimApp()
     
     
     if os.path.exists("assets/icon.ico"):
         app.iconbitmap("assets/icon.ico")
 
+    # El tema antes del primer update(): la ventana no llega a verse sin estilo
+    with startup_trace.span("sv_ttk.set_theme"):
+        sv_ttk.set_theme("dark") 
+
     try:
         apply_dark_title_bar(app)
     except Exception as e:
         print(f"No se pudo aplicar modo oscuro a la barra: {e}")
-
-    sv_ttk.set_theme("dark") 
     
+    startup_trace.mark("mainloop")
     app.mainloop()
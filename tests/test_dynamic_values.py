@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import dynamic_values  # noqa: E402
+
+EPOCH = 1_000_000.0
+
+
+def value(text, now, start_epoch=EPOCH, tag="70"):
+    return dynamic_values.value_at(dynamic_values.parse(text), tag, now, start_epoch)
+
+
+def test_value_at_counter_and_uptime():
+    assert value("kind=counter,rate=10,start=5", EPOCH + 60) == 605
+    assert value("kind=uptime", EPOCH + 2, tag="67") == 200
+    # Antes de EPOCH no se cuenta hacia atrás
+    assert value("kind=counter,rate=10", EPOCH - 60) == 0
+
+
+def test_value_at_wraps_and_clamps():
+    assert value("kind=counter,rate=1,start=4294967290", EPOCH + 10, tag="65") == 4
+    assert value("kind=wave,center=-10,amplitude=0", EPOCH, tag="66") == 0
+    assert value("kind=wave,center=5000000000,amplitude=0", EPOCH, tag="2") == 2 ** 31 - 1
+
+
+def test_value_at_walk_is_deterministic_and_bounded():
+    params = dynamic_values.parse("kind=walk,center=50,step=30,min=0,max=100")
+    values = [dynamic_values.value_at(params, "2", EPOCH + t, EPOCH, 1234) for t in range(0, 3600, 37)]
+    assert values == [dynamic_values.value_at(params, "2", EPOCH + t, EPOCH, 1234) for t in range(0, 3600, 37)]
+    assert all(0 <= v <= 100 for v in values)
+
+
+def test_set_level_rebases_counter():
+    text = "kind=counter,rate=1000"
+    now = EPOCH + 3600
+    text = dynamic_values.set_level(text, 100, now, EPOCH)
+    # La historia no se reescala: sigue en 3.6M y a partir de ahí sube a 100/s
+    assert value(text, now) == 3_600_000
+    assert value(text, now + 10) == 3_601_000
+    assert dynamic_values.level(text) == 100
+
+
+def test_set_level_sets_uptime_from_now():
+    text = dynamic_values.set_level("kind=uptime", 500, EPOCH + 100, EPOCH)
+    assert value(text, EPOCH + 100, tag="67") == 500
+    assert value(text, EPOCH + 101, tag="67") == 600
+
+
+def test_set_level_while_paused_keeps_frozen_value():
+    text = dynamic_values.set_running("kind=counter,rate=10", False, EPOCH + 50, EPOCH)
+    text = dynamic_values.set_level(text, 1, EPOCH + 80, EPOCH)
+    assert value(text, EPOCH + 90) == 500
+    text = dynamic_values.set_running(text, True, EPOCH + 100, EPOCH)
+    assert value(text, EPOCH + 110) == 510
+
+
+def test_set_running_pauses_and_resumes_without_jump():
+    text = dynamic_values.set_running("kind=counter,rate=10", False, EPOCH + 60, EPOCH)
+    assert not dynamic_values.running(text)
+    assert value(text, EPOCH + 600) == 600
+    text = dynamic_values.set_running(text, True, EPOCH + 600, EPOCH)
+    assert dynamic_values.running(text)
+    assert value(text, EPOCH + 600) == 600
+    assert value(text, EPOCH + 610) == 700
+
+
+def test_paused_value_survives_restart():
+    text = dynamic_values.set_running("kind=counter,rate=10", False, EPOCH + 60, EPOCH)
+    # El simulador se reinicia con otro EPOCH: el valor congelado no cambia
+    restarted = EPOCH + 10_000
+    assert value(text, restarted + 5, start_epoch=restarted) == 600
+    text = dynamic_values.set_running(text, True, restarted + 20, restarted)
+    assert value(text, restarted + 30, start_epoch=restarted) == 700
+
+
+def test_set_running_is_idempotent():
+    text = "kind=wave,center=40"
+    assert dynamic_values.set_running(text, True, EPOCH + 5, EPOCH) == text
+    paused = dynamic_values.set_running(text, False, EPOCH + 5, EPOCH)
+    assert dynamic_values.set_running(paused, False, EPOCH + 50, EPOCH) == paused
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import index_backends  # noqa: E402
+from gui.index_backends import SqliteIndex  # noqa: E402
+
+
+def build(path, items, flag="n"):
+    db = SqliteIndex(str(path), flag)
+    for key, value in items.items():
+        db[key] = value
+    db.close()
+
+
+def test_set_get_and_keys(tmp_path):
+    path = tmp_path / "dev.sqlite"
+    db = SqliteIndex(str(path), "c")
+    db[b"1.3.6.1.1"] = b"uno"
+    db["1.3.6.1.2"] = "dos"
+    db[b"1.3.6.1.1"] = b"otro"
+    # Lo que está en el lote pendiente ya se ve al leer
+    assert db[b"1.3.6.1.1"] == b"otro"
+    assert db.get("1.3.6.1.2") == b"dos"
+    assert db.get(b"1.3.6.1.3", b"-") == b"-"
+    with pytest.raises(KeyError):
+        db[b"1.3.6.1.3"]
+    assert b"1.3.6.1.2" in db and b"1.3.6.1.3" not in db
+    assert sorted(db.keys()) == [b"1.3.6.1.1", b"1.3.6.1.2"]
+    assert len(db) == 2
+    db.close()
+
+    with SqliteIndex(str(path)) as ro:
+        assert ro[b"1.3.6.1.1"] == b"otro"
+
+
+def test_batches_are_flushed(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_backends, "BATCH_SIZE", 3)
+    path = tmp_path / "dev.sqlite"
+    build(path, {f"1.3.6.1.{i}": str(i) for i in range(10)})
+    with SqliteIndex(str(path)) as db:
+        assert len(db) == 10 and db["1.3.6.1.7"] == b"7"
+
+
+def test_new_index_is_published_on_close(tmp_path):
+    path = tmp_path / "dev.sqlite"
+    build(path, {"a": b"viejo"})
+    reader = SqliteIndex(str(path))
+
+    db = SqliteIndex(str(path), "n")
+    db["a"] = b"nuevo"
+    db["b"] = b"2"
+    db.sync()
+    # Mientras se construye, el publicado sigue intacto y legible
+    temp = db.path
+    assert os.path.basename(temp).startswith(".dev.sqlite.") and temp.endswith(".tmp")
+    assert reader["a"] == b"viejo"
+    with SqliteIndex(str(path)) as other:
+        assert other.keys() == [b"a"]
+    db.close()
+
+    assert not os.path.exists(temp)
+    assert db.path == str(path)
+    with SqliteIndex(str(path)) as fresh:
+        assert fresh["a"] == b"nuevo" and len(fresh) == 2
+    # Quien lo tenía abierto sigue leyendo su versión completa
+    assert reader["a"] == b"viejo"
+    reader.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["dev.sqlite"]
+
+
+def test_stale_temp_is_replaced(tmp_path):
+    path = tmp_path / "dev.sqlite"
+    db = SqliteIndex(str(path), "n")
+    temp = db.path
+    db.conn.close()
+    db.conn = None  # como un proceso que murió a medias
+    build(path, {"a": b"1"})
+    assert not os.path.exists(temp)
+    with SqliteIndex(str(path)) as fresh:
+        assert fresh.keys() == [b"a"]
+
+
+def test_missing_index_raises(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        SqliteIndex(str(tmp_path / "nada.sqlite"))
+
+
+def test_whichdb(tmp_path):
+    backend = index_backends.get_backend("sqlite")
+    path = tmp_path / "dev.sqlite"
+    assert backend.whichdb(str(path)) is None
+    build(path, {"a": b"1"})
+    assert backend.whichdb(str(path)) == "sqlite"
+    other = tmp_path / "otro.db"
+    other.write_bytes(b"no es sqlite")
+    assert backend.whichdb(str(other)) == ""
+    with backend.open(str(path)) as db:
+        assert isinstance(db, SqliteIndex)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        index_backends.get_backend("gdbm")
+    assert index_backends.get_backend().name == index_backends.DEFAULT_BACKEND
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import log_pipeline  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / "public").mkdir()
+    for name in ("site.01.snmprec", "router.snmprec", "public/1.3.6.1.2.1.100.1.13.0.snmprec"):
+        (tmp_path / name).write_text("1.3.6.1.2.1.1.1.0|4|test\n")
+    yield tmp_path
+    log_pipeline._REGISTERED.clear()
+
+
+def test_community_of_dotted_and_nested_names(data_dir):
+    assert log_pipeline.community_of(str(data_dir / "site.01.snmprec"), [str(data_dir)]) == "site.01"
+    nested = str(data_dir / "public" / "1.3.6.1.2.1.100.1.13.0.snmprec")
+    assert log_pipeline.community_of(nested, [str(data_dir)]) == "public/1.3.6.1.2.1.100.1.13.0"
+    # Fuera de los directorios de datos queda el nombre completo sin extensión
+    assert log_pipeline.community_of(str(data_dir / "site.01.snmprec")) == "site.01"
+
+
+def test_community_of_matches_snmpsim(data_dir):
+    datafile = pytest.importorskip("snmpsim.datafile")
+    for full_path, _, community in datafile.get_data_files(str(data_dir)):
+        assert log_pipeline.community_of(full_path, [str(data_dir)]) == community
+
+
+def test_registered_community_wins(data_dir):
+    path = str(data_dir / "router.snmprec")
+    log_pipeline.register_community(path, "self")
+    assert log_pipeline.community_of(path, [str(data_dir)]) == "self"
+
+
+def test_context_event_uses_registered_community(data_dir):
+    path = str(data_dir / "public" / "1.3.6.1.2.1.100.1.13.0.snmprec")
+    log_pipeline.register_community(path, "public/1.3.6.1.2.1.100.1.13.0")
+    event = log_pipeline.parse_message("info", f"Using {path} controller selected by candidate b'abc'")
+    assert event["cat"] == "context"
+    assert event["community"] == "public/1.3.6.1.2.1.100.1.13.0"
+    dotted = log_pipeline.parse_message("info", f"Using {data_dir / 'site.01.snmprec'} controller selected")
+    assert dotted["community"] == "site.01"
+    request = log_pipeline.parse_message("info", "Request var-binds: 1.3.6.1.2.1.1.1.0=<>, flags: EXACT, GET",
+                                         event["community"])
+    assert log_pipeline.format_event(request).startswith("INFO [public/1.3.6.1.2.1.100.1.13.0/get]")
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import normalize  # noqa: E402
+
+
+def test_sorts_numerically_and_hoists_comments():
+    text = ("1.3.6.1.10|2|10\n"
+            "# equipo de pruebas\n"
+            "\n"
+            "1.3.6.1.9|2|9\n"
+            "  # segundo comentario\n")
+    content, count = normalize.normalize_text(text)
+    assert content == ("# equipo de pruebas\n"
+                       "# segundo comentario\n"
+                       "1.3.6.1.9|2|9\n"
+                       "1.3.6.1.10|2|10\n")
+    assert count == 2
+
+
+def test_last_duplicate_wins():
+    content, count = normalize.normalize_text("1.3.6.1.1|2|1\n1.3.6.1.2|2|2\n1.3.6.1.1|4|uno\n")
+    assert content == "1.3.6.1.1|4|uno\n1.3.6.1.2|2|2\n"
+    assert count == 2
+
+
+def test_values_keep_their_pipes():
+    content, _ = normalize.normalize_text("1.3.6.1.1|4|a|b\n")
+    assert content == "1.3.6.1.1|4|a|b\n"
+
+
+def test_malformed_line_is_an_error():
+    with pytest.raises(ValueError, match="línea 2"):
+        normalize.normalize_text("1.3.6.1.1|2|1\n1.3.6.1.2|2\n")
+
+
+def test_file_with_error_is_left_untouched(tmp_path):
+    path = tmp_path / "bad.snmprec"
+    original = "1.3.6.1.2|2|2\nroto\n1.3.6.1.1|2|1\n"
+    path.write_text(original)
+    result = normalize.normalize_file(str(path))
+    assert result["error"] and not result["changed"]
+    assert path.read_text() == original
+
+
+def test_unchanged_file_is_not_rewritten(tmp_path):
+    path = tmp_path / "ok.snmprec"
+    path.write_text("1.3.6.1.1|2|1\n1.3.6.1.2|2|2\n")
+    before = os.stat(path)
+    result = normalize.normalize_file(str(path))
+    assert not result["changed"] and result["records"] == 2
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_normalize_dir(tmp_path, workers):
+    (tmp_path / "a.snmprec").write_text("1.3.6.1.2|2|2\n1.3.6.1.1|2|1\n")
+    (tmp_path / "b.snmprec").write_text("1.3.6.1.1|2|1\n")
+    (tmp_path / "c.snmprec").write_text("roto\n")
+    (tmp_path / "notas.txt").write_text("1.3.6.1.2|2|2\n1.3.6.1.1|2|1\n")
+    results = normalize.normalize_dir(str(tmp_path), workers)
+    assert [os.path.basename(r["path"]) for r in results] == ["a.snmprec", "b.snmprec", "c.snmprec"]
+    changed, failed = normalize.summarize(results)
+    assert changed == 1 and [os.path.basename(r["path"]) for r in failed] == ["c.snmprec"]
+    assert (tmp_path / "a.snmprec").read_text() == "1.3.6.1.1|2|1\n1.3.6.1.2|2|2\n"
+    assert (tmp_path / "notas.txt").read_text() == "1.3.6.1.2|2|2\n1.3.6.1.1|2|1\n"
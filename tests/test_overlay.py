@@ -0,0 +1,147 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import overlay  # noqa: E402
+from gui.record_store import RecordStore, oid_key  # noqa: E402
+
+BASE = [
+    ("1.3.6.1.2.1.1.1.0", "4", "router base"),
+    ("1.3.6.1.2.1.1.3.0", "67", "100"),
+    ("1.3.6.1.2.1.1.5.0", "4", "base"),
+    ("1.3.6.1.2.1.2.1.0", "2", "2"),
+    ("1.3.6.1.2.1.2.2.1.2.1", "4", "eth0"),
+    ("1.3.6.1.2.1.2.2.1.2.2", "4", "eth1"),
+]
+
+
+def write(path, records):
+    path.write_text("".join(f"{oid}|{tag}|{value}\n" for oid, tag, value in records))
+
+
+def edited_overlay(tmp_path):
+    """Clona BASE como overlay y aplica cambios, un alta y un renombrado; devuelve (ruta, registros finales)."""
+    src = tmp_path / "router.snmprec"
+    write(src, BASE)
+    dest = tmp_path / "router_2.snmprec"
+    overlay.make_overlay(str(src), str(dest))
+    base_path = overlay.read_base(str(dest))
+
+    # Lo mismo que hace el editor: base, luego delta, y guardar solo lo que difiere
+    store = RecordStore()
+    base_values = {oid: (tag, value) for oid, tag, value in BASE}
+    store.extend(BASE)
+    store.find("1.3.6.1.2.1.1.5.0")["value"] = "clon"
+    store.find("1.3.6.1.2.1.2.2.1.2.1")["oid"] = "1.3.6.1.2.1.2.2.1.2.9"
+    store.add("1.3.6.1.4.1.9.1.0", "2", "7")
+    dest.write_text(overlay.render_delta(overlay.header_for(base_path, str(dest)),
+                                         store.triples(), base_values))
+    return dest, list(store.triples())
+
+
+def merged_view(path):
+    """Vista fusionada como la arma el editor al cargar el overlay."""
+    base_path = overlay.read_base(str(path))
+    deleted = overlay.read_deleted(str(path))
+    records = {}
+    for source in (base_path, str(path)):
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if "|" in line and not line.startswith("#"):
+                    oid, tag, value = line.rstrip("\n").split("|", 2)
+                    if source != base_path or oid not in deleted:
+                        records[oid] = (oid, tag, value)
+    return sorted(records.values(), key=lambda r: oid_key(r[0]))
+
+
+def test_make_overlay_shares_the_base(tmp_path):
+    src = tmp_path / "router.snmprec"
+    write(src, BASE)
+    first = overlay.make_overlay(str(src), str(tmp_path / "a.snmprec"))
+    second = overlay.make_overlay(str(src), str(tmp_path / "b.snmprec"))
+    base_path = overlay.read_base(first)
+    assert base_path == overlay.read_base(second)
+    assert os.path.dirname(base_path) == str(tmp_path / overlay.BASES_DIR)
+    assert base_path.endswith(overlay.BASE_SUFFIX)
+    assert open(base_path).read() == src.read_text()
+    # Clonar un overlay copia su delta, sin encadenar bases
+    third = overlay.make_overlay(first, str(tmp_path / "c.snmprec"))
+    assert overlay.read_base(third) == base_path
+    assert overlay.read_base(str(src)) is None
+    assert overlay.read_deleted(str(src)) == set()
+
+
+def test_render_delta_keeps_only_differences(tmp_path):
+    dest, _ = edited_overlay(tmp_path)
+    lines = dest.read_text().splitlines()
+    assert lines[0].startswith(overlay.OVERLAY_PREFIX)
+    assert lines[1:] == [
+        f"{overlay.DELETED_PREFIX} 1.3.6.1.2.1.2.2.1.2.1",
+        "1.3.6.1.2.1.1.5.0|4|clon",
+        "1.3.6.1.2.1.2.2.1.2.9|4|eth0",
+        "1.3.6.1.4.1.9.1.0|2|7",
+    ]
+    assert overlay.read_deleted(str(dest)) == {"1.3.6.1.2.1.2.2.1.2.1"}
+
+
+def test_round_trip_merged_view_equals_edits(tmp_path):
+    dest, records = edited_overlay(tmp_path)
+    assert merged_view(dest) == records
+
+
+def test_unchanged_overlay_is_only_the_header(tmp_path):
+    src = tmp_path / "router.snmprec"
+    write(src, BASE)
+    dest = overlay.make_overlay(str(src), str(tmp_path / "copy.snmprec"))
+    header = overlay.header_for(overlay.read_base(dest), dest)
+    assert overlay.render_delta(header, iter(BASE), {o: (t, v) for o, t, v in BASE}) == header
+
+
+@pytest.fixture
+def responder(tmp_path, monkeypatch):
+    """DataFile de snmpsim con los hooks de overlay instalados (se deshacen al terminar)."""
+    datafile = pytest.importorskip("snmpsim.datafile")
+    from snmpsim import confdir, variation
+    from gui import responder_hooks
+
+    monkeypatch.setattr(confdir, "cache", str(tmp_path / "cache"), raising=False)
+    os.makedirs(confdir.cache, exist_ok=True)
+    monkeypatch.setattr(datafile.DataFile, "process_var_binds", datafile.DataFile.process_var_binds)
+    monkeypatch.setattr(responder_hooks, "_BASES", {})
+    monkeypatch.setattr(responder_hooks, "_OVERLAY_INFO", {})
+    responder_hooks._patch_overlays(datafile)
+
+    def open_file(path):
+        return datafile.DataFile(str(path), variation.RECORD_TYPES["snmprec"], {}).index_text()
+    return open_file
+
+
+def walk(df):
+    from pysnmp.proto import rfc1902
+    from pysnmp.smi import exval
+    oid, found = rfc1902.ObjectName("1.3.6"), []
+    while True:
+        (oid, value), = df.process_var_binds([(oid, rfc1902.Null(""))], nextFlag=True, setFlag=False)
+        if value is exval.endOfMib or isinstance(value, type(exval.endOfMib)):
+            return found
+        found.append((str(oid), value.prettyPrint()))
+
+
+def test_responder_resolves_delta_then_base(tmp_path, responder):
+    from pysnmp.proto import rfc1902
+    from pysnmp.smi import exval
+
+    dest, records = edited_overlay(tmp_path)
+    df = responder(dest)
+    assert walk(df) == [(oid, value) for oid, _, value in records]
+
+    def get(oid):
+        (_, value), = df.process_var_binds([(rfc1902.ObjectName(oid), rfc1902.Null(""))],
+                                           nextFlag=False, setFlag=False)
+        return value
+    assert get("1.3.6.1.2.1.1.5.0").prettyPrint() == "clon"
+    assert get("1.3.6.1.2.1.1.1.0").prettyPrint() == "router base"
+    assert isinstance(get("1.3.6.1.2.1.2.2.1.2.1"), type(exval.noSuchInstance))
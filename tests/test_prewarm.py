@@ -0,0 +1,28 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import prewarm  # noqa: E402
+
+
+def test_in_use_keeps_every_owner():
+    a, b = object(), object()
+    try:
+        assert prewarm._in_use(a, {"x"}) == {"x"}
+        assert prewarm._in_use(b, {"y"}) == {"x", "y"}
+        prewarm.release(a)
+        assert prewarm._in_use(b, {"y"}) == {"y"}
+    finally:
+        prewarm.release(a)
+        prewarm.release(b)
+
+
+def test_cancelled_start_is_not_registered_after_release():
+    owner, stopping = object(), threading.Event()
+    # stop(): primero cancela y luego libera; el prewarm termina después
+    stopping.set()
+    prewarm.release(owner)
+    assert prewarm._in_use(owner, {"x"}, stopping) == {"x"}
+    assert owner not in prewarm.IN_USE
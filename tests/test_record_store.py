@@ -0,0 +1,103 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui.record_store import DEFAULT_UI_TYPE, RecordStore, oid_key  # noqa: E402
+
+
+def oids(store):
+    return [record["oid"] for record in store]
+
+
+def test_oid_key_is_numeric():
+    assert oid_key("1.3.6.1.9") < oid_key("1.3.6.1.10")
+    assert oid_key(".1.3.6") == (1, 3, 6)
+    assert oid_key("1.3.6.1") < oid_key("sysDescr")
+
+
+def test_add_keeps_numeric_order():
+    store = RecordStore()
+    for oid in ("1.3.6.1.10", "1.3.6.1.9", "1.3.6.1.9.1", "1.3.6.1.2"):
+        store.add(oid, "2", "0")
+    assert oids(store) == ["1.3.6.1.2", "1.3.6.1.9", "1.3.6.1.9.1", "1.3.6.1.10"]
+    assert store.position("1.3.6.1.9.1") == 2
+    assert store.position("1.3.6.1.99") is None
+    assert store.row(0) == ("1.3.6.1.2", "", "2", "0", DEFAULT_UI_TYPE)
+
+
+def test_duplicates_are_rejected():
+    store = RecordStore()
+    store.add("1.3.6.1", "2", "0")
+    with pytest.raises(KeyError):
+        store.add("1.3.6.1", "4", "x")
+    other = store.add("1.3.6.2", "2", "0")
+    with pytest.raises(KeyError):
+        other["oid"] = "1.3.6.1"
+    assert oids(store) == ["1.3.6.1", "1.3.6.2"]
+
+
+def test_extend_sorts_unsorted_chunks_and_last_duplicate_wins():
+    store = RecordStore()
+    store.extend([("1.3.6.1.5", "2", "5"), ("1.3.6.1.1", "2", "1")])
+    added = store.extend([("1.3.6.1.3", "2", "3"), ("1.3.6.1.1", "4", "uno")],
+                         meta={"1.3.6.1.3": {"name": "tres", "ui_type": "Slider"}})
+    assert [record["oid"] for record in added] == ["1.3.6.1.3"]
+    assert oids(store) == ["1.3.6.1.1", "1.3.6.1.3", "1.3.6.1.5"]
+    assert store.find("1.3.6.1.1")["value"] == "uno"
+    assert store.find("1.3.6.1.1")["tag"] == "4"
+    assert store.find("1.3.6.1.3").get("name") == "tres"
+    # El índice de bisección sigue al orden tras reordenar
+    assert store.position("1.3.6.1.5") == 2
+
+
+def test_rename_moves_the_row():
+    store = RecordStore()
+    store.extend([("1.3.6.1.1", "2", "1"), ("1.3.6.1.2", "2", "2"), ("1.3.6.1.3", "2", "3")])
+    record = store.find("1.3.6.1.1")
+    record["oid"] = "1.3.6.1.20"
+    assert oids(store) == ["1.3.6.1.2", "1.3.6.1.3", "1.3.6.1.20"]
+    assert "1.3.6.1.1" not in store and store.find("1.3.6.1.20") == record
+    assert record["value"] == "1"
+    assert store.position("1.3.6.1.20") == 2
+
+
+def test_rename_between_tied_keys():
+    # "1.3.6" y "1.3.06" comparten clave numérica: se mueve el registro exacto
+    store = RecordStore()
+    first = store.add("1.3.6", "2", "a")
+    second = store.add("1.3.06", "2", "b")
+    second["oid"] = "1.3.7"
+    assert oids(store) == ["1.3.6", "1.3.7"]
+    first["oid"] = "1.3.8"
+    assert oids(store) == ["1.3.7", "1.3.8"]
+    assert [record["value"] for record in store] == ["b", "a"]
+
+
+def test_serialization_round_trip():
+    store = RecordStore()
+    store.extend([("1.3.6.1.2", "4", "b"), ("1.3.6.1.1", "2", "1")],
+                 meta={"1.3.6.1.2": {"name": "desc", "ui_type": DEFAULT_UI_TYPE}})
+    store.find("1.3.6.1.1")["ui_type"] = "Toggle"
+    assert store.to_snmprec() == "1.3.6.1.1|2|1\n1.3.6.1.2|4|b\n"
+    assert list(store.triples()) == [("1.3.6.1.1", "2", "1"), ("1.3.6.1.2", "4", "b")]
+    assert store.meta_dict() == {"1.3.6.1.1": {"name": "", "ui_type": "Toggle"},
+                                 "1.3.6.1.2": {"name": "desc", "ui_type": DEFAULT_UI_TYPE}}
+
+    copy = RecordStore()
+    copy.extend(list(store.triples()), meta=store.meta_dict())
+    assert copy.to_snmprec() == store.to_snmprec()
+    assert copy.meta_dict() == store.meta_dict()
+
+
+def test_snapshot_is_independent():
+    store = RecordStore()
+    store.add("1.3.6.1.1", "2", "1", name="uno")
+    snap = store.snapshot()
+    store.find("1.3.6.1.1")["value"] = "2"
+    store.find("1.3.6.1.1")["name"] = ""
+    store.add("1.3.6.1.0", "2", "0")
+    assert snap.to_snmprec() == "1.3.6.1.1|2|1\n"
+    assert snap.meta_dict() == {"1.3.6.1.1": {"name": "uno", "ui_type": DEFAULT_UI_TYPE}}
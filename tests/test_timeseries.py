@@ -0,0 +1,84 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import timeseries  # noqa: E402
+
+OID = "1.3.6.1.2.1.2.2.1.10.1"
+PARAMS = {"speed": 1.0, "offset": 0.0, "loop": 1.0, "interp": ""}
+
+
+def build(tmp_path, tag, values, interval=60):
+    snaps = []
+    for i, value in enumerate(values):
+        path = tmp_path / f"snap{i}.snmprec"
+        path.write_text(f"{OID}|{tag}|{value}\n")
+        snaps.append(str(path))
+    out = tmp_path / "data" / "dev.snmprec"
+    out.parent.mkdir()
+    result = timeseries.import_snapshots(snaps, str(out), interval)
+    series = timeseries.SeriesFile(str(out.parent / result["series_path"]))
+    return series, series.column(OID)
+
+
+def replay(series, col, tag, t, loop=True):
+    return timeseries.replay_value(series, col, tag, dict(PARAMS, loop=float(loop)), t, 0.0)[0]
+
+
+def test_counter64_is_exact(tmp_path):
+    big = 2 ** 64 - 1000
+    series, col = build(tmp_path, "70", [big - 600, big])
+    assert replay(series, col, "70", 0) == big - 600
+    assert replay(series, col, "70", 30) == big - 300
+    assert replay(series, col, "70", 60, loop=False) == big
+    # Una vuelta entera del histórico suma lo recorrido, también exacto
+    assert replay(series, col, "70", 90) == (big + 300) % 2 ** 64
+    series.close()
+
+
+def test_counter64_drop_is_a_reset(tmp_path):
+    series, col = build(tmp_path, "70", [1_000_000, 2_000_000, 500])
+    assert replay(series, col, "70", 30) == 1_500_000
+    # Sin interpolar a través del reinicio ni valores desorbitados
+    assert replay(series, col, "70", 90) == 2_000_000
+    assert replay(series, col, "70", 119) == 2_000_000
+    assert replay(series, col, "70", 120, loop=False) == 500
+    # Al repetir el histórico no se suman vueltas
+    assert replay(series, col, "70", 150) == 1_500_000
+    series.close()
+
+
+def test_counter32_wrap_and_reset(tmp_path):
+    wrapped, col = build(tmp_path, "65", [2 ** 32 - 1000, 1000])
+    assert replay(wrapped, col, "65", 30) == 0
+    assert replay(wrapped, col, "65", 60, loop=False) == 1000
+    # Cada vuelta del histórico suma lo recorrido
+    assert replay(wrapped, col, "65", 90) == 1000 + 1000
+    wrapped.close()
+
+    reset_dir = tmp_path / "reset"
+    reset_dir.mkdir()
+    reset, col = build(reset_dir, "65", [1_000_000, 500])
+    assert replay(reset, col, "65", 30) == 1_000_000
+    assert replay(reset, col, "65", 60, loop=False) == 500
+    reset.close()
+
+
+def test_timeticks_drop_is_a_reset(tmp_path):
+    series, col = build(tmp_path, "67", [500_000, 100])
+    assert replay(series, col, "67", 59) == 500_000
+    assert replay(series, col, "67", 60, loop=False) == 100
+    series.close()
+
+
+def test_gauge_interpolates_and_clamps(tmp_path):
+    series, col = build(tmp_path, "66", [10, 20])
+    assert replay(series, col, "66", 30) == 15
+    series.close()
+    integer_dir = tmp_path / "integer"
+    integer_dir.mkdir()
+    series, col = build(integer_dir, "2", [10, 20])
+    # Integer va a saltos por defecto
+    assert replay(series, col, "2", 30) == 10
+    series.close()
@@ -0,0 +1,42 @@
+import os
+import stat
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui import metrics  # noqa: E402
+from gui.writeback import atomic_write  # noqa: E402
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_write_replaces_content(tmp_path):
+    path = tmp_path / "dev.snmprec"
+    atomic_write(str(path), "a\n")
+    atomic_write(str(path), "b\n")
+    assert path.read_text() == "b\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["dev.snmprec"]
+
+
+def test_atomic_write_mode_only_for_new_files(tmp_path):
+    new = tmp_path / "new.txt"
+    atomic_write(str(new), "x", mode=0o644)
+    assert mode(new) == 0o644
+    kept = tmp_path / "kept.txt"
+    kept.write_text("x")
+    os.chmod(kept, 0o640)
+    atomic_write(str(kept), "y", mode=0o644)
+    assert mode(kept) == 0o640
+
+
+def test_metrics_textfile_is_world_readable(tmp_path):
+    collector = metrics.MetricsCollector()
+    try:
+        path = tmp_path / "snmpsim.prom"
+        collector.write_textfile(str(path))
+        assert mode(path) == 0o644
+        assert "snmpsim_workers 0" in path.read_text()
+    finally:
+        collector.close()